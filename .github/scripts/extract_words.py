@@ -1,33 +1,16 @@
 #!/usr/bin/env python3
 import sys
-import re
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-def detect_language(word):
-    """检测单词的语言"""
-    if re.match(r'^[a-zA-Z]+$', word):
-        return 'english'
-    elif re.match(r'[\u4e00-\u9fff]', word):
-        return 'chinese'
-    elif re.match(r'[\u3040-\u309F\u30A0-\u30FF]', word):
-        return 'japanese'
-    elif re.match(r'[\uAC00-\uD7A3]', word):
-        return 'korean'
-    return 'unknown'
+from scripts.gather.script_detector import group_by_language  # noqa: E402
 
 
 def extract_words(issue_body):
     """从issue内容中提取单词"""
-    words = {}
-    
-    # 分行处理issue内容
-    for line in issue_body.split('\n'):
-        word = line.strip()
-        if word:
-            lang = detect_language(word)
-            if lang != 'unknown':
-                words.setdefault(lang, []).append(word)
+    # 分行处理issue内容, 混合文字的行按文字拆分为多个单词
+    words = group_by_language(line.strip() for line in issue_body.split('\n'))
     
     # 保存到临时文件
     output_dir = Path('temp')
@@ -1,63 +1,51 @@
 # 在根目录运行 python .github/scripts/fetcher/cn.py
-import json
-import requests
+import argparse
+import sys
+import time
 from pathlib import Path
-from itertools import dropwhile
-
+from typing import Dict, Iterator, List, Optional, Union
 
-def build_tree(chars, pinyin):
-    """Build a nested dictionary tree from characters and pinyin."""
-    current = {}
-    node = current
-
-    # Build the tree structure for characters
-    for i, char in enumerate(chars[:-1]):
-        if char not in node:
-            node[char] = {}
-        node = node[char]
+import requests
 
-    # Add the last character with pinyin
-    last_char = chars[-1]
-    if last_char not in node:
-        node[last_char] = {}
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from cn_binary import BINARY_OUTPUT, write_binary  # noqa: E402
+from scripts.gather.codec import dump_file  # noqa: E402
 
-    # Add pinyin list to the leaf node using "_" key
-    node[last_char]["_"] = pinyin
+PHRASE_URL = "https://raw.githubusercontent.com/mozillazg/phrase-pinyin-data/master/large_pinyin.txt"
+CHAR_URL = "https://raw.githubusercontent.com/mozillazg/pinyin-data/27dc54a206326e0d8d91428010325f50f614508d/pinyin.txt"
 
-    return current
+# Key holding the pinyin of the phrase ending at a node
+LEAF_KEY = "_"
 
 
-def merge_trees(tree1, tree2):
-    """Recursively merge two trees."""
-    for key, value in tree2.items():
-        if key not in tree1:
-            tree1[key] = value
-        elif isinstance(value, dict) and isinstance(tree1[key], dict):
-            merge_trees(tree1[key], value)
-    return tree1
+def iter_source_lines(source: str) -> Iterator[str]:
+    """Yield lines from a local file or a streamed HTTP download."""
+    path = Path(source)
+    if path.exists():
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                yield line.rstrip("\r\n")
+        return
 
+    with requests.get(source, stream=True) as response:
+        response.raise_for_status()
+        response.encoding = "utf-8"
+        yield from response.iter_lines(decode_unicode=True)
 
-def fetch_pinyin_data():
-    # Create raw/raw/cn directory if it doesn't exist
-    raw_dir = Path("raw/raw/cn")
-    raw_dir.mkdir(parents=True, exist_ok=True)
 
-    # Download the raw pinyin data for phrases
-    phrase_url = "https://raw.githubusercontent.com/mozillazg/phrase-pinyin-data/master/large_pinyin.txt"
-    phrase_response = requests.get(phrase_url)
-    phrase_response.raise_for_status()
+def insert(trie: Dict, chars: str, pinyin: Union[str, List[str]]) -> None:
+    """Insert a phrase into the trie; the first pinyin seen for a phrase wins."""
+    node = trie
+    for char in chars:
+        node = node.setdefault(char, {})
+    node.setdefault(LEAF_KEY, pinyin)
 
-    # Download the raw pinyin data for single characters
-    char_url = "https://raw.githubusercontent.com/mozillazg/pinyin-data/27dc54a206326e0d8d91428010325f50f614508d/pinyin.txt"
-    char_response = requests.get(char_url)
-    char_response.raise_for_status()
 
-    # Process the phrase data into a tree structure
-    pinyin_tree = {}
-    for index, line in dropwhile(
-        lambda x: x[0] in [0, 1], enumerate(phrase_response.text.splitlines())
-    ):
-        if not line.strip():
+def iter_phrases(lines: Iterator[str]) -> Iterator[tuple]:
+    """Parse `chars: pin yin` lines, skipping the two header lines."""
+    for index, line in enumerate(lines):
+        if index < 2 or not line.strip():
             continue
 
         parts = line.split(": ")
@@ -65,45 +53,105 @@ def fetch_pinyin_data():
             continue
 
         chars, pinyin = parts
-        chars = chars.strip()
-        pinyin = pinyin.strip()
+        yield chars.strip(), " ".join(pinyin.split())
 
-        # Build tree for current word and merge with existing tree
-        current_tree = build_tree(chars, pinyin)
-        pinyin_tree = merge_trees(pinyin_tree, current_tree)
 
-    # Process the single character data
-    for line in char_response.text.splitlines():
+def iter_chars(lines: Iterator[str]) -> Iterator[tuple]:
+    """Parse `U+XXXX: pīnyīn  # 字` lines into (char, [pinyin, ...])."""
+    for line in lines:
         if line.startswith("#") or not line.strip():
             continue
 
-        # Parse the line (format: U+XXXX: pīnyīn  # 字)
         parts = line.split("#")[0].strip().split(":")
         if len(parts) != 2:
             continue
 
         unicode_point, pinyin = parts
-        unicode_point = unicode_point.strip()
-        pinyin = pinyin.strip()
-
-        # Convert unicode point to character
         try:
-            char = chr(int(unicode_point.replace("U+", ""), 16))
-            # Create a tree for single character with its pinyin
-            current_tree = {char: {"_": pinyin.split(",")}}
-            pinyin_tree = merge_trees(pinyin_tree, current_tree)
+            char = chr(int(unicode_point.strip().replace("U+", ""), 16))
         except ValueError:
             continue
+        yield char, pinyin.strip().split(",")
 
-    # Create extension data directory if it doesn't exist
-    data_dir = Path("extension/data/cn")
-    data_dir.mkdir(parents=True, exist_ok=True)
 
-    # Save as JSON
-    output_file = data_dir / "data.json"
-    with output_file.open("w", encoding="utf-8") as f:
-        json.dump(pinyin_tree, f, ensure_ascii=False)
+def build_pinyin_trie(phrase_source: str, char_source: str) -> Dict:
+    """Stream both sources into a single trie without intermediate trees."""
+    pinyin_tree = {}
+    for chars, pinyin in iter_phrases(iter_source_lines(phrase_source)):
+        insert(pinyin_tree, chars, pinyin)
+    for char, pinyin in iter_chars(iter_source_lines(char_source)):
+        insert(pinyin_tree, char, pinyin)
+    return pinyin_tree
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, None where unavailable."""
+    try:
+        import resource  # Unix only
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def fetch_pinyin_data(
+    phrase_source: str = PHRASE_URL,
+    char_source: str = CHAR_URL,
+    output_file: Path = Path("extension/data/cn/data.json"),
+    binary_file: Optional[Path] = BINARY_OUTPUT,
+) -> Dict:
+    start = time.perf_counter()
+    pinyin_tree = build_pinyin_trie(phrase_source, char_source)
+    build_time = time.perf_counter() - start
+
+    # Save as compact JSON (creates the extension data directory if needed)
+    dump_file(output_file, pinyin_tree)
+
+    # Save the compact binary form for offline tools, checked against the tree
+    binary_size = None
+    if binary_file is not None:
+        binary_size = write_binary(pinyin_tree, binary_file)
+
+    peak_rss = peak_rss_mb()
+    memory = f" (peak RSS {peak_rss:.1f} MB)" if peak_rss is not None else ""
+    print(
+        f"Built pinyin trie with {len(pinyin_tree)} root entries in "
+        f"{build_time:.2f}s{memory} -> {output_file}"
+    )
+    if binary_size is not None:
+        print(
+            f"Binary dictionary {binary_file}: {binary_size} bytes "
+            f"(JSON {output_file.stat().st_size} bytes)"
+        )
+    return pinyin_tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Chinese pinyin trie")
+    parser.add_argument("--phrases", default=PHRASE_URL, help="Phrase file or URL")
+    parser.add_argument("--chars", default=CHAR_URL, help="Character file or URL")
+    parser.add_argument(
+        "--output", default="extension/data/cn/data.json", help="Output JSON path"
+    )
+    parser.add_argument(
+        "--binary-output",
+        default=str(BINARY_OUTPUT),
+        help="Binary dictionary path for offline tools (outside the extension)",
+    )
+    parser.add_argument(
+        "--no-binary", action="store_true", help="Skip the binary dictionary"
+    )
+    args = parser.parse_args()
+
+    fetch_pinyin_data(
+        args.phrases,
+        args.chars,
+        Path(args.output),
+        None if args.no_binary else Path(args.binary_output),
+    )
 
 
 if __name__ == "__main__":
-    fetch_pinyin_data()
+    main()
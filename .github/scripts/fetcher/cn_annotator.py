@@ -0,0 +1,244 @@
+# Offline pinyin annotation over the trie built by cn.py
+#
+# 在根目录运行:
+#   python .github/scripts/fetcher/cn_annotator.py article.txt > article.pinyin.txt
+#   python .github/scripts/fetcher/cn_annotator.py --bench
+#
+# Text is segmented by maximum matching against the phrase trie. Phrases are at
+# most a few characters long, so each position walks a bounded number of trie
+# nodes and annotation stays linear in the length of the text.
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from cn_binary import LEAF_KEY, PinyinDictionary, Value, flatten  # noqa: E402
+
+MODES = ("forward", "backward", "bidirectional")
+FORMATS = ("text", "jsonl")
+
+
+class Segment(NamedTuple):
+    """A run of text and its pinyin; pinyin is None for unmatched text."""
+
+    text: str
+    pinyin: Optional[str]
+
+
+def reading(value: Value) -> str:
+    """Phrases carry one reading; characters list theirs, most common first."""
+    return value[0] if isinstance(value, list) else value
+
+
+class PinyinAnnotator:
+    """Segment Chinese text and attach pinyin using the cn.py trie."""
+
+    def __init__(self, trie: Dict):
+        self.trie = trie
+        self._reversed: Optional[Dict] = None
+
+    @classmethod
+    def load(cls, path: Path) -> "PinyinAnnotator":
+        """Load the trie from cn.py's JSON output or its binary form (.bin)."""
+        path = Path(path)
+        if path.suffix == ".bin":
+            return cls(PinyinDictionary.load(path).to_tree())
+        with path.open("r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @property
+    def reversed_trie(self) -> Dict:
+        """Trie of reversed phrases for backward matching, built on first use."""
+        self.warm_up()
+        return self._reversed
+
+    def warm_up(self) -> None:
+        """Build the reversed trie now, so the first backward match is not slowed."""
+        if self._reversed is None:
+            self._reversed = {}
+            for phrase, value in flatten(self.trie):
+                node = self._reversed
+                for char in reversed(phrase):
+                    node = node.setdefault(char, {})
+                node[LEAF_KEY] = value
+
+    @staticmethod
+    def _longest(
+        trie: Dict, text: str, start: int, step: int
+    ) -> Tuple[int, Optional[Value]]:
+        """Length and value of the longest phrase at start, walking by step."""
+        node = trie
+        length, value = 0, None
+        end = len(text) if step > 0 else -1
+        for position in range(start, end, step):
+            node = node.get(text[position])
+            if node is None:
+                break
+            leaf = node.get(LEAF_KEY)
+            if leaf is not None:
+                length, value = abs(position - start) + 1, leaf
+        return length, value
+
+    def _match(self, text: str, backward: bool) -> List[Segment]:
+        trie = self.reversed_trie if backward else self.trie
+        step = -1 if backward else 1
+        segments: List[Segment] = []
+        plain: List[str] = []
+
+        position = len(text) - 1 if backward else 0
+        while 0 <= position < len(text):
+            length, value = self._longest(trie, text, position, step)
+            if not length:
+                plain.append(text[position])
+                position += step
+                continue
+
+            if plain:
+                segments.append(Segment(self._join(plain, backward), None))
+                plain = []
+            if backward:
+                chunk = text[position - length + 1 : position + 1]
+            else:
+                chunk = text[position : position + length]
+            segments.append(Segment(chunk, reading(value)))
+            position += step * length
+
+        if plain:
+            segments.append(Segment(self._join(plain, backward), None))
+        if backward:
+            segments.reverse()
+        return segments
+
+    @staticmethod
+    def _join(chars: List[str], backward: bool) -> str:
+        return "".join(reversed(chars) if backward else chars)
+
+    def forward(self, text: str) -> List[Segment]:
+        """Forward maximum matching, as the extension does on hover."""
+        return self._match(text, backward=False)
+
+    def backward(self, text: str) -> List[Segment]:
+        """Backward maximum matching."""
+        return self._match(text, backward=True)
+
+    def bidirectional(self, text: str) -> List[Segment]:
+        """
+        Run both directions and keep the segmentation with fewer phrases, then
+        fewer single-character phrases; ties go to backward matching, which is
+        right more often for Chinese.
+        """
+        forward = self.forward(text)
+        backward = self.backward(text)
+        if forward == backward:
+            return forward
+
+        def score(segments: List[Segment]) -> Tuple[int, int]:
+            matched = [s for s in segments if s.pinyin is not None]
+            return len(matched), sum(len(s.text) == 1 for s in matched)
+
+        return forward if score(forward) < score(backward) else backward
+
+    def annotate(self, text: str, mode: str = "bidirectional") -> List[Segment]:
+        if mode not in MODES:
+            raise ValueError(f"Unknown segmentation mode: {mode}")
+        return getattr(self, mode)(text)
+
+    def annotate_lines(
+        self, lines: Iterable[str], mode: str = "bidirectional"
+    ) -> Iterator[List[Segment]]:
+        """Annotate a stream line by line, so input size does not bound memory."""
+        for line in lines:
+            yield self.annotate(line.rstrip("\r\n"), mode)
+
+
+def render(segments: List[Segment], output_format: str = "text") -> str:
+    """Format segments as `中国(zhōng guó)人(rén)` text or a JSON array."""
+    if output_format == "jsonl":
+        return json.dumps([list(segment) for segment in segments], ensure_ascii=False)
+    return "".join(
+        segment.text if segment.pinyin is None else f"{segment.text}({segment.pinyin})"
+        for segment in segments
+    )
+
+
+def synthetic_text(trie: Dict, size: int, seed: int = 0) -> str:
+    """Roughly size characters of dictionary phrases mixed with punctuation."""
+    phrases = [phrase for phrase, _ in flatten(trie)]
+    rng = random.Random(seed)
+    parts, length = [], 0
+    while length < size:
+        part = rng.choice(phrases) if rng.random() < 0.9 else rng.choice("，。 a1")
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+def benchmark(
+    annotator: PinyinAnnotator, text: str, modes: Iterable[str] = MODES
+) -> Dict[str, float]:
+    """Throughput of each mode in MB of UTF-8 input per second."""
+    size = len(text.encode("utf-8")) / 1024 / 1024
+    results = {}
+    for mode in modes:
+        start = time.perf_counter()
+        annotator.annotate(text, mode)
+        results[mode] = size / (time.perf_counter() - start)
+    return results
+
+
+def annotate_files(
+    annotator: PinyinAnnotator,
+    inputs: List[TextIO],
+    output: TextIO,
+    mode: str,
+    output_format: str,
+) -> None:
+    for stream in inputs:
+        for segments in annotator.annotate_lines(stream, mode):
+            output.write(render(segments, output_format) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Annotate Chinese text with pinyin")
+    parser.add_argument("inputs", nargs="*", help="Text files (default: stdin)")
+    parser.add_argument(
+        "--dictionary",
+        default="extension/data/cn/data.json",
+        help="Pinyin trie JSON from cn.py, or its .bin form",
+    )
+    parser.add_argument("--mode", choices=MODES, default="bidirectional")
+    parser.add_argument("--format", choices=FORMATS, default="text")
+    parser.add_argument(
+        "--bench", action="store_true", help="Measure throughput on synthetic text"
+    )
+    parser.add_argument(
+        "--bench-chars", type=int, default=1_000_000, help="Synthetic text length"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    annotator = PinyinAnnotator.load(Path(args.dictionary))
+    load_time = time.perf_counter() - start
+
+    if args.bench:
+        text = synthetic_text(annotator.trie, args.bench_chars)
+        annotator.warm_up()
+        print(f"Loaded {args.dictionary} in {load_time:.2f}s")
+        for mode, throughput in benchmark(annotator, text).items():
+            print(f"{mode:>13}: {throughput:.2f} MB/s")
+        return
+
+    if not args.inputs:
+        annotate_files(annotator, [sys.stdin], sys.stdout, args.mode, args.format)
+        return
+    for name in args.inputs:
+        with open(name, "r", encoding="utf-8") as f:
+            annotate_files(annotator, [f], sys.stdout, args.mode, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+# Compact binary encoding of the pinyin trie built by cn.py
+#
+# Layout (all integers little-endian):
+#   header   magic "PYT1", block size (u16), entry count, block count,
+#            syllable table offset, block index offset, blocks offset (u32)
+#   syllables varint count, then varint length + UTF-8 bytes per syllable,
+#            ordered by frequency so common syllables get one-byte ids
+#   index    u32 offset of every block, relative to the blocks section
+#   blocks   sorted entries, front-coded against the previous key in the block:
+#            varint shared prefix, varint suffix length, suffix bytes,
+#            varint (count << 1 | is_list), count varint syllable ids
+#
+# Lookups binary search the block index by each block's first key and then scan
+# at most one block, so the file can be queried without materializing the trie.
+import argparse
+import json
+import struct
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from scripts.gather.atomic import atomic_write  # noqa: E402
+
+# Default location, outside the packaged extension tree: the extension only reads
+# data.json, the binary form is for offline tools (cn_annotator.py, the service)
+BINARY_OUTPUT = Path("data/processed/cn_pinyin.bin")
+
+MAGIC = b"PYT1"
+HEADER = struct.Struct("<4sHIIIII")
+BLOCK_SIZE = 16
+LEAF_KEY = "_"
+
+Value = Union[str, List[str]]
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def flatten(tree: Dict, prefix: str = "") -> Iterator[Tuple[str, Value]]:
+    """Yield (phrase, pinyin) for every node of the trie that carries a value."""
+    for key, node in tree.items():
+        if key == LEAF_KEY:
+            yield prefix, node
+        else:
+            yield from flatten(node, prefix + key)
+
+
+def unflatten(entries: Iterator[Tuple[str, Value]]) -> Dict:
+    """Rebuild the nested trie from (phrase, pinyin) pairs."""
+    tree = {}
+    for phrase, value in entries:
+        node = tree
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[LEAF_KEY] = value
+    return tree
+
+
+def _tokens(value: Value) -> List[str]:
+    # Phrase pinyin is a whitespace separated string, single characters keep a list
+    return value if isinstance(value, list) else value.split()
+
+
+def normalize(tree: Dict) -> Dict:
+    """The trie as it decodes from the binary form: phrase pinyin single-spaced."""
+    return unflatten(
+        (phrase, value if isinstance(value, list) else " ".join(_tokens(value)))
+        for phrase, value in flatten(tree)
+    )
+
+
+def encode(tree: Dict, block_size: int = BLOCK_SIZE) -> bytes:
+    """Encode a pinyin trie into the binary format."""
+    entries = sorted(
+        ((phrase.encode("utf-8"), value) for phrase, value in flatten(tree)),
+        key=lambda entry: entry[0],
+    )
+
+    counts = Counter(token for _, value in entries for token in _tokens(value))
+    syllables = [token for token, _ in counts.most_common()]
+    ids = {token: index for index, token in enumerate(syllables)}
+
+    table = bytearray()
+    _write_varint(table, len(syllables))
+    for token in syllables:
+        raw = token.encode("utf-8")
+        _write_varint(table, len(raw))
+        table += raw
+
+    blocks = bytearray()
+    index = []
+    previous = b""
+    for position, (key, value) in enumerate(entries):
+        if position % block_size == 0:
+            index.append(len(blocks))
+            previous = b""
+
+        shared = 0
+        limit = min(len(previous), len(key))
+        while shared < limit and previous[shared] == key[shared]:
+            shared += 1
+        _write_varint(blocks, shared)
+        _write_varint(blocks, len(key) - shared)
+        blocks += key[shared:]
+
+        tokens = _tokens(value)
+        _write_varint(blocks, len(tokens) << 1 | isinstance(value, list))
+        for token in tokens:
+            _write_varint(blocks, ids[token])
+        previous = key
+
+    table_offset = HEADER.size
+    index_offset = table_offset + len(table)
+    blocks_offset = index_offset + 4 * len(index)
+    header = HEADER.pack(
+        MAGIC,
+        block_size,
+        len(entries),
+        len(index),
+        table_offset,
+        index_offset,
+        blocks_offset,
+    )
+    return b"".join(
+        [header, bytes(table), struct.pack(f"<{len(index)}I", *index), bytes(blocks)]
+    )
+
+
+class PinyinDictionary:
+    """Read-only view over the binary pinyin format."""
+
+    def __init__(self, data: bytes):
+        (
+            magic,
+            self.block_size,
+            self.entry_count,
+            self.block_count,
+            table_offset,
+            index_offset,
+            self.blocks_offset,
+        ) = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a binary pinyin dictionary")
+
+        self.data = data
+        count, pos = _read_varint(data, table_offset)
+        self.syllables = []
+        for _ in range(count):
+            length, pos = _read_varint(data, pos)
+            self.syllables.append(data[pos : pos + length].decode("utf-8"))
+            pos += length
+
+        self.index = struct.unpack_from(f"<{self.block_count}I", data, index_offset)
+
+    @classmethod
+    def load(cls, path: Path) -> "PinyinDictionary":
+        return cls(Path(path).read_bytes())
+
+    def __len__(self) -> int:
+        return self.entry_count
+
+    def _read_entry(self, pos: int, previous: bytes) -> Tuple[bytes, Value, int]:
+        data = self.data
+        shared, pos = _read_varint(data, pos)
+        length, pos = _read_varint(data, pos)
+        key = previous[:shared] + data[pos : pos + length]
+        pos += length
+
+        header, pos = _read_varint(data, pos)
+        tokens = []
+        for _ in range(header >> 1):
+            token, pos = _read_varint(data, pos)
+            tokens.append(self.syllables[token])
+        value = tokens if header & 1 else " ".join(tokens)
+        return key, value, pos
+
+    def _iter_block(self, block: int) -> Iterator[Tuple[bytes, Value]]:
+        pos = self.blocks_offset + self.index[block]
+        remaining = min(self.block_size, self.entry_count - block * self.block_size)
+        key = b""
+        for _ in range(remaining):
+            key, value, pos = self._read_entry(pos, key)
+            yield key, value
+
+    def _first_key(self, block: int) -> bytes:
+        return self._read_entry(self.blocks_offset + self.index[block], b"")[0]
+
+    def get(self, phrase: str) -> Optional[Value]:
+        """Look up the pinyin of a phrase or character."""
+        target = phrase.encode("utf-8")
+        low, high = 0, self.block_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._first_key(middle) <= target:
+                low = middle + 1
+            else:
+                high = middle
+        if low == 0:
+            return None
+
+        for key, value in self._iter_block(low - 1):
+            if key == target:
+                return value
+            if key > target:
+                break
+        return None
+
+    def __contains__(self, phrase: str) -> bool:
+        return self.get(phrase) is not None
+
+    def items(self) -> Iterator[Tuple[str, Value]]:
+        for block in range(self.block_count):
+            for key, value in self._iter_block(block):
+                yield key.decode("utf-8"), value
+
+    def to_tree(self) -> Dict:
+        return unflatten(self.items())
+
+
+def validate(tree: Dict, data: bytes, samples: int = 1000) -> None:
+    """
+    Raise ValueError unless the binary data decodes back to the same trie, up to
+    the whitespace between phrase syllables.
+    """
+    tree = normalize(tree)
+    dictionary = PinyinDictionary(data)
+    if dictionary.to_tree() != tree:
+        raise ValueError("Binary pinyin dictionary does not match the JSON tree")
+
+    # Spot check random access as well as the sequential decode
+    stride = max(1, len(dictionary) // samples)
+    for position, (phrase, value) in enumerate(flatten(tree)):
+        if position % stride == 0 and dictionary.get(phrase) != value:
+            raise ValueError(f"Lookup mismatch for {phrase!r}")
+
+
+def write_binary(tree: Dict, output_file: Path, check: bool = True) -> int:
+    """Encode the trie to output_file, optionally validating it; returns size."""
+    data = encode(tree)
+    if check:
+        validate(tree, data)
+
+    atomic_write(output_file, data)
+    return len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert or validate the binary pinyin dictionary"
+    )
+    parser.add_argument("json_file", help="Pinyin trie JSON produced by cn.py")
+    parser.add_argument(
+        "--output", default=str(BINARY_OUTPUT), help="Binary output path"
+    )
+    parser.add_argument(
+        "--check-only", action="store_true", help="Validate an existing binary file"
+    )
+    args = parser.parse_args()
+
+    json_file = Path(args.json_file)
+    output_file = Path(args.output)
+    with json_file.open("r", encoding="utf-8") as f:
+        tree = json.load(f)
+
+    if args.check_only:
+        try:
+            validate(tree, output_file.read_bytes())
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+        print(f"{output_file} matches {json_file}")
+        return
+
+    size = write_binary(tree, output_file)
+    print(
+        f"Wrote {output_file}: {size} bytes "
+        f"({json_file.stat().st_size / size:.1f}x smaller than JSON)"
+    )
+
+
+if __name__ == "__main__":
+    main()
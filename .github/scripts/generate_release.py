@@ -1,61 +1,227 @@
 #!/usr/bin/env python3
-import json
+import argparse
+import sys
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-def generate_release_files():
-    """生成发布文件"""
+from scripts.gather.atomic import atomic_write  # noqa: E402
+from scripts.gather.codec import (  # noqa: E402
+    RECORD_SCHEMAS,
+    dump_file,
+    load_file,
+    validate_records,
+)
+from scripts.gather.delta import (  # noqa: E402
+    data_digest,
+    diff_datasets,
+    load_state,
+    save_state,
+    source_digests,
+)
+from scripts.gather.merge import (  # noqa: E402
+    ENGLISH_FIELDS,
+    ENGLISH_FIELD_PRIORITY,
+    merge_datasets,
+)
+from scripts.gather.shards import MANIFEST_NAME, write_shards  # noqa: E402
+
+RELEASE_MODES = ("full", "sharded", "both")
+STATE_FILE = "release_state.json"
+
+# 各语言发布数据的记录结构
+LANGUAGE_SCHEMAS = {
+    "english": RECORD_SCHEMAS["english"],
+    "japanese": RECORD_SCHEMAS["jisho"],
+    "korean": RECORD_SCHEMAS["naver"],
+}
+
+
+def _load_json(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    return load_file(path)
+
+
+def language_sources(data_dir: Path) -> dict:
+    """各语言发布数据依赖的来源文件"""
+    combined_file = data_dir / "english_pronunciation_data.json"
+    if combined_file.exists():
+        english = [combined_file]
+    else:
+        english = [
+            data_dir / f"{source}_pronunciation_data.json"
+            for source in ["cambridge", "merriam_webster"]
+        ]
+
+    return {
+        "english": english,
+        "japanese": [data_dir / "jisho_pronunciation_data.json"],
+        "korean": [data_dir / "naver_pronunciation_data.json"],
+    }
+
+
+def build_language(lang: str, sources: list) -> dict:
+    """从来源文件构建某种语言的发布数据"""
+    # 英语: 优先使用多来源合并后的数据, 否则按字段优先级合并各来源
+    if lang == "english" and sources[0].name != "english_pronunciation_data.json":
+        datasets = {
+            path.name.replace("_pronunciation_data.json", ""): _load_json(path)
+            for path in sources
+            if path.exists()
+        }
+        return merge_datasets(datasets, ENGLISH_FIELDS, ENGLISH_FIELD_PRIORITY)
+
+    return _load_json(sources[0])
+
+
+def load_previous(release_dir: Path, lang: str) -> dict:
+    """读取上一次发布的数据, 用于计算差异"""
+    full_file = release_dir / f"{lang}_pronunciations.json"
+    if full_file.exists():
+        return _load_json(full_file)
+
+    shard_dir = release_dir / lang
+    manifest = _load_json(shard_dir / MANIFEST_NAME)
+    previous = {}
+    for shard in manifest.get("shards", []):
+        previous.update(_load_json(shard_dir / shard["file"]))
+    return previous
+
+
+def outputs_exist(release_dir: Path, lang: str, mode: str) -> bool:
+    full = (release_dir / f"{lang}_pronunciations.json").exists()
+    sharded = (release_dir / lang / MANIFEST_NAME).exists()
+    return {"full": full, "sharded": sharded, "both": full and sharded}[mode]
+
+
+def remove_stale_outputs(release_dir: Path, lang: str, mode: str) -> None:
+    """删除另一种模式留下的产物, 切换模式后不会把旧文件一起发布"""
+    if mode == "sharded":
+        (release_dir / f"{lang}_pronunciations.json").unlink(missing_ok=True)
+    if mode == "full":
+        shard_dir = release_dir / lang
+        # 先删清单, 读取方不会看到指向已删除分片的清单
+        (shard_dir / MANIFEST_NAME).unlink(missing_ok=True)
+        for shard in shard_dir.glob("shard-*.json"):
+            shard.unlink()
+        if shard_dir.is_dir() and not any(shard_dir.iterdir()):
+            shard_dir.rmdir()
+
+
+def write_outputs(
+    release_dir: Path, lang: str, data: dict, mode: str, shard_size: int
+) -> None:
+    if mode in ("full", "both"):
+        output_file = release_dir / f"{lang}_pronunciations.json"
+        dump_file(output_file, data)
+    if mode in ("sharded", "both"):
+        write_shards(data, release_dir / lang, shard_size)
+    remove_stale_outputs(release_dir, lang, mode)
+
+
+def render_changelog(summary: dict) -> str:
+    """根据各语言的统计和差异生成更新日志"""
+    lines = [
+        f"# Pronunciation Data Update ({datetime.now().strftime('%Y-%m-%d')})",
+        "",
+        "## Statistics",
+    ]
+    for lang, info in summary.items():
+        lines.append(f"- {lang.capitalize()} words: {info['entries']}")
+
+    lines += ["", "## Changes"]
+    for lang, info in summary.items():
+        delta = info.get("delta")
+        if delta is None:
+            lines.append(f"- {lang.capitalize()}: no changes")
+        else:
+            lines.append(
+                f"- {lang.capitalize()}: {len(delta['added'])} added, "
+                f"{len(delta['changed'])} changed, {len(delta['removed'])} removed"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def generate_release_files(
+    mode: str = "full", shard_size: int = 2000, force: bool = False
+):
+    """生成发布文件
+
+    full 为每种语言输出一个完整 JSON, sharded 按单词哈希输出分片和清单
+    (release/<语言>/manifest.json), both 两者都输出.
+
+    来源文件的哈希记录在 release/release_state.json 中, 来源未变化且产物存在的语言
+    直接跳过; 有变化的语言重新生成, 并输出相对上次发布的差异 <语言>_delta.json
+    """
     data_dir = Path("data")
     release_dir = Path("release")
     release_dir.mkdir(exist_ok=True)
 
-    # 合并所有发音数据
-    pronunciations = {"english": {}, "japanese": {}, "korean": {}}
-
-    # 处理英语发音
-    for source in ["cambridge", "merriam_webster"]:
-        file_path = data_dir / f"{source}_pronunciation_data.json"
-        if file_path.exists():
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                pronunciations["english"].update(data)
-
-    # 处理日语发音
-    jisho_file = data_dir / "jisho_pronunciation_data.json"
-    if jisho_file.exists():
-        with open(jisho_file, "r", encoding="utf-8") as f:
-            pronunciations["japanese"] = json.load(f)
-
-    # 处理韩语发音
-    naver_file = data_dir / "naver_pronunciation_data.json"
-    if naver_file.exists():
-        with open(naver_file, "r", encoding="utf-8") as f:
-            pronunciations["korean"] = json.load(f)
-
-    # 保存发布文件
-    for lang, data in pronunciations.items():
-        output_file = release_dir / f"{lang}_pronunciations.json"
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    state_file = release_dir / STATE_FILE
+    state = load_state(state_file)
 
-    # 生成更新日志
-    changelog = f"""# Pronunciation Data Update ({datetime.now().strftime('%Y-%m-%d')})
+    summary = {}
+    for lang, sources in language_sources(data_dir).items():
+        digests = source_digests(sources)
+        previous_state = state["languages"].get(lang, {})
+        delta_file = release_dir / f"{lang}_delta.json"
+
+        unchanged = (
+            not force
+            and previous_state.get("sources") == digests
+            and previous_state.get("mode") == mode
+            and previous_state.get("shard_size") == shard_size
+            and outputs_exist(release_dir, lang, mode)
+        )
+        if unchanged:
+            delta_file.unlink(missing_ok=True)
+            summary[lang] = {"entries": previous_state["entries"]}
+            continue
 
-## Statistics
-- English words: {len(pronunciations['english'])}
-- Japanese words: {len(pronunciations['japanese'])}
-- Korean words: {len(pronunciations['korean'])}
+        data = build_language(lang, sources)
+        problems = validate_records(data, LANGUAGE_SCHEMAS[lang])
+        for problem in problems[:10]:
+            print(f"Warning: {lang} {problem}")
+        previous = load_previous(release_dir, lang)
+        delta = diff_datasets(previous, data)
+        write_outputs(release_dir, lang, data, mode, shard_size)
 
-## Changes
-- Updated pronunciation database
-- Added new words from user submissions
-- Fixed missing pronunciations
-"""
+        digest = data_digest(data)
+        previous_digest = previous_state.get("digest")
+        dump_file(
+            delta_file,
+            {"language": lang, "from": previous_digest, "to": digest, **delta},
+        )
 
-    with open(release_dir / "CHANGELOG.md", "w", encoding="utf-8") as f:
-        f.write(changelog)
+        state["languages"][lang] = {
+            "sources": digests,
+            "mode": mode,
+            "shard_size": shard_size,
+            "digest": digest,
+            "entries": len(data),
+        }
+        summary[lang] = {"entries": len(data), "delta": delta}
+
+    save_state(state_file, state)
+
+    # 生成更新日志
+    atomic_write(release_dir / "CHANGELOG.md", render_changelog(summary))
 
 
 if __name__ == "__main__":
-    generate_release_files()
+    parser = argparse.ArgumentParser(description="Generate pronunciation releases")
+    parser.add_argument(
+        "--mode",
+        choices=RELEASE_MODES,
+        default="full",
+        help="Release layout: one file per language, hash shards, or both",
+    )
+    parser.add_argument(
+        "--shard-size", type=int, default=2000, help="Target entries per shard"
+    )
+    parser.add_argument("--force", action="store_true", help="Rebuild every language")
+    args = parser.parse_args()
+
+    generate_release_files(args.mode, args.shard_size, args.force)
@@ -1,31 +1,61 @@
 #!/usr/bin/env python3
 import asyncio
+import sys
 from pathlib import Path
-from scrapers import CambridgeScraper, MerriamWebsterScraper, JishoScraper, NaverScraper
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from scripts.gather.merge import ENGLISH_FIELD_PRIORITY  # noqa: E402
+from scripts.gather.orchestrator import MultiSourceScraper  # noqa: E402
+from scripts.gather.scrapers import (  # noqa: E402
+    CambridgeScraper,
+    MerriamWebsterScraper,
+    JishoScraper,
+    NaverScraper,
+)
+from scripts.gather.session import SessionManager  # noqa: E402
+
+
+def create_scraper(language: str, sessions: SessionManager):
+    """按语言创建爬虫, 英语同时抓取 Cambridge 和 Merriam-Webster 并合并"""
+    if language == "english":
+        return MultiSourceScraper(
+            "english",
+            [CambridgeScraper(), MerriamWebsterScraper()],
+            field_priority=ENGLISH_FIELD_PRIORITY,
+            session_manager=sessions,
+        )
 
-async def process_language(language: str):
+    scraper_map = {
+        "japanese": JishoScraper,
+        "korean": NaverScraper,
+    }
+    scraper_class = scraper_map.get(language)
+    return scraper_class(session_manager=sessions) if scraper_class else None
+
+
+async def process_language(language: str, sessions: SessionManager):
     """处理特定语言的缺失单词"""
     input_file = Path("temp") / f"{language}_missing_words.txt"
     if not input_file.exists():
         return
 
-    scraper_map = {
-        "english": [CambridgeScraper, MerriamWebsterScraper],
-        "japanese": [JishoScraper],
-        "korean": [NaverScraper],
-    }
+    scraper = create_scraper(language, sessions)
+    if scraper is None:
+        return
 
-    scrapers = scraper_map.get(language, [])
-    for scraper_class in scrapers:
-        scraper = scraper_class()
+    try:
         await scraper.process_word_list(str(input_file))
+    finally:
+        scraper.close()
 
 
 async def main():
     languages = ["english", "japanese", "korean"]
-    for lang in languages:
-        await process_language(lang)
+
+    # 所有语言共用一个连接池, 各语言的抓取同时进行
+    async with SessionManager() as sessions:
+        await asyncio.gather(*[process_language(lang, sessions) for lang in languages])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,422 @@
+# 热点路径基准测试, 在根目录运行:
+#   python benchmarks/run.py --sizes 10k,100k --output benchmarks/results/current.json
+#   python benchmarks/run.py --sizes 10k --compare benchmarks/results/baseline.json
+#
+# 每个基准在合成数据集 (10k/100k/1M 个单词) 或保存的词典页面上运行一个阶段,
+# 记录吞吐量、单次操作的 p50/p99 延迟和 tracemalloc 峰值内存, 结果以 JSON 保存,
+# --compare 与之前的结果对比并在吞吐量下降超过阈值时返回非零状态
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / ".github" / "scripts" / "fetcher"))
+
+# tqdm 在导入时读取 TQDM_* 环境变量, 必须在导入爬虫模块之前关闭进度条
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+from scripts.gather.base_scraper import BasePronunciationScraper  # noqa: E402
+from scripts.gather.codec import available_backends as codec_backends  # noqa: E402
+from scripts.gather.codec import JSONCodec  # noqa: E402
+from scripts.gather.extractors import available_backends  # noqa: E402
+from scripts.gather.ingest import WordIngestor  # noqa: E402
+from scripts.gather.journal import ResultJournal  # noqa: E402
+from scripts.gather.script_detector import detect_language  # noqa: E402
+from scripts.gather.sqlite_store import SQLiteStore  # noqa: E402
+from scripts.gather.scrapers.cambridge_scraper import (  # noqa: E402
+    parse_cambridge_page,
+)
+from scripts.gather.scrapers.jisho_scraper import parse_jisho_page  # noqa: E402
+from scripts.gather.scrapers.merriam_webster_scraper import (  # noqa: E402
+    parse_merriam_webster_page,
+)
+from scripts.gather.scrapers.naver_scraper import parse_naver_page  # noqa: E402
+
+PAGES_DIR = ROOT / "scripts" / "gather" / "fixtures" / "pages"
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# 保存的页面 -> 对应的解析函数
+PAGE_PARSERS = {
+    "cambridge_hello.html": parse_cambridge_page,
+    "cambridge_uk_only.html": parse_cambridge_page,
+    "merriam_webster_hello.html": parse_merriam_webster_page,
+    "jisho_kyou.html": parse_jisho_page,
+    "naver_annyeong.html": parse_naver_page,
+}
+
+
+class Case(NamedTuple):
+    """
+    一次基准运行: operations 中的每一项计时一次, units 为处理的条目数
+    """
+
+    operations: List[Callable[[], Any]]
+    units: int
+
+
+BENCHMARKS: Dict[str, Callable[[int, Path], Case]] = {}
+
+
+def benchmark(name: str):
+    def register(func: Callable[[int, Path], Case]):
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+def synthetic_words(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [
+        "".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) + str(i)
+        for i in range(count)
+    ]
+
+
+def synthetic_records(words: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    return {
+        word: {"word": word, "uk": f"ˈ{word}", "us": f"ˈ{word}ː"} for word in words
+    }
+
+
+def batches(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+class _SyntheticScraper(BasePronunciationScraper):
+    """
+    不访问网络的爬虫, 用于测量调度和落盘的开销
+    """
+
+    fields = ("uk", "us")
+
+    async def get_pronunciation(self, session, word):
+        return {"word": word, "uk": f"ˈ{word}", "us": f"ˈ{word}ː"}
+
+    def find_missing_words(self, data):
+        return []
+
+    def is_empty_data(self, details):
+        return False
+
+
+@benchmark("scrape_pipeline")
+def bench_scrape_pipeline(size: int, workdir: Path) -> Case:
+    """
+    滑动窗口调度 + 后台日志写入, 每 1000 个单词一次 process_specific_words
+    """
+    scraper = _SyntheticScraper(
+        "bench", data_dir=str(workdir), chunk_size=100, window_size=100
+    )
+    operations = [
+        partial(asyncio.run, scraper.process_specific_words(batch, scraper.output_file))
+        for batch in batches(synthetic_words(size), 1000)
+    ]
+    operations.append(scraper.close)
+    return Case(operations, size)
+
+
+@benchmark("parse_pages")
+def bench_parse_pages(size: int, workdir: Path) -> Case:
+    """
+    用各个可用的解析后端解析保存的词典页面, 页面数为单词数的 1/100
+    """
+    pages = [
+        ((PAGES_DIR / page).read_text(encoding="utf-8"), parser)
+        for page, parser in PAGE_PARSERS.items()
+    ]
+    count = max(1, size // 100)
+    operations = [
+        partial(parser, html, backend=backend)
+        for backend in available_backends()
+        for html, parser in (pages[i % len(pages)] for i in range(count))
+    ]
+    return Case(operations, len(operations))
+
+
+@benchmark("journal_append")
+def bench_journal_append(size: int, workdir: Path) -> Case:
+    """
+    结果日志按 1000 条一批追加, 最后压缩为 JSON
+    """
+    journal = ResultJournal(workdir / "journal.json", compact_every=1_000_000)
+    records = synthetic_records(synthetic_words(size))
+    operations = [
+        partial(journal.append, dict(batch), {"last_word": batch[-1][0]})
+        for batch in batches(list(records.items()), 1000)
+    ]
+    operations += [journal.compact, journal.close]
+    return Case(operations, size)
+
+
+@benchmark("sqlite_append")
+def bench_sqlite_append(size: int, workdir: Path) -> Case:
+    """
+    SQLite 存储按 1000 条一批写入, 然后做一次缺失字段查询和 JSON 导出
+    """
+    store = SQLiteStore(workdir / "store.sqlite3", "bench", ("uk", "us"))
+    records = synthetic_records(synthetic_words(size))
+    operations = [
+        partial(store.append, dict(batch), {"last_word": batch[-1][0]})
+        for batch in batches(list(records.items()), 1000)
+    ]
+    operations += [
+        store.missing,
+        partial(store.export_json, workdir / "store.json"),
+        store.close,
+    ]
+    return Case(operations, size)
+
+
+@benchmark("codec_roundtrip")
+def bench_codec_roundtrip(size: int, workdir: Path) -> Case:
+    """
+    各 JSON 后端对完整数据集编码再解码
+    """
+    records = synthetic_records(synthetic_words(size))
+    operations = []
+    for backend in codec_backends():
+        codec = JSONCodec(backend)
+        operations.append(lambda codec=codec: codec.loads(codec.dumps(records)))
+    return Case(operations, size * len(operations))
+
+
+@benchmark("ingest_filter")
+def bench_ingest_filter(size: int, workdir: Path) -> Case:
+    """
+    单词列表规范化、去重并过滤已有单词 (一半单词已存在, 十分之一重复)
+    """
+    words = synthetic_words(size)
+    stream = words + words[: size // 10]
+
+    def run():
+        ingestor = WordIngestor(words[: size // 2])
+        for _ in ingestor.filter(enumerate(stream)):
+            pass
+
+    return Case([run], len(stream))
+
+
+@benchmark("script_detect")
+def bench_script_detect(size: int, workdir: Path) -> Case:
+    """
+    混合文字的单词按语言分类
+    """
+    samples = ["hello", "今日", "안녕", "ひらがな", "中文", "don't", "123"]
+    words = [samples[i % len(samples)] + str(i % 10) for i in range(size)]
+    return Case([lambda: [detect_language(word) for word in words]], size)
+
+
+def _synthetic_trie_sources(size: int, workdir: Path):
+    rng = random.Random(0)
+    phrases = workdir / "phrases.txt"
+    chars = workdir / "chars.txt"
+    with phrases.open("w", encoding="utf-8") as f:
+        f.write("# header\n# header\n")
+        for _ in range(size):
+            length = rng.randint(2, 4)
+            phrase = "".join(chr(0x4E00 + rng.randrange(8000)) for _ in range(length))
+            f.write(f"{phrase}: {' '.join('pin' for _ in range(length))}\n")
+    with chars.open("w", encoding="utf-8") as f:
+        for code in range(0x4E00, 0x4E00 + 8000):
+            f.write(f"U+{code:X}: pīn,yīn  # {chr(code)}\n")
+    return phrases, chars
+
+
+@benchmark("trie_build")
+def bench_trie_build(size: int, workdir: Path) -> Case:
+    """
+    cn.py 从词组和单字文件构建拼音树, 并编码为二进制格式
+    """
+    import cn
+    import cn_binary
+
+    phrases, chars = _synthetic_trie_sources(size, workdir)
+    state = {}
+
+    def build():
+        state["tree"] = cn.build_pinyin_trie(str(phrases), str(chars))
+
+    return Case([build, lambda: cn_binary.encode(state["tree"])], size)
+
+
+@benchmark("pinyin_annotate")
+def bench_pinyin_annotate(size: int, workdir: Path) -> Case:
+    """
+    对合成文本做双向最大匹配标注, 每 10000 字一次操作
+    """
+    import cn
+    from cn_annotator import PinyinAnnotator, synthetic_text
+
+    phrases, chars = _synthetic_trie_sources(min(size, 100_000), workdir)
+    annotator = PinyinAnnotator(cn.build_pinyin_trie(str(phrases), str(chars)))
+    annotator.warm_up()
+    text = synthetic_text(annotator.trie, size)
+    operations = [
+        partial(annotator.bidirectional, chunk) for chunk in batches(text, 10_000)
+    ]
+    return Case(operations, len(text))
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def run_case(
+    name: str, size: int, measure_memory: bool = True
+) -> Dict[str, Any]:
+    """
+    运行一个基准: 先计时, 再 (可选) 在 tracemalloc 下重跑一次测量峰值内存
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        case = BENCHMARKS[name](size, Path(workdir))
+        latencies = []
+        start = time.perf_counter()
+        for operation in case.operations:
+            op_start = time.perf_counter()
+            operation()
+            latencies.append(time.perf_counter() - op_start)
+        seconds = time.perf_counter() - start
+
+    peak_mb = None
+    if measure_memory:
+        with tempfile.TemporaryDirectory() as workdir:
+            tracemalloc.start()
+            case = BENCHMARKS[name](size, Path(workdir))
+            for operation in case.operations:
+                operation()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            tracemalloc.stop()
+
+    return {
+        "name": name,
+        "size": size,
+        "units": case.units,
+        "seconds": seconds,
+        "throughput": case.units / seconds if seconds else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "peak_mb": peak_mb,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parser_backends": available_backends(),
+        "json_backends": codec_backends(),
+    }
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], threshold: float
+) -> List[str]:
+    """
+    按 (名称, 规模) 与基线对比, 返回吞吐量下降超过阈值的项
+    """
+    previous = {(r["name"], r["size"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get((result["name"], result["size"]))
+        if not old or not old["throughput"]:
+            continue
+        ratio = result["throughput"] / old["throughput"]
+        line = f"{result['name']:>16} {result['size']:>8}: {ratio:6.2f}x throughput"
+        print(line)
+        if ratio < 1 - threshold:
+            regressions.append(line)
+    return regressions
+
+
+def parse_size(text: str) -> int:
+    return SIZES.get(text.lower()) or int(text)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Hot path benchmarks")
+    parser.add_argument("--sizes", default="10k", help="Comma list: 10k,100k,1m")
+    parser.add_argument(
+        "--only", default="", help=f"Comma list of: {', '.join(BENCHMARKS)}"
+    )
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Throughput drop that counts as a regression",
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip the tracemalloc pass"
+    )
+    args = parser.parse_args(argv)
+
+    # 先配置日志, 爬虫不会在当前目录创建日志文件
+    logging.basicConfig(level=logging.WARNING)
+
+    names = [name for name in args.only.split(",") if name] or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = []
+    for size in (parse_size(text) for text in args.sizes.split(",")):
+        for name in names:
+            result = run_case(name, size, measure_memory=not args.no_memory)
+            results.append(result)
+            memory = (
+                f"{result['peak_mb']:8.1f} MB" if result["peak_mb"] is not None else ""
+            )
+            print(
+                f"{name:>16} {size:>8}: {result['throughput']:12.0f}/s "
+                f"p50 {result['p50_ms']:8.2f} ms p99 {result['p99_ms']:8.2f} ms "
+                f"{memory}"
+            )
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with output.open("w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("Regressions:")
+            print("\n".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+import asyncio
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Any, Callable, Deque, Iterator, Optional, Union
+
+
+def _fsync_dir(directory: Path) -> None:
+    """
+    同步目录项, 保证 rename 在断电后仍然生效 (不支持的平台上忽略)
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def rotate_backups(path: Path, backups: int) -> None:
+    """
+    轮转备份: path.bak.1 为最近一次的版本, 最多保留 backups 份
+    """
+    path = Path(path)
+    if backups <= 0 or not path.exists():
+        return
+
+    for index in range(backups - 1, 0, -1):
+        older = path.with_name(f"{path.name}.bak.{index}")
+        if older.exists():
+            os.replace(older, path.with_name(f"{path.name}.bak.{index + 1}"))
+
+    # 用硬链接保留旧版本, 目标文件在替换前始终存在
+    latest = path.with_name(f"{path.name}.bak.1")
+    latest.unlink(missing_ok=True)
+    try:
+        os.link(path, latest)
+    except OSError:
+        shutil.copy2(path, latest)
+
+
+@contextlib.contextmanager
+def atomic_open(
+    path: Path,
+    mode: str = "w",
+    backups: int = 0,
+    fsync: bool = True,
+    encoding: Optional[str] = "utf-8",
+) -> Iterator[IO]:
+    """
+    以原子方式写文件: 写入同目录的临时文件, fsync 后 rename 覆盖目标
+
+    写入过程中出错或进程被杀死时, 目标文件保持原样
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    tmp_path = Path(tmp_name)
+    try:
+        # mkstemp 创建的文件只有属主可读写, 沿用原文件的权限
+        os.chmod(tmp_path, path.stat().st_mode & 0o777 if path.exists() else 0o644)
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else encoding) as f:
+            yield f
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        rotate_backups(path, backups)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    if fsync:
+        _fsync_dir(path.parent)
+
+
+def atomic_write(
+    path: Path, content: Union[str, bytes], backups: int = 0, fsync: bool = True
+) -> None:
+    """
+    原子地写入文本或字节内容
+    """
+    mode = "wb" if isinstance(content, bytes) else "w"
+    with atomic_open(path, mode, backups=backups, fsync=fsync) as f:
+        f.write(content)
+
+
+def atomic_write_json(
+    path: Path, data: Any, backups: int = 0, fsync: bool = True, **kwargs
+) -> None:
+    """
+    原子地写入 JSON, 其余参数传给 json.dump
+    """
+    kwargs.setdefault("ensure_ascii", False)
+    with atomic_open(path, backups=backups, fsync=fsync) as f:
+        json.dump(data, f, **kwargs)
+
+
+class BackgroundWriter:
+    """
+    后台写入线程
+
+    所有写入在同一个线程中按提交顺序执行, 事件循环中的抓取任务无需等待磁盘;
+    待完成的写入超过 max_pending 时提交方才会等待最早的一批, 形成背压
+    """
+
+    def __init__(self, max_pending: int = 8):
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Deque[asyncio.Future] = deque()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="background-writer"
+            )
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        """
+        已提交但尚未确认完成的写入数
+        """
+        return len(self._pending)
+
+    async def submit(self, func: Callable[..., Any], *args: Any) -> asyncio.Future:
+        """
+        提交一次写入并立即返回其 Future
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_executor(), func, *args)
+        self._pending.append(future)
+
+        while len(self._pending) > self.max_pending:
+            await self._pending.popleft()
+        return future
+
+    async def drain(self) -> None:
+        """
+        等待所有已提交的写入完成, 写入出错时在这里抛出
+        """
+        while self._pending:
+            await self._pending.popleft()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -1,16 +1,41 @@
 import argparse
 import asyncio
-import json
+import contextlib
 import logging
+import time
 from asyncio import Semaphore
-from itertools import dropwhile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Callable, Dict, Generator, List, Optional
+from urllib.parse import urlsplit
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import aiohttp
 from aiohttp import ClientTimeout
 from tqdm import tqdm
 
+from .atomic import BackgroundWriter
+from .cache import CACHE_MODES, CachedResponse, ResponseCache
+from .codec import dump_file, load_file
+from .extractors import BACKENDS, available_backends
+from .ingest import SEEN_FILTERS, WordEntry, WordIngestor, line_digest
+from .journal import ResultJournal
+from .metrics import CrawlMetrics, MetricsReporter
+from .ratelimit import AdaptiveRateLimiter, backoff_delay, parse_retry_after
+from .scheduler import SlidingWindowScheduler
+from .session import SessionManager
+from .sqlite_store import SQLiteStore
+
 
 def make_chunks(
     data: iter, chunk_size: int, item_func: Optional[Callable[[Any], Any]] = None
@@ -35,6 +60,39 @@ def make_chunks(
             yield chunk
 
 
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+PARSE_EXECUTORS = ("inline", "thread", "process")
+
+STORAGE_BACKENDS = ("journal", "sqlite")
+
+
+def is_retryable_status(status: int) -> bool:
+    """
+    限流和服务端错误值得重试, 其它状态 (如 404) 重试也没有意义
+    """
+    return status == 429 or status >= 500
+
+
+def count_lines(path: Path) -> int:
+    """
+    按块统计文件行数, 用于按输入大小分配布隆过滤器
+    """
+    lines = 0
+    last = b"\n"
+    with Path(path).open("rb") as f:
+        while chunk := f.read(1 << 20):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    return lines + (last != b"\n")
+
+
 def item_clean(x):
     """
     默认的item清理函数
@@ -43,6 +101,9 @@ def item_clean(x):
 
 
 class BasePronunciationScraper:
+    # 每条记录包含的发音字段, 由子类声明
+    fields: Tuple[str, ...] = ()
+
     def __init__(
         self,
         name: str,
@@ -51,29 +112,100 @@ class BasePronunciationScraper:
         retry_attempts: int = 3,
         retry_delay: int = 5,
         output_file: Optional[str] = None,
+        data_dir: Optional[str] = None,
+        journal_segment_size: int = 10000,
+        journal_compact_every: int = 20,
+        parse_executor: Union[None, str, Executor] = None,
+        parse_workers: Optional[int] = None,
+        parser_backend: Optional[str] = None,
+        window_size: Optional[int] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        session_manager: Optional[SessionManager] = None,
+        cache: Union[None, str, ResponseCache] = None,
+        cache_ttl: float = 7 * 24 * 3600,
+        seen_filter: str = "exact",
+        storage: str = "journal",
+        endpoints: Optional[Dict[str, str]] = None,
+        metrics: Optional[CrawlMetrics] = None,
+        metrics_file: Optional[str] = None,
+        metrics_interval: float = 30.0,
+        metrics_port: Optional[int] = None,
     ):
         # 名称
         self.name = name
 
         # 数据目录
-        self.data_dir = Path("../../data/processed")
-        self.data_dir.mkdir(exist_ok=True)
+        self.data_dir = Path(data_dir or "../../data/processed")
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+        # 覆盖默认的请求地址, 例如指向本地的模拟服务器做压测
+        self.endpoints = dict(endpoints or {})
 
         # 并发限制
         self.semaphore = Semaphore(concurrent_limit)
         self.timeout = ClientTimeout(total=30, connect=10, sock_read=10)
+        self.headers = dict(DEFAULT_HEADERS)
+
+        # 按主机的自适应限流, 多个爬虫可共用同一个限流器
+        self.rate_limiter = rate_limiter
+
+        # 连接池, 传入共享的 SessionManager 时所有爬虫复用同一批连接
+        self.sessions = session_manager or SessionManager(timeout=self.timeout)
+
+        # 爬取指标, 多个爬虫可共用同一个 CrawlMetrics; 配置后定期写入 JSON 快照,
+        # metrics_port 开启 /metrics (Prometheus 文本) 和 /stats 端点
+        self.metrics = metrics or CrawlMetrics()
+        self.metrics_file = self.data_dir / metrics_file if metrics_file else None
+        self.metrics_interval = metrics_interval
+        self.metrics_port = metrics_port
+
+        # 本地响应缓存, 解析逻辑修改后重跑无需重新下载; 传入模式名时缓存放在数据目录下
+        if isinstance(cache, str):
+            cache = ResponseCache(self.data_dir / "http_cache", cache_ttl, mode=cache)
+        self.cache = cache
+
+        # 解析执行器: None/"inline" 在事件循环内解析, "thread"/"process" 或自定义 Executor
+        if isinstance(parse_executor, str) and parse_executor not in PARSE_EXECUTORS:
+            raise ValueError(f"Unknown parse executor: {parse_executor}")
+        self.parse_executor = parse_executor
+        self.parse_workers = parse_workers
+        self._executor: Optional[Executor] = None
+
+        # HTML 提取后端, None 时自动选择最快的可用后端
+        if parser_backend and parser_backend not in available_backends():
+            raise ValueError(f"Parser backend not available: {parser_backend}")
+        self.parser_backend = parser_backend
 
         # 重试和批处理
         self.retry_attempts = retry_attempts
         self.retry_delay = retry_delay
         self.chunk_size = chunk_size
 
+        # 同时在处理中的单词数, 默认与原先每批的数量一致
+        self.window_size = window_size or chunk_size
+
+        # 单词列表去重方式, 超大列表可用布隆过滤器限制内存
+        if seen_filter not in SEEN_FILTERS:
+            raise ValueError(f"Unknown seen filter: {seen_filter}")
+        self.seen_filter = seen_filter
+
         # 文件
         self.checkpoint_file = self.data_dir / f"{self.name}_checkpoint.json"
         self.output_file = self.data_dir / (
             output_file or f"{self.name}_pronunciation_data.json"
         )
 
+        # 结果存储: 追加写入的 JSONL 日志, 或以 SQLite 数据库为准并导出 JSON
+        if storage not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage backend: {storage}")
+        self.storage = storage
+        self.journal_segment_size = journal_segment_size
+        self.journal_compact_every = journal_compact_every
+        self.journal = self.open_journal(self.output_file)
+
+        # 日志追加和压缩在后台线程中按顺序执行, 不阻塞事件循环
+        self.writer = BackgroundWriter()
+
         # 日志
         logging.basicConfig(
             filename=f"{self.name}_scraping.log",
@@ -81,22 +213,212 @@ class BasePronunciationScraper:
             format="%(asctime)s - %(levelname)s - %(message)s",
         )
 
+    def open_journal(self, output_file: Path) -> Union[ResultJournal, SQLiteStore]:
+        """
+        打开输出文件对应的结果日志, sqlite 存储时数据库与输出文件同名
+        """
+        legacy_checkpoint = (
+            self.checkpoint_file if output_file == self.output_file else None
+        )
+        if self.storage == "sqlite":
+            return SQLiteStore(
+                output_file.with_suffix(".sqlite3"),
+                self.name,
+                self.fields,
+                output_file=output_file,
+                legacy_checkpoint=legacy_checkpoint,
+            )
+        return ResultJournal(
+            output_file,
+            segment_size=self.journal_segment_size,
+            compact_every=self.journal_compact_every,
+            legacy_checkpoint=legacy_checkpoint,
+        )
+
+    def endpoint(self, name: str, default: str) -> str:
+        """
+        请求地址, endpoints 中配置了同名项时使用配置的地址
+        """
+        return self.endpoints.get(name, default)
+
     def load_checkpoint(self) -> Dict[str, Any]:
         """
         加载检查点
         """
-        if not self.checkpoint_file.exists():
-            return {"last_word": "", "processed_count": 0}
-
-        with self.checkpoint_file.open("r") as f:
-            return json.load(f)
+        return self.journal.last_checkpoint()
 
     def save_checkpoint(self, word: str, count: int) -> None:
         """
         保存检查点
         """
-        with self.checkpoint_file.open("w") as f:
-            json.dump({"last_word": word, "processed_count": count}, f)
+        self.journal.checkpoint(word, count)
+
+    def get_parse_executor(self) -> Optional[Executor]:
+        """
+        按配置创建解析执行器, inline 模式返回 None
+        """
+        if self.parse_executor in (None, "inline"):
+            return None
+        if isinstance(self.parse_executor, Executor):
+            return self.parse_executor
+
+        if self._executor is None:
+            if self.parse_executor == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.parse_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.parse_workers)
+        return self._executor
+
+    def close(self) -> None:
+        """
+        关闭自行创建的解析执行器、后台写入线程和结果日志
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.writer.close()
+        self.journal.close()
+
+    async def fetch_html(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        retry_attempts: Optional[int] = None,
+    ) -> Optional[str]:
+        """
+        获取页面, 配置了响应缓存时先查缓存, 过期条目用条件请求重新验证
+        """
+        return (await self.fetch_page(session, url, retry_attempts))[1]
+
+    async def fetch_page(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        retry_attempts: Optional[int] = None,
+    ) -> Tuple[Optional[int], Optional[str]]:
+        """
+        获取页面及其状态码
+
+        成功时为 (200, 页面); 404 等不重试的状态为 (状态码, None); 重试用尽、网络错误
+        或 replay 模式下未缓存时为 (None, None), 调用方可据此区分临时失败
+        """
+        cached = None
+        if self.cache is not None and self.cache.enabled:
+            cached = await asyncio.to_thread(self.cache.lookup, url)
+            if cached is not None and (cached.fresh or self.cache.offline):
+                self.metrics.count("cache_hits")
+                return 200, cached.body
+            if self.cache.offline:
+                return None, None
+
+        return await self._download(session, url, retry_attempts, cached)
+
+    async def _download(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        retry_attempts: Optional[int] = None,
+        cached: Optional[CachedResponse] = None,
+    ) -> Tuple[Optional[int], Optional[str]]:
+        """
+        下载页面, 429/5xx 和网络错误按指数退避重试, 其它非 200 状态直接放弃
+        """
+        attempts = self.retry_attempts if retry_attempts is None else retry_attempts
+        host = urlsplit(url).netloc
+        headers = {**self.headers, **ResponseCache.conditional_headers(cached)}
+
+        for attempt in range(attempts):
+            retry_after = None
+            start = time.monotonic()
+            try:
+                async with self._request_slot(host):
+                    start = time.monotonic()
+                    async with session.get(
+                        url, headers=headers, timeout=self.timeout
+                    ) as response:
+                        if response.status == 200:
+                            html = await response.text()
+                            self._record_response(host, 200, start)
+                            if self.cache is not None and self.cache.enabled:
+                                await self._update_cache(
+                                    self.cache.store, url, html, response.headers
+                                )
+                            return 200, html
+
+                        if response.status == 304 and cached is not None:
+                            self._record_response(host, 304, start)
+                            await self._update_cache(self.cache.touch, url)
+                            return 200, cached.body
+
+                        retry_after = parse_retry_after(
+                            response.headers.get("Retry-After")
+                        )
+                        self._record_response(
+                            host, response.status, start, retry_after
+                        )
+                        if not is_retryable_status(response.status):
+                            return response.status, None
+
+            except Exception as e:
+                self._record_response(host, None, start)
+                if attempt == attempts - 1:
+                    logging.error(f"Error fetching {url}: {str(e)}")
+
+            if attempt < attempts - 1:
+                self.metrics.record_retry(host)
+                await asyncio.sleep(
+                    retry_after or backoff_delay(attempt, self.retry_delay)
+                )
+
+        return None, None
+
+    async def _update_cache(self, method, url: str, *args) -> None:
+        """
+        在线程中写入缓存; 写入失败 (磁盘已满等) 只记录日志, 不影响已成功的请求
+        """
+        try:
+            await asyncio.to_thread(method, url, *args)
+        except Exception as e:
+            logging.error(f"Error caching {url}: {str(e)}")
+
+    def _request_slot(self, host: str):
+        """
+        有限流器时占用主机名额, 否则不做限制
+        """
+        if self.rate_limiter is None:
+            return contextlib.nullcontext()
+        return self.rate_limiter.slot(host)
+
+    def _record_response(
+        self,
+        host: str,
+        status: Optional[int],
+        start: float,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        self.metrics.observe_request(host, status, time.monotonic() - start)
+        if self.rate_limiter is not None:
+            self.rate_limiter.record(
+                host, status, time.monotonic() - start, retry_after
+            )
+
+    async def parse(self, extractor: Callable[[str], Any], html: str) -> Any:
+        """
+        用纯函数解析页面, 可交给线程池或进程池执行, 解析失败返回 None
+        """
+        start = time.perf_counter()
+        try:
+            executor = self.get_parse_executor()
+            if executor is None:
+                return extractor(html)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, extractor, html)
+        except Exception as e:
+            self.metrics.count("parse_errors")
+            logging.error(f"Error parsing with {extractor}: {str(e)}")
+            return None
+        finally:
+            self.metrics.observe("parse", time.perf_counter() - start)
 
     async def get_pronunciation(
         self, session: aiohttp.ClientSession, word: str
@@ -117,47 +439,189 @@ class BasePronunciationScraper:
         )
         return {_["word"]: _ for _ in results if _ is not None}
 
+    def _resume_position(
+        self, f: BinaryIO, checkpoint: Dict[str, Any]
+    ) -> Tuple[int, int]:
+        """
+        根据检查点计算续传的 (行号, 字节偏移)
+
+        检查点带有字节偏移和行哈希时直接定位并校验该行; 校验失败 (文件被修改) 或
+        旧版检查点时退回到按行号或按单词扫描
+        """
+        start = checkpoint.get("line")
+        offset = checkpoint.get("offset")
+        if start is not None and offset is not None:
+            f.seek(offset)
+            raw = f.readline()
+            if raw and line_digest(raw) == checkpoint.get("hash"):
+                return start, offset + len(raw)
+            logging.warning("Checkpoint line changed, locating it by line number")
+
+        f.seek(0)
+        position = 0
+        if start:
+            for line_no, raw in enumerate(f, 1):
+                position += len(raw)
+                if line_no == start:
+                    break
+            return start, position
+
+        last_word = checkpoint.get("last_word")
+        if last_word:
+            # 旧版检查点只记录了最后的单词, 跳过它及之前的行
+            for line_no, raw in enumerate(f, 1):
+                position += len(raw)
+                if item_clean(raw.decode("utf-8", errors="replace")) == last_word:
+                    return line_no, position
+            logging.warning(f"Checkpoint word {last_word} not found, restarting")
+
+        return 0, 0
+
+    def iter_word_list(
+        self, f: BinaryIO, checkpoint: Dict[str, Any]
+    ) -> Generator[WordEntry, None, None]:
+        """
+        按行读取单词列表 (二进制模式), 从检查点之后继续, 产出 WordEntry
+        """
+        line_no, offset = self._resume_position(f, checkpoint)
+        f.seek(offset)
+        for raw in f:
+            if word := item_clean(raw.decode("utf-8", errors="replace")):
+                yield WordEntry(line_no, word, offset, line_digest(raw))
+            line_no += 1
+            offset += len(raw)
+
+    async def _scrape(
+        self,
+        session: aiohttp.ClientSession,
+        entries: Iterable[Tuple[int, str]],
+        journal: Union[ResultJournal, SQLiteStore],
+        desc: str,
+        total: Optional[int] = None,
+        checkpoint: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        用滑动窗口调度抓取 (行号, 单词), 结果按批追加到日志
+
+        传入 checkpoint 时, 每次落盘都会带上按输入顺序推进的低水位
+        """
+        buffer: Dict[str, Dict[str, Any]] = {}
+        count = checkpoint["processed_count"] if checkpoint else 0
+        flush_lock = asyncio.Lock()
+        progress = tqdm(total=total, desc=desc)
+
+        async def flush(low_water: Optional[Tuple[int, str]]) -> None:
+            nonlocal buffer, count
+            async with flush_lock:
+                results, buffer = buffer, {}
+                count += len(results)
+                marker = None
+                if checkpoint is not None and low_water is not None:
+                    marker = {
+                        "last_word": low_water[1],
+                        "processed_count": count,
+                        "line": low_water[0] + 1,
+                    }
+                    if getattr(low_water, "offset", None) is not None:
+                        marker["offset"] = low_water.offset
+                        marker["hash"] = low_water.digest
+                if results or marker:
+                    await self._append_results(journal, results, marker)
+
+        async def worker(entry: Tuple[int, str]) -> Optional[Dict[str, Any]]:
+            return await self.get_pronunciation(session, entry[1])
+
+        async def on_result(entry, result) -> None:
+            progress.update()
+            self.metrics.count("words_failed" if result is None else "words_scraped")
+            if result is not None:
+                buffer[result["word"]] = result
+            if len(buffer) >= self.chunk_size:
+                await flush(scheduler.low_water)
+
+        scheduler = SlidingWindowScheduler(
+            worker,
+            self.window_size,
+            on_result=on_result,
+            on_checkpoint=flush,
+            checkpoint_every=self.chunk_size,
+        )
+        gauges = {
+            "in_flight": lambda: scheduler.in_flight,
+            "reorder_backlog": lambda: scheduler.backlog,
+            "buffered_results": lambda: len(buffer),
+            "pending_writes": lambda: self.writer.pending,
+        }
+        for name, read in gauges.items():
+            self.metrics.set_gauge(name, read)
+
+        try:
+            async with self.metrics_reporter():
+                try:
+                    await scheduler.run(entries)
+                finally:
+                    await flush(scheduler.low_water)
+                    await self.writer.drain()
+                    progress.close()
+        finally:
+            for name in gauges:
+                self.metrics.remove_gauge(name)
+
+        return scheduler.completed
+
+    def metrics_reporter(self) -> MetricsReporter:
+        """
+        爬取期间定期写入指标快照 (含限流器状态), 按配置开启 HTTP 端点
+        """
+        return MetricsReporter(
+            self.metrics,
+            self.metrics_file,
+            interval=self.metrics_interval,
+            port=self.metrics_port,
+            extra=lambda: {
+                "source": self.name,
+                "rate_limiter": (
+                    self.rate_limiter.snapshot() if self.rate_limiter else {}
+                ),
+            },
+        )
+
     async def process_word_list(
         self, input_file: str = "filtered_words.txt"
-    ) -> Dict[str, Dict[str, Any]]:
+    ) -> int:
         """
-        处理单词列表,适用于大量单词抓取
+        处理单词列表,适用于大量单词抓取, 返回输出中的记录数
         """
 
-        # 加载检查点和数据
+        # 加载检查点, 数据只在日志中追加, 无需整体读入
         checkpoint = self.load_checkpoint()
-        last_word = checkpoint["last_word"]
-        pronunciations = (
-            json.load(self.output_file.open("r")) if self.output_file.exists() else {}
+
+        # 已抓取的单词和列表中的重复项在请求前过滤掉; 是否已抓取由存储自己判断
+        # (日志读单词索引, SQLite 查主键), 不读入已有的记录. 日志第一次查询时才读取
+        # (必要时重建) 索引, 放到线程中完成
+        await asyncio.to_thread(self.journal.contains, "")
+        expected_words = 1
+        if self.seen_filter == "bloom":
+            expected_words = await asyncio.to_thread(count_lines, Path(input_file))
+        ingestor = WordIngestor(
+            seen_filter=self.seen_filter,
+            expected_words=expected_words,
+            contains=self.journal.contains,
         )
 
         # 读取并处理单词列表
-        async with aiohttp.ClientSession() as session:
-            with Path(input_file).open("r") as f:
-
-                # 单次循环直接分批处理单词
-                for batch in tqdm(
-                    make_chunks(
-                        data=dropwhile(
-                            lambda x: (not last_word or x.strip() == last_word), f
-                        ),
-                        chunk_size=self.chunk_size,
-                        item_func=item_clean,
-                    ),
+        async with self.sessions.session() as session:
+            with Path(input_file).open("rb") as f:
+                await self._scrape(
+                    session,
+                    ingestor.filter(self.iter_word_list(f, checkpoint)),
+                    self.journal,
                     desc="Processing words",
-                ):
-                    # 处理单词批次
-                    if batch_results := await self.process_word_batch(session, batch):
-                        await self._save_data(
-                            data=pronunciations,
-                            last_word=batch[-1],
-                            count=len(pronunciations),
-                        )
-                        pronunciations.update(batch_results)
-
-                    await asyncio.sleep(0.1)
+                    checkpoint=checkpoint,
+                )
 
-        return pronunciations
+        logging.info(ingestor.summary())
+        return await asyncio.to_thread(self.journal.compact)
 
     async def complete_missing_data(self, data_file: Optional[str] = None) -> None:
         """
@@ -166,16 +630,15 @@ class BasePronunciationScraper:
         if not data_file:
             data_file = self.output_file
 
-        with data_file.open("r") as f:
-            data = json.load(f)
-
-        missing_words = self.find_missing_words(data)
+        journal = self.open_journal(Path(data_file))
+        missing_words = self._missing_words(journal)
+        journal.close()
         if not missing_words:
             logging.info("未找到缺失数据")
             return
 
         logging.info(f"找到 {len(missing_words)} 个缺失数据")
-        await self.process_specific_words(missing_words, data_file)
+        await self.process_specific_words(missing_words, Path(data_file))
 
     def find_missing_words(self, data: Dict[str, Dict[str, Any]]) -> List[str]:
         """
@@ -183,38 +646,56 @@ class BasePronunciationScraper:
         """
         raise NotImplementedError("子类必须实现 find_missing_words 方法")
 
+    def _missing_words(self, journal: Union[ResultJournal, SQLiteStore]) -> List[str]:
+        """
+        有字段为空的单词; SQLite 存储直接走缺失字段索引, 无需读入全部数据
+        """
+        if isinstance(journal, SQLiteStore) and self.fields:
+            return journal.missing(self.fields)
+        return self.find_missing_words(journal.load())
+
     async def process_specific_words(self, words: List[str], output_file: Path) -> None:
         """
         处理特定的单词列表
         """
-        async with aiohttp.ClientSession() as session:
-            for i in tqdm(
-                range(0, len(words), self.chunk_size),
-                desc="Processing missing words",
-            ):
-                batch = words[i : i + self.chunk_size]
-                results = await self.process_word_batch(session, batch)
-
-                if results:
-                    # 更新现有数据
-                    with output_file.open("r") as f:
-                        data = json.load(f)
-                    data.update(results)
+        journal = self.open_journal(output_file)
 
-                    with output_file.open("w") as f:
-                        json.dump(data, f, indent=2)
+        async with self.sessions.session() as session:
+            await self._scrape(
+                session,
+                enumerate(words),
+                journal,
+                desc="Processing missing words",
+                total=len(words),
+            )
 
-                await asyncio.sleep(0.1)
+        await asyncio.to_thread(journal.compact)
+        journal.close()
 
-    async def _save_data(
-        self, data: Dict[str, Dict[str, Any]], last_word: str, count: int
+    async def _append_results(
+        self,
+        journal: Union[ResultJournal, SQLiteStore],
+        results: Dict[str, Dict[str, Any]],
+        checkpoint: Optional[Dict[str, Any]] = None,
     ) -> None:
         """
-        保存数据和检查点
+        交给后台写入线程追加结果, 分段过多时顺带压缩
         """
-        with self.output_file.open("w") as f:
-            json.dump(data, f, ensure_ascii=False)
-        self.save_checkpoint(last_word, count)
+        await self.writer.submit(self._persist, journal, results, checkpoint)
+
+    def _persist(
+        self,
+        journal: Union[ResultJournal, SQLiteStore],
+        results: Dict[str, Dict[str, Any]],
+        checkpoint: Optional[Dict[str, Any]],
+    ) -> None:
+        start = time.perf_counter()
+        journal.append(results, checkpoint)
+        self.metrics.observe("persist", time.perf_counter() - start)
+        if journal.needs_compaction():
+            start = time.perf_counter()
+            journal.compact()
+            self.metrics.observe("compact", time.perf_counter() - start)
 
     async def generate_pronunciation_json(
         self, input_file: Optional[str] = None, accent: str = "us"
@@ -231,8 +712,7 @@ class BasePronunciationScraper:
             return
 
         # 读取原始数据
-        with open(data_path, "r") as f:
-            raw_data = json.load(f)
+        raw_data = await asyncio.to_thread(load_file, data_path)
 
         # 生成简化的发音数据
         pronunciation_data = {}
@@ -242,8 +722,7 @@ class BasePronunciationScraper:
 
         # 保存生成的文件
         output_file = self.data_dir / f"{self.name}_{accent}_pronunciations.json"
-        with open(output_file, "w") as f:
-            json.dump(pronunciation_data, f, indent=2)
+        await asyncio.to_thread(dump_file, output_file, pronunciation_data)
 
         logging.info(
             f"Generated {accent} pronunciation file: {output_file} "
@@ -258,43 +737,41 @@ class BasePronunciationScraper:
             data_file = f"{self.name}_pronunciation_data.json"
 
         data_path = self.data_dir / data_file
-        if not data_path.exists():
+        journal = self.open_journal(data_path)
+        if not journal.exists():
             logging.error(f"Data file not found: {data_path}")
+            journal.close()
             return
 
-        # 读取现有数据
-        with open(data_path, "r") as f:
-            data = json.load(f)
-
         # 找出空数据的单词
-        empty_words = []
-        for word, details in data.items():
-            if self.is_empty_data(details):
-                empty_words.append(word)
+        if isinstance(journal, SQLiteStore) and self.fields:
+            empty_words = journal.missing(self.fields)
+        else:
+            empty_words = [
+                word
+                for word, details in journal.load().items()
+                if self.is_empty_data(details)
+            ]
 
         if not empty_words:
             logging.info("No empty data found")
+            journal.close()
             return
 
         logging.info(f"Found {len(empty_words)} words with empty data")
 
         # 重试抓取
-        async with aiohttp.ClientSession() as session:
-            for i in tqdm(
-                range(0, len(empty_words), self.chunk_size),
+        async with self.sessions.session() as session:
+            await self._scrape(
+                session,
+                enumerate(empty_words),
+                journal,
                 desc="Retrying empty data",
-            ):
-                batch = empty_words[i : i + self.chunk_size]
-                results = await self.process_word_batch(session, batch)
+                total=len(empty_words),
+            )
 
-                if results:
-                    # 更新数据
-                    data.update(results)
-                    # 保存更新后的数据
-                    with open(data_path, "w") as f:
-                        json.dump(data, f, indent=2)
-
-                await asyncio.sleep(0.5)
+        await asyncio.to_thread(journal.compact)
+        journal.close()
 
     def is_empty_data(self, details: Dict[str, Any]) -> bool:
         """
@@ -303,6 +780,19 @@ class BasePronunciationScraper:
         raise NotImplementedError("子类必须实现 is_empty_data 方法")
 
 
+def parse_endpoints(values: Iterable[str]) -> Dict[str, str]:
+    """
+    解析命令行中的 NAME=URL 列表
+    """
+    endpoints = {}
+    for value in values:
+        name, sep, url = value.partition("=")
+        if not sep or not name or not url:
+            raise ValueError(f"Endpoint must be NAME=URL: {value}")
+        endpoints[name] = url
+    return endpoints
+
+
 def create_argument_parser():
     parser = argparse.ArgumentParser(description="Pronunciation data scraper")
     parser.add_argument(
@@ -327,4 +817,76 @@ def create_argument_parser():
         default=5,
         help="Number of concurrent requests",
     )
+    parser.add_argument(
+        "--parse-executor",
+        choices=PARSE_EXECUTORS,
+        default="inline",
+        help="Where HTML pages are parsed",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Number of parser threads/processes",
+    )
+    parser.add_argument(
+        "--parser-backend",
+        choices=BACKENDS,
+        default=None,
+        help="HTML extraction backend (default: fastest installed)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help="Enable adaptive per-host rate limiting starting at this many req/s",
+    )
+    parser.add_argument(
+        "--cache",
+        choices=CACHE_MODES,
+        default="normal",
+        help="Local response cache: off, normal (revalidate when stale) or replay",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=7 * 24 * 3600,
+        help="Seconds before a cached page is revalidated",
+    )
+    parser.add_argument(
+        "--seen-filter",
+        choices=SEEN_FILTERS,
+        default="exact",
+        help="Word list de-duplication: exact set or Bloom filter",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=STORAGE_BACKENDS,
+        default="journal",
+        help="Result storage: JSONL journal or SQLite database exported to JSON",
+    )
+    parser.add_argument(
+        "--endpoint",
+        action="append",
+        default=[],
+        metavar="NAME=URL",
+        help="Override a request URL, e.g. base=http://127.0.0.1:8080/cambridge/",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=None,
+        help="Write periodic JSON metrics snapshots to this file in the data dir",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=30.0,
+        help="Seconds between metrics snapshots",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve /metrics (Prometheus text) and /stats on this local port",
+    )
     return parser
@@ -0,0 +1,186 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from .atomic import atomic_open, atomic_write_json
+
+CACHE_MODES = ("off", "normal", "replay")
+
+
+class CachedResponse(NamedTuple):
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    fresh: bool
+
+
+class ResponseCache:
+    """
+    本地 HTTP 响应缓存
+
+    以 URL 的 sha256 为键, 页面 gzip 压缩后与 ETag/Last-Modified 元数据一起保存;
+    过期的条目通过条件请求重新验证, 总大小超过上限时按最近访问时间淘汰.
+    replay 模式只读缓存, 不访问网络
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        ttl: float = 7 * 24 * 3600,
+        max_bytes: int = 2 * 1024**3,
+        mode: str = "normal",
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode}")
+
+        self.root = Path(root)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.mode = mode
+
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def offline(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _paths(self, url: str):
+        key = self.key(url)
+        directory = self.root / key[:2]
+        return directory / f"{key}.gz", directory / f"{key}.json"
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """
+        读取缓存条目, 不存在或已损坏时返回 None
+        """
+        body_path, meta_path = self._paths(url)
+        try:
+            with meta_path.open("r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with gzip.open(body_path, "rt", encoding="utf-8") as f:
+                body = f.read()
+            # 更新访问时间, 淘汰时据此判断冷热; 条目可能刚被其他线程淘汰
+            os.utime(body_path)
+        except (OSError, ValueError, EOFError):
+            return None
+
+        return CachedResponse(
+            body=body,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            stored_at=meta["stored_at"],
+            fresh=time.time() - meta["stored_at"] < self.ttl,
+        )
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CachedResponse]) -> Dict[str, str]:
+        """
+        重新验证过期条目所需的请求头
+        """
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    @staticmethod
+    def _write_meta(meta_path: Path, meta: Dict[str, Any]) -> None:
+        atomic_write_json(meta_path, meta, fsync=False)
+
+    def store(self, url: str, body: str, headers: Mapping[str, str]) -> None:
+        """
+        保存响应及其验证信息
+        """
+        body_path, meta_path = self._paths(url)
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            old_size = body_path.stat().st_size
+        except FileNotFoundError:
+            old_size = 0
+
+        # 每次写入使用唯一的临时文件, 同一 URL 并发保存时不会发布写了一半的文件
+        with atomic_open(body_path, "wb", fsync=False) as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                f.write(body.encode("utf-8"))
+            new_size = raw.tell()
+
+        self._write_meta(
+            meta_path,
+            {
+                "url": url,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "stored_at": time.time(),
+            },
+        )
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += new_size - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def touch(self, url: str) -> None:
+        """
+        条件请求返回 304 后刷新条目的保存时间
+        """
+        _, meta_path = self._paths(url)
+        try:
+            with meta_path.open("r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        meta["stored_at"] = time.time()
+        self._write_meta(meta_path, meta)
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """
+        (访问时间, 大小, 路径), 列出后被其它进程删除的条目跳过
+        """
+        entries = []
+        for path in self.root.glob("*/*.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        """
+        按访问时间从旧到新删除, 直到总大小降到上限的 90%
+        """
+        entries = sorted(self._entries())
+        target = self.max_bytes * 0.9
+        for _, size, body_path in entries:
+            if self._size <= target:
+                break
+            body_path.unlink(missing_ok=True)
+            body_path.with_suffix(".json").unlink(missing_ok=True)
+            self._size -= size
+
+        logging.info(f"Response cache evicted down to {self._size} bytes")
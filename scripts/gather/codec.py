@@ -0,0 +1,221 @@
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Type, TypedDict, Union
+
+from .atomic import atomic_write
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于环境
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - 取决于环境
+    msgspec = None
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+# 各后端解码失败时抛出的异常
+DECODE_ERRORS = (ValueError,) + ((msgspec.DecodeError,) if msgspec else ())
+
+
+class EnglishRecord(TypedDict, total=False):
+    word: str
+    uk: str
+    us: str
+
+
+class JapaneseRecord(TypedDict, total=False):
+    word: str
+    kana: str
+    ipa: str
+    romaji: str
+
+
+class KoreanRecord(TypedDict, total=False):
+    word: str
+    hangul: str
+    ipa: str
+    romanized: str
+
+
+# 各爬虫输出记录的结构
+RECORD_SCHEMAS: Dict[str, Type] = {
+    "cambridge": EnglishRecord,
+    "merriam_webster": EnglishRecord,
+    "english": EnglishRecord,
+    "jisho": JapaneseRecord,
+    "naver": KoreanRecord,
+}
+
+
+def available_backends() -> List[str]:
+    backends = []
+    if orjson is not None:
+        backends.append("orjson")
+    if msgspec is not None:
+        backends.append("msgspec")
+    backends.append("json")
+    return backends
+
+
+def default_backend() -> str:
+    """
+    环境变量 PRONUNCIATION_JSON_BACKEND 指定的后端, 否则为最快的可用后端
+    """
+    backend = os.environ.get("PRONUNCIATION_JSON_BACKEND")
+    if backend in available_backends():
+        return backend
+    return available_backends()[0]
+
+
+class JSONCodec:
+    """
+    JSON 编解码
+
+    依次优先使用 orjson、msgspec, 都未安装时使用标准库 json. 默认输出紧凑的 UTF-8,
+    pretty=True 时缩进两格
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        backend = backend or default_backend()
+        if backend not in available_backends():
+            raise ValueError(f"JSON backend not available: {backend}")
+        self.backend = backend
+        if backend == "msgspec":
+            self._encoder = msgspec.json.Encoder()
+            self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any, pretty: bool = False, sort_keys: bool = False) -> bytes:
+        if self.backend == "orjson":
+            option = orjson.OPT_INDENT_2 if pretty else 0
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(obj, option=option)
+
+        if self.backend == "msgspec" and not sort_keys:
+            data = self._encoder.encode(obj)
+            return msgspec.json.format(data, indent=2) if pretty else data
+
+        return json.dumps(
+            obj,
+            ensure_ascii=False,
+            indent=2 if pretty else None,
+            separators=None if pretty else (",", ":"),
+            sort_keys=sort_keys,
+        ).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        if self.backend == "orjson":
+            return orjson.loads(data)
+        if self.backend == "msgspec":
+            return self._decoder.decode(data)
+        return json.loads(data)
+
+    def load_file(self, path: Path) -> Any:
+        with open(path, "rb") as f:
+            return self.loads(f.read())
+
+    def dump_file(
+        self,
+        path: Path,
+        obj: Any,
+        pretty: bool = False,
+        backups: int = 0,
+        fsync: bool = True,
+    ) -> int:
+        """
+        原子地写入 JSON 文件, 返回写入的字节数
+        """
+        data = self.dumps(obj, pretty=pretty)
+        atomic_write(path, data, backups=backups, fsync=fsync)
+        return len(data)
+
+
+codec = JSONCodec()
+
+dumps = codec.dumps
+loads = codec.loads
+load_file = codec.load_file
+dump_file = codec.dump_file
+
+
+def validate_records(
+    data: Mapping[str, Any], schema: Type, strict: bool = False
+) -> List[str]:
+    """
+    按记录结构检查数据, 返回问题列表
+
+    结构中的字段必须是字符串; strict 时还不允许出现结构之外的字段
+    """
+    fields = schema.__annotations__
+    problems = []
+    for word, record in data.items():
+        if not isinstance(record, dict):
+            problems.append(f"{word}: record is {type(record).__name__}, not an object")
+            continue
+        for field, value in record.items():
+            if field in fields:
+                if not isinstance(value, str):
+                    problems.append(f"{word}: field {field} is not a string")
+            elif strict:
+                problems.append(f"{word}: unexpected field {field}")
+    return problems
+
+
+def _synthetic_dataset(count: int) -> Dict[str, Dict[str, str]]:
+    return {
+        f"word{i}": {"word": f"word{i}", "uk": f"ˈwɜːd{i}", "us": f"ˈwɝːd{i}"}
+        for i in range(count)
+    }
+
+
+def benchmark(
+    count: int = 300_000, backends: Optional[List[str]] = None
+) -> Dict[str, Dict[str, float]]:
+    """
+    在合成数据集上比较各后端的 dump/load 时间 (秒) 和输出大小 (字节)
+    """
+    data = _synthetic_dataset(count)
+    results = {}
+    for backend in backends or available_backends():
+        backend_codec = JSONCodec(backend)
+
+        start = time.perf_counter()
+        encoded = backend_codec.dumps(data)
+        dump_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        backend_codec.loads(encoded)
+        load_time = time.perf_counter() - start
+
+        results[backend] = {"dump": dump_time, "load": load_time, "bytes": len(encoded)}
+
+    # 对照: 原来使用的 json.dump(..., indent=2)
+    start = time.perf_counter()
+    encoded = json.dumps(data, indent=2)
+    dump_time = time.perf_counter() - start
+    start = time.perf_counter()
+    json.loads(encoded)
+    results["json indent=2"] = {
+        "dump": dump_time,
+        "load": time.perf_counter() - start,
+        "bytes": len(encoded.encode("utf-8")),
+    }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON codec benchmark")
+    parser.add_argument("--entries", type=int, default=300_000)
+    args = parser.parse_args()
+
+    for backend, timing in benchmark(args.entries).items():
+        print(
+            f"{backend:>14}: dump {timing['dump']:.3f}s, load {timing['load']:.3f}s, "
+            f"{timing['bytes'] / 1024 / 1024:.1f} MB"
+        )
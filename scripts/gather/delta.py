@@ -0,0 +1,85 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from .codec import dump_file, load_file
+
+STATE_FORMAT = 1
+
+
+def file_digest(path: Path) -> Optional[str]:
+    """
+    文件内容的 sha256, 文件不存在时返回 None
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_digests(paths: Iterable[Path]) -> Dict[str, Optional[str]]:
+    """
+    一组来源文件的内容哈希, 以路径为键
+    """
+    return {str(path): file_digest(path) for path in paths}
+
+
+def data_digest(data: Mapping[str, Any]) -> str:
+    """
+    数据集的规范化哈希, 与键顺序和缩进无关
+    """
+    payload = json.dumps(
+        data, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def diff_datasets(old: Mapping[str, Any], new: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    比较两个版本的数据集, 返回新增、修改的条目 (新值) 和删除的单词
+    """
+    return {
+        "added": {word: new[word] for word in new if word not in old},
+        "changed": {
+            word: new[word] for word in new if word in old and old[word] != new[word]
+        },
+        "removed": sorted(word for word in old if word not in new),
+    }
+
+
+def apply_delta(data: Mapping[str, Any], delta: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    将差异应用到旧数据上, 得到新版本
+    """
+    updated = dict(data)
+    for word in delta["removed"]:
+        updated.pop(word, None)
+    updated.update(delta["added"])
+    updated.update(delta["changed"])
+    return updated
+
+
+def is_empty_delta(delta: Mapping[str, Any]) -> bool:
+    return not (delta["added"] or delta["changed"] or delta["removed"])
+
+
+def load_state(path: Path) -> Dict[str, Any]:
+    """
+    读取上次发布的状态, 不存在或格式不符时返回空状态
+    """
+    path = Path(path)
+    if path.exists():
+        state = load_file(path)
+        if state.get("format") == STATE_FORMAT:
+            return state
+    return {"format": STATE_FORMAT, "languages": {}}
+
+
+def save_state(path: Path, state: Mapping[str, Any]) -> None:
+    dump_file(path, state, pretty=True)
@@ -1,7 +1,8 @@
 import asyncio
 import argparse
-from scrapers import CambridgeScraper, MerriamWebsterScraper
-from base_scraper import create_argument_parser
+from .scrapers import CambridgeScraper, MerriamWebsterScraper
+from .base_scraper import create_argument_parser, parse_endpoints
+from .ratelimit import AdaptiveRateLimiter
 
 
 async def main():
@@ -17,18 +18,39 @@ async def main():
     if not scraper_class:
         raise ValueError(f"Unknown source: {args.source}")
 
-    scraper = scraper_class(args.concurrent)
-
-    if args.action == "scrape":
-        await scraper.process_word_list(args.input)
-    elif args.action == "complete":
-        await scraper.complete_missing_data()
-    elif args.action == "retry":
-        await scraper.retry_missing_data()
-    elif args.action == "generate":
-        await scraper.generate_pronunciation_json(
-            input_file=args.input, accent=args.accent
-        )
+    scraper = scraper_class(
+        args.concurrent,
+        cache=args.cache,
+        cache_ttl=args.cache_ttl,
+        seen_filter=args.seen_filter,
+        storage=args.storage,
+        endpoints=parse_endpoints(args.endpoint),
+        metrics_file=args.metrics_file,
+        metrics_interval=args.metrics_interval,
+        metrics_port=args.metrics_port,
+        parse_executor=args.parse_executor,
+        parse_workers=args.parse_workers,
+        parser_backend=args.parser_backend,
+        rate_limiter=(
+            AdaptiveRateLimiter(rate=args.rate, max_concurrency=args.concurrent)
+            if args.rate
+            else None
+        ),
+    )
+
+    try:
+        if args.action == "scrape":
+            await scraper.process_word_list(args.input)
+        elif args.action == "complete":
+            await scraper.complete_missing_data()
+        elif args.action == "retry":
+            await scraper.retry_missing_data()
+        elif args.action == "generate":
+            await scraper.generate_pronunciation_json(
+                input_file=args.input, accent=args.accent
+            )
+    finally:
+        scraper.close()
 
 
 if __name__ == "__main__":
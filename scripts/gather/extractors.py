@@ -0,0 +1,336 @@
+import os
+from html.parser import HTMLParser
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# 可选的解析后端, 按优先级排列
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:  # pragma: no cover - 可选依赖
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+try:
+    import lxml.html as lxml_html
+except ImportError:  # pragma: no cover - 可选依赖
+    lxml_html = None
+
+BACKENDS = ("selectolax", "lxml", "stream", "bs4")
+
+# 通过环境变量强制指定后端
+BACKEND_ENV = "PRONUNCIATION_PARSER_BACKEND"
+
+VOID_ELEMENTS = frozenset(
+    "area base br col embed hr img input link meta param source track wbr".split()
+)
+
+
+class Step(NamedTuple):
+    """
+    查询中的一步
+
+    cls 含空格时按完整的 class 字符串匹配, 否则按单个 class 匹配 (与 bs4 的 class_ 一致);
+    axis 为 "descendant" 时在上一步元素内部查找, 为 "following" 时在其后的整个文档中查找
+    """
+
+    tag: str
+    cls: Optional[str] = None
+    id: Optional[str] = None
+    axis: str = "descendant"
+
+
+Query = Tuple[Step, ...]
+
+
+def available_backends() -> List[str]:
+    """
+    列出当前环境可用的后端
+    """
+    installed = {
+        "selectolax": SelectolaxParser is not None,
+        "lxml": lxml_html is not None,
+        "stream": True,
+        "bs4": True,
+    }
+    return [backend for backend in BACKENDS if installed[backend]]
+
+
+def default_backend() -> str:
+    """
+    环境变量优先, 否则选择最快的可用后端
+    """
+    backend = os.environ.get(BACKEND_ENV)
+    if backend:
+        return backend
+    return available_backends()[0]
+
+
+def _class_matches(expected: str, value: Optional[str]) -> bool:
+    if value is None:
+        return False
+    classes = value.split()
+    if " " in expected:
+        return " ".join(classes) == expected
+    return expected in classes
+
+
+def _step_matches(step: Step, tag: str, attrs: Dict[str, Optional[str]]) -> bool:
+    if tag != step.tag:
+        return False
+    if step.cls is not None and not _class_matches(step.cls, attrs.get("class")):
+        return False
+    if step.id is not None and attrs.get("id") != step.id:
+        return False
+    return True
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class _QueryState:
+    __slots__ = ("query", "step", "anchor_depth", "collect_depth", "chunks", "done")
+
+    def __init__(self, query: Query):
+        self.query = query
+        self.step = 0
+        self.anchor_depth = 0
+        self.collect_depth = 0
+        self.chunks: Optional[List[str]] = None
+        self.done = False
+
+
+class StreamingExtractor(HTMLParser):
+    """
+    基于 html.parser 的流式提取器, 不构建 DOM, 所有目标元素都找到后立即停止
+    """
+
+    def __init__(self, queries: Dict[str, Query]):
+        super().__init__(convert_charrefs=True)
+        self.states = {name: _QueryState(query) for name, query in queries.items()}
+        self.results: Dict[str, Optional[str]] = {name: None for name in queries}
+        self.stack: List[str] = []
+        self.pending = len(queries)
+
+    def _finish(self, name: str, state: _QueryState, result: Optional[str]) -> None:
+        state.done = True
+        self.results[name] = result
+        self.pending -= 1
+        if not self.pending:
+            raise _StopParsing
+
+    def handle_starttag(self, tag, attrs):
+        void = tag in VOID_ELEMENTS
+        if not void:
+            self.stack.append(tag)
+        depth = len(self.stack) + (1 if void else 0)
+
+        attr_map = None
+        for name, state in self.states.items():
+            if state.done or state.chunks is not None:
+                continue
+            if attr_map is None:
+                attr_map = dict(attrs)
+            if not _step_matches(state.query[state.step], tag, attr_map):
+                continue
+
+            if state.step == len(state.query) - 1:
+                if void:
+                    self._finish(name, state, "")
+                else:
+                    state.collect_depth = depth
+                    state.chunks = []
+            else:
+                state.anchor_depth = depth
+                state.step += 1
+
+    def handle_startendtag(self, tag, attrs):
+        # 自闭合标签没有内容, 按空元素处理
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index] == tag:
+                del self.stack[index:]
+                break
+        else:
+            return
+
+        depth = len(self.stack)
+        for name, state in self.states.items():
+            if state.done:
+                continue
+            if state.chunks is not None:
+                if depth < state.collect_depth:
+                    self._finish(name, state, "".join(state.chunks))
+            elif (
+                state.step
+                and state.query[state.step].axis == "descendant"
+                and depth < state.anchor_depth
+            ):
+                # 上一步的元素已经闭合, 其内部没有匹配
+                self._finish(name, state, None)
+
+    def handle_data(self, data):
+        for state in self.states.values():
+            if state.chunks is not None and not state.done:
+                state.chunks.append(data)
+
+    def extract(self, html: str) -> Dict[str, Optional[str]]:
+        try:
+            self.feed(html)
+            self.close()
+        except _StopParsing:
+            return self.results
+
+        # 文档结束时仍未闭合的目标元素
+        for name, state in self.states.items():
+            if not state.done and state.chunks is not None:
+                self.results[name] = "".join(state.chunks)
+        return self.results
+
+
+def _extract_stream(html: str, queries: Dict[str, Query]) -> Dict[str, Optional[str]]:
+    return StreamingExtractor(queries).extract(html)
+
+
+def _bs4_kwargs(step: Step) -> Dict:
+    kwargs = {}
+    if step.cls is not None:
+        kwargs["class_"] = step.cls
+    if step.id is not None:
+        kwargs["id"] = step.id
+    return kwargs
+
+
+def _extract_bs4(html: str, queries: Dict[str, Query]) -> Dict[str, Optional[str]]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    results = {}
+    for name, query in queries.items():
+        node = soup
+        for index, step in enumerate(query):
+            if index and step.axis == "following":
+                node = node.find_next(step.tag, **_bs4_kwargs(step))
+            else:
+                node = node.find(step.tag, **_bs4_kwargs(step))
+            if node is None:
+                break
+        results[name] = node.text if node is not None else None
+    return results
+
+
+def _xpath_predicate(step: Step) -> str:
+    predicates = []
+    if step.cls is not None:
+        if " " in step.cls:
+            predicates.append(f"normalize-space(@class)='{step.cls}'")
+        else:
+            predicates.append(
+                f"contains(concat(' ', normalize-space(@class), ' '), ' {step.cls} ')"
+            )
+    if step.id is not None:
+        predicates.append(f"@id='{step.id}'")
+    return "".join(f"[{predicate}]" for predicate in predicates)
+
+
+def _extract_lxml(html: str, queries: Dict[str, Query]) -> Dict[str, Optional[str]]:
+    parser = lxml_html.HTMLParser(encoding="utf-8")
+    root = lxml_html.document_fromstring(html.encode("utf-8"), parser=parser)
+
+    results = {}
+    for name, query in queries.items():
+        node = root
+        for index, step in enumerate(query):
+            target = f"{step.tag}{_xpath_predicate(step)}"
+            if index == 0:
+                path = f"(//{target})[1]"
+            elif step.axis == "following":
+                path = f"(descendant::{target} | following::{target})[1]"
+            else:
+                path = f"(descendant::{target})[1]"
+            matches = node.xpath(path)
+            node = matches[0] if matches else None
+            if node is None:
+                break
+        results[name] = node.text_content() if node is not None else None
+    return results
+
+
+def _css_selector(step: Step) -> str:
+    selector = step.tag
+    if step.cls is not None:
+        selector += "".join(f".{cls}" for cls in step.cls.split())
+    if step.id is not None:
+        selector += f'[id="{step.id}"]'
+    return selector
+
+
+def _selectolax_following(anchor, step: Step):
+    """
+    selectolax 没有 following 轴, 从锚点起按文档顺序遍历
+    """
+    for node in anchor.traverse(include_text=False):
+        if node is not anchor and _step_matches(step, node.tag, node.attributes):
+            return node
+
+    current = anchor
+    while current is not None:
+        sibling = current.next
+        while sibling is not None:
+            for node in sibling.traverse(include_text=False):
+                if _step_matches(step, node.tag, node.attributes):
+                    return node
+            sibling = sibling.next
+        current = current.parent
+    return None
+
+
+def _extract_selectolax(
+    html: str, queries: Dict[str, Query]
+) -> Dict[str, Optional[str]]:
+    tree = SelectolaxParser(html)
+
+    results = {}
+    for name, query in queries.items():
+        node = tree
+        for index, step in enumerate(query):
+            if index and step.axis == "following":
+                node = _selectolax_following(node, step)
+            else:
+                # 选择器只能按包含的 class 匹配, 完整 class 字符串再逐个校验
+                matches = [
+                    match
+                    for match in node.css(_css_selector(step))
+                    if match != node
+                    and _step_matches(step, match.tag, match.attributes)
+                ]
+                node = matches[0] if matches else None
+            if node is None:
+                break
+        results[name] = node.text(deep=True) if node is not None else None
+    return results
+
+
+_EXTRACTORS = {
+    "selectolax": _extract_selectolax,
+    "lxml": _extract_lxml,
+    "stream": _extract_stream,
+    "bs4": _extract_bs4,
+}
+
+
+def select_text(
+    html: str, queries: Dict[str, Query], backend: Optional[str] = None
+) -> Dict[str, Optional[str]]:
+    """
+    对每个查询返回第一个匹配元素的文本, 未匹配时为 None
+    """
+    backend = backend or default_backend()
+    if backend not in available_backends():
+        raise ValueError(f"Parser backend not available: {backend}")
+    return _EXTRACTORS[backend](html, queries)
@@ -0,0 +1,394 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from aiohttp import web
+
+from .base_scraper import PARSE_EXECUTORS
+from .ratelimit import AdaptiveRateLimiter
+from .scrapers import (
+    CambridgeScraper,
+    JishoScraper,
+    MerriamWebsterScraper,
+    NaverScraper,
+)
+from .scrapers.wiktionary import SECTION_LANGS
+from .service import LatencyTracker
+
+SCRAPERS = {
+    "cambridge": CambridgeScraper,
+    "merriam-webster": MerriamWebsterScraper,
+    "jisho": JishoScraper,
+    "naver": NaverScraper,
+}
+
+# 页面模板, 结构与各词典中被提取的部分一致, {filler} 用来把页面撑到接近真实的大小
+PAGE_TEMPLATES = {
+    "cambridge": (
+        '<html><body>{filler}<span class="uk dpron-i"><span class="region">uk</span>'
+        '<span class="pron dpron">/<span class="ipa dipa">ˈ{word}</span>/</span></span>'
+        '<span class="us dpron-i"><span class="pron dpron">/'
+        '<span class="ipa dipa">ˈ{word}ː</span>/</span></span></body></html>'
+    ),
+    "merriam-webster": (
+        '<html><body>{filler}<div class="prons-entries-list">'
+        '<span class="pr">ˈ{word}</span></div></body></html>'
+    ),
+    "jisho": '<html><body>{filler}<span class="furigana">{word}</span></body></html>',
+    "naver": (
+        '<html><body>{filler}<span class="pronunciation">[{word}]</span></body></html>'
+    ),
+    "wiktionary": (
+        '<html><body>{filler}<h2><span id="Japanese">Japanese</span></h2>'
+        '<span class="IPA">[{word}]</span><h2><span id="Korean">Korean</span></h2>'
+        '<span class="IPA">[{word}]</span></body></html>'
+    ),
+}
+
+
+class FakeServerConfig(NamedTuple):
+    """
+    模拟服务器的行为
+
+    延迟服从对数正态分布 (中位数 latency_ms, 形状 latency_sigma); 启动后每隔 burst_every
+    秒有 burst_length 秒对所有请求返回 429; slow_body_rate 比例的响应在
+    slow_body_seconds 内分块慢慢写出. fail_first 让每个地址的前几次请求固定返回 503,
+    不依赖随机数, 测试可以准确知道重试次数
+    """
+
+    latency_ms: float = 50.0
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    not_found_rate: float = 0.0
+    fail_first: int = 0
+    burst_every: float = 0.0
+    burst_length: float = 1.0
+    retry_after: float = 1.0
+    slow_body_rate: float = 0.0
+    slow_body_seconds: float = 1.0
+    page_kb: int = 40
+    seed: Optional[int] = None
+
+
+class FakeDictionaryServer:
+    """
+    本地的词典模拟服务器, 用于离线压测爬虫
+
+    每个来源一个路径前缀, endpoints() 给出对应爬虫的 endpoints 配置
+    """
+
+    def __init__(self, config: FakeServerConfig = FakeServerConfig()):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.stats: Dict[str, Counter] = {"routes": Counter(), "statuses": Counter()}
+        self.attempts: Counter = Counter()
+        self.filler = '<div class="filler">lorem ipsum</div>' * (
+            config.page_kb * 1024 // 36
+        )
+        self.base_url = ""
+        self._started = time.monotonic()
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_get("/cambridge/{word}", self._page("cambridge"))
+        self.app.router.add_get(
+            "/merriam-webster/{word}", self._page("merriam-webster")
+        )
+        self.app.router.add_get("/jisho/{word}", self._page("jisho"))
+        self.app.router.add_get("/naver/search.dict", self._page("naver"))
+        self.app.router.add_get("/wiktionary/wiki/{word}", self._page("wiktionary"))
+        self.app.router.add_get("/wiktionary/w/api.php", self._wiktionary_api)
+
+    def endpoints(self, source: str) -> Dict[str, str]:
+        """
+        指向本服务器的爬虫 endpoints 配置
+        """
+        wiktionary = {
+            "wiktionary": f"{self.base_url}/wiktionary/wiki/",
+            "wiktionary_api": f"{self.base_url}/wiktionary/w/api.php",
+        }
+        return {
+            "cambridge": {"base": f"{self.base_url}/cambridge/"},
+            "merriam-webster": {"base": f"{self.base_url}/merriam-webster/"},
+            "jisho": {"base": f"{self.base_url}/jisho/", **wiktionary},
+            "naver": {
+                "base": f"{self.base_url}/naver/search.dict?dicQuery=",
+                **wiktionary,
+            },
+        }[source]
+
+    def _latency(self) -> float:
+        config = self.config
+        if config.latency_ms <= 0:
+            return 0.0
+        return self.random.lognormvariate(
+            math.log(config.latency_ms / 1000), config.latency_sigma
+        )
+
+    def _in_burst(self) -> bool:
+        config = self.config
+        if config.burst_every <= 0:
+            return False
+        # 第一次突发在启动 burst_every 秒后, 压测开始时不会先遇到一段 429
+        elapsed = time.monotonic() - self._started
+        return elapsed >= config.burst_every and (
+            elapsed % config.burst_every < config.burst_length
+        )
+
+    async def _failure(
+        self, route: str, request: web.Request
+    ) -> Optional[web.Response]:
+        """
+        按配置模拟延迟, 需要返回错误时给出错误响应
+        """
+        self.stats["routes"][route] += 1
+        self.attempts[request.path_qs] += 1
+        await asyncio.sleep(self._latency())
+
+        config = self.config
+        if self._in_burst():
+            headers = {"Retry-After": f"{config.retry_after:g}"}
+            return web.Response(status=429, headers=headers)
+        if self.attempts[request.path_qs] <= config.fail_first:
+            return web.Response(status=503)
+        roll = self.random.random()
+        if roll < config.error_rate:
+            return web.Response(status=503)
+        if roll < config.error_rate + config.not_found_rate:
+            return web.Response(status=404)
+        return None
+
+    def _page(self, source: str):
+        async def handler(request: web.Request) -> web.StreamResponse:
+            failure = await self._failure(source, request)
+            if failure is not None:
+                self.stats["statuses"][failure.status] += 1
+                return failure
+
+            word = request.match_info.get("word") or request.query.get("dicQuery", "")
+            body = PAGE_TEMPLATES[source].format(filler=self.filler, word=word)
+            self.stats["statuses"][200] += 1
+            if self.random.random() >= self.config.slow_body_rate:
+                return web.Response(text=body, content_type="text/html")
+            return await self._slow_body(request, body.encode("utf-8"))
+
+        return handler
+
+    async def _slow_body(self, request: web.Request, body: bytes) -> web.StreamResponse:
+        """
+        分块写出响应, 模拟慢速连接
+        """
+        response = web.StreamResponse(headers={"Content-Type": "text/html"})
+        response.content_length = len(body)
+        await response.prepare(request)
+        chunks = 8
+        size = math.ceil(len(body) / chunks)
+        for index in range(chunks):
+            await response.write(body[index * size : (index + 1) * size])
+            await asyncio.sleep(self.config.slow_body_seconds / chunks)
+        await response.write_eof()
+        return response
+
+    async def _wiktionary_api(self, request: web.Request) -> web.Response:
+        failure = await self._failure("wiktionary_api", request)
+        if failure is not None:
+            self.stats["statuses"][failure.status] += 1
+            return failure
+
+        pages = []
+        for title in request.query.get("titles", "").split("|"):
+            if not title:
+                continue
+            wikitext = "".join(
+                f"=={section}==\n{{{{IPA|{lang}|[{title}]}}}}\n"
+                for section, lang in SECTION_LANGS.items()
+            )
+            revision = {"slots": {"main": {"content": wikitext}}}
+            pages.append({"title": title, "revisions": [revision]})
+        self.stats["statuses"][200] += 1
+        return web.json_response({"query": {"pages": pages}})
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        启动服务器, port 为 0 时使用随机端口; 返回基础地址
+        """
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.base_url = f"http://{host}:{self._runner.addresses[0][1]}"
+        self._started = time.monotonic()
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeDictionaryServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+
+async def load_test(
+    source: str,
+    word_count: int = 1000,
+    config: FakeServerConfig = FakeServerConfig(),
+    concurrent: int = 20,
+    window_size: Optional[int] = None,
+    rate: Optional[float] = None,
+    retry_attempts: int = 3,
+    retry_delay: float = 0.5,
+    parse_executor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    对模拟服务器运行一次 process_word_list, 返回吞吐量、单词延迟和服务器统计
+    """
+    latency = LatencyTracker(window=word_count)
+    async with FakeDictionaryServer(config) as server:
+        with tempfile.TemporaryDirectory() as data_dir:
+            word_list = Path(data_dir) / "words.txt"
+            word_list.write_text(
+                "".join(f"word{i}\n" for i in range(word_count)), encoding="utf-8"
+            )
+            scraper = SCRAPERS[source](
+                concurrent,
+                data_dir=data_dir,
+                endpoints=server.endpoints(source),
+                window_size=window_size or concurrent,
+                retry_attempts=retry_attempts,
+                retry_delay=retry_delay,
+                parse_executor=parse_executor,
+                rate_limiter=(
+                    AdaptiveRateLimiter(rate=rate, max_concurrency=concurrent)
+                    if rate
+                    else None
+                ),
+            )
+
+            # 记录每个单词从开始请求到得到结果的耗时
+            get_pronunciation = scraper.get_pronunciation
+
+            async def timed(session, word):
+                start = time.perf_counter()
+                try:
+                    return await get_pronunciation(session, word)
+                finally:
+                    latency.record((time.perf_counter() - start) * 1000)
+
+            scraper.get_pronunciation = timed
+
+            start = time.perf_counter()
+            try:
+                succeeded = await scraper.process_word_list(str(word_list))
+            finally:
+                scraper.close()
+            seconds = time.perf_counter() - start
+
+    return {
+        "source": source,
+        "words": word_count,
+        "succeeded": succeeded,
+        "seconds": seconds,
+        "words_per_sec": word_count / seconds if seconds else 0.0,
+        "latency": latency.stats(),
+        "server": {name: dict(counts) for name, counts in server.stats.items()},
+    }
+
+
+async def serve(config: FakeServerConfig, host: str, port: int) -> None:
+    server = FakeDictionaryServer(config)
+    base_url = await server.start(host, port)
+    for source in SCRAPERS:
+        endpoints = " ".join(
+            f"--endpoint {name}={url}" for name, url in server.endpoints(source).items()
+        )
+        print(f"{source}: {endpoints}")
+    print(f"Serving on {base_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake dictionary server / load test")
+    parser.add_argument("--source", choices=SCRAPERS, default="cambridge")
+    parser.add_argument("--words", type=int, default=1000)
+    parser.add_argument("--concurrent", type=int, default=20)
+    parser.add_argument("--window", type=int, default=None)
+    parser.add_argument("--rate", type=float, default=None)
+    parser.add_argument("--retry-attempts", type=int, default=3)
+    parser.add_argument("--retry-delay", type=float, default=0.5)
+    parser.add_argument("--parse-executor", choices=PARSE_EXECUTORS, default=None)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--not-found-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--fail-first", type=int, default=0, help="503 the first N requests per URL"
+    )
+    parser.add_argument("--burst-every", type=float, default=0.0)
+    parser.add_argument("--burst-length", type=float, default=1.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--slow-body-rate", type=float, default=0.0)
+    parser.add_argument("--slow-body-seconds", type=float, default=1.0)
+    parser.add_argument("--page-kb", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--serve", action="store_true", help="Only run the server (no load test)"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+
+    config = FakeServerConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        not_found_rate=args.not_found_rate,
+        fail_first=args.fail_first,
+        burst_every=args.burst_every,
+        burst_length=args.burst_length,
+        retry_after=args.retry_after,
+        slow_body_rate=args.slow_body_rate,
+        slow_body_seconds=args.slow_body_seconds,
+        page_kb=args.page_kb,
+        seed=args.seed,
+    )
+
+    # 先配置日志, 爬虫不会在当前目录创建日志文件
+    logging.basicConfig(level=logging.WARNING)
+    if args.serve:
+        asyncio.run(serve(config, args.host, args.port))
+        return
+
+    result = asyncio.run(
+        load_test(
+            args.source,
+            args.words,
+            config,
+            concurrent=args.concurrent,
+            window_size=args.window,
+            rate=args.rate,
+            retry_attempts=args.retry_attempts,
+            retry_delay=args.retry_delay,
+            parse_executor=args.parse_executor,
+        )
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
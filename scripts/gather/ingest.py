@@ -0,0 +1,207 @@
+import hashlib
+import math
+import unicodedata
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+SEEN_FILTERS = ("exact", "bloom")
+
+
+class WordEntry(NamedTuple):
+    """
+    单词列表中的一项: 行号、单词, 以及该行的起始字节偏移和内容哈希 (用于断点续传)
+    """
+
+    line: int
+    word: str
+    offset: Optional[int] = None
+    digest: Optional[str] = None
+
+
+def line_digest(raw: bytes) -> str:
+    """
+    原始行内容的哈希, 续传时用来确认检查点所在的行没有变化
+    """
+    return hashlib.blake2b(raw.rstrip(b"\r\n"), digest_size=8).hexdigest()
+
+
+def normalize_word(word: str) -> str:
+    """
+    规范化单词: NFC 归一化, 去掉首尾空白并合并内部空白
+
+    不转小写: 专有名词和缩写 (如 "US" 与 "us") 是不同的词条, 数据文件中的键也保留
+    原来的大小写
+    """
+    word = unicodedata.normalize("NFC", word)
+    return " ".join(word.split())
+
+
+class BloomFilter:
+    """
+    布隆过滤器, 以固定内存记录见过的单词
+
+    不会漏判, 但有 error_rate 的概率把新单词误判为见过
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        bits = -capacity * math.log(error_rate) / math.log(2) ** 2
+        self.capacity = capacity
+        self.count = 0
+        self.size = max(8, math.ceil(bits))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        # 双重哈希: 一次 blake2b 得到两个 64 位值, 组合出 k 个位置
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.hashes):
+            yield (first + index * second) % self.size
+
+    def add(self, item: str) -> bool:
+        """
+        加入单词, 返回它之前是否 (可能) 已经存在
+        """
+        present = True
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                present = False
+                self.bits[byte] |= 1 << bit
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position // 8] & (1 << (position % 8))
+            for position in self._positions(item)
+        )
+
+
+class ScalableBloomFilter:
+    """
+    可扩容的布隆过滤器
+
+    当前的过滤器装满 capacity 个单词后追加一个容量翻倍、误判率减半的过滤器,
+    单词数超过预估时总误判率仍不超过 error_rate
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.error_rate = error_rate
+        self.filters = [BloomFilter(capacity, error_rate / 2)]
+
+    @property
+    def count(self) -> int:
+        return sum(f.count for f in self.filters)
+
+    def add(self, item: str) -> bool:
+        if item in self:
+            return True
+        current = self.filters[-1]
+        if current.count >= current.capacity:
+            rate = self.error_rate / 2 ** (len(self.filters) + 1)
+            current = BloomFilter(current.capacity * 2, rate)
+            self.filters.append(current)
+        current.add(item)
+        return False
+
+    def __contains__(self, item: str) -> bool:
+        return any(item in f for f in self.filters)
+
+
+class ExactSeenSet:
+    """
+    精确的已见集合
+    """
+
+    def __init__(self):
+        self.items = set()
+
+    def add(self, item: str) -> bool:
+        if item in self.items:
+            return True
+        self.items.add(item)
+        return False
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.items
+
+
+class WordIngestor:
+    """
+    抓取前的单词流处理
+
+    逐行规范化输入, 丢弃空行、重复的单词以及已在输出中的单词, 只把需要请求的
+    单词交给调度器. 行号原样传递, 检查点仍然对应输入文件中的位置.
+
+    已有的单词可以直接传入, 也可以传入 contains 由存储自己判断 (不必把全部单词
+    读入内存). 布隆过滤器按 expected_words 分配, 超出时自动扩容
+    """
+
+    def __init__(
+        self,
+        existing: Iterable[str] = (),
+        seen_filter: str = "exact",
+        expected_words: int = 1_000_000,
+        error_rate: float = 0.001,
+        normalize: Callable[[str], str] = normalize_word,
+        contains: Optional[Callable[[str], bool]] = None,
+    ):
+        if seen_filter not in SEEN_FILTERS:
+            raise ValueError(f"Unknown seen filter: {seen_filter}")
+
+        self.normalize = normalize
+        self.existing = {normalize(word) for word in existing}
+        self.contains = contains
+        self.error_rate = error_rate
+        if seen_filter == "bloom":
+            self.seen = ScalableBloomFilter(expected_words, error_rate)
+        else:
+            self.seen = ExactSeenSet()
+
+        self.stats = {"read": 0, "blank": 0, "duplicate": 0, "existing": 0, "new": 0}
+
+    def accept(self, word: str) -> Optional[str]:
+        """
+        返回规范化后的单词, 需要跳过时返回 None
+        """
+        self.stats["read"] += 1
+        word = self.normalize(word)
+        if not word:
+            self.stats["blank"] += 1
+            return None
+        if self.seen.add(word):
+            self.stats["duplicate"] += 1
+            return None
+        if word in self.existing or (self.contains and self.contains(word)):
+            self.stats["existing"] += 1
+            return None
+
+        self.stats["new"] += 1
+        return word
+
+    def summary(self) -> str:
+        """
+        过滤统计; 布隆过滤器丢弃的重复项中可能有误判的新单词, 一并给出估计
+        """
+        summary = f"Word list ingestion: {self.stats}"
+        if isinstance(self.seen, ScalableBloomFilter):
+            dropped = self.stats["duplicate"]
+            estimate = math.ceil(self.error_rate * self.seen.count)
+            summary += (
+                f"; bloom filter dropped {dropped} words as duplicates, up to "
+                f"~{estimate} of them may be false positives"
+            )
+        return summary
+
+    def filter(self, entries: Iterable[Tuple]) -> Iterator[WordEntry]:
+        """
+        过滤 (行号, 单词, ...) 流
+        """
+        for entry in entries:
+            entry = WordEntry(*entry)
+            word = self.accept(entry.word)
+            if word is not None:
+                yield entry._replace(word=word)
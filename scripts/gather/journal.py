@@ -0,0 +1,301 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .atomic import atomic_open
+from .codec import DECODE_ERRORS, dumps, load_file, loads
+
+# 日志中每一行是一个 JSON 对象: 结果记录用 "w"/"d", 检查点用 "c"
+_WORD_KEY = "w"
+_DATA_KEY = "d"
+_CHECKPOINT_KEY = "c"
+
+# 单词索引: 首行记录生成索引时最终 JSON 的大小和修改时间, 之后每行一个单词
+_INDEX_NAME = "keys.jsonl"
+_OUTPUT_KEY = "output"
+
+EMPTY_CHECKPOINT = {"last_word": "", "processed_count": 0}
+
+
+class ResultJournal:
+    """
+    追加写入的结果日志
+
+    每批结果以 JSONL 行追加到分段文件并 fsync, 检查点作为日志中的一行一起写入,
+    分段数量达到阈值后压缩合并为最终的 JSON 文件.
+
+    另有一个随追加更新的单词索引, 续传时判断单词是否已抓取只需读索引, 不必读入
+    全部数据; 索引缺失或最终 JSON 被外部修改时重建一次
+    """
+
+    def __init__(
+        self,
+        output_file: Path,
+        segment_size: int = 10000,
+        compact_every: int = 20,
+        fsync: bool = True,
+        legacy_checkpoint: Optional[Path] = None,
+    ):
+        self.output_file = Path(output_file)
+        self.journal_dir = self.output_file.with_name(
+            f"{self.output_file.stem}.journal"
+        )
+        self.segment_size = segment_size
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.legacy_checkpoint = legacy_checkpoint
+
+        self._lock = threading.RLock()
+        self._handle = None
+        self._segment_lines = 0
+        self._keys: Optional[Set[str]] = None
+
+    def _segments(self) -> List[Path]:
+        """
+        按顺序列出现有的分段文件
+        """
+        if not self.journal_dir.exists():
+            return []
+        return sorted(self.journal_dir.glob("segment-*.jsonl"))
+
+    def _next_segment_path(self) -> Path:
+        segments = self._segments()
+        index = int(segments[-1].stem.split("-")[1]) + 1 if segments else 1
+        return self.journal_dir / f"segment-{index:06d}.jsonl"
+
+    def _open_segment(self) -> None:
+        """
+        打开最新的分段用于追加, 写满后切换到新分段
+        """
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        segments = self._segments()
+        if segments and self._handle is None:
+            with segments[-1].open("rb") as f:
+                self._segment_lines = sum(1 for _ in f)
+            if self._segment_lines < self.segment_size:
+                self._handle = segments[-1].open("ab")
+                return
+
+        self._close_segment()
+        self._handle = self._next_segment_path().open("ab")
+        self._segment_lines = 0
+
+    def _close_segment(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def _write_lines(self, lines: List[bytes]) -> None:
+        """
+        追加若干行并落盘
+        """
+        if self._handle is None or self._segment_lines >= self.segment_size:
+            self._open_segment()
+
+        self._handle.write(b"".join(lines))
+        self._handle.flush()
+        if self.fsync:
+            os.fsync(self._handle.fileno())
+        self._segment_lines += len(lines)
+
+    def append(
+        self, results: Dict[str, Dict[str, Any]], checkpoint: Optional[Dict] = None
+    ) -> None:
+        """
+        追加一批结果, 可同时写入检查点
+        """
+        lines = [
+            dumps({_WORD_KEY: word, _DATA_KEY: data}) + b"\n"
+            for word, data in results.items()
+        ]
+        if checkpoint is not None:
+            lines.append(dumps({_CHECKPOINT_KEY: checkpoint}) + b"\n")
+        if not lines:
+            return
+
+        with self._lock:
+            self._write_lines(lines)
+            # 索引在分段之后写入, 崩溃时索引只会缺少单词 (重新抓取), 不会多出
+            self._append_index(results)
+
+    def checkpoint(self, last_word: str, count: int) -> None:
+        """
+        写入检查点
+        """
+        self.append({}, {"last_word": last_word, "processed_count": count})
+
+    @staticmethod
+    def _read_segment(path: Path, is_last: bool) -> Iterator[Dict[str, Any]]:
+        """
+        逐行读取分段, 末尾分段中被截断的最后一行会被忽略
+        """
+        with path.open("rb") as f:
+            lines = f.readlines()
+
+        for index, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                yield loads(line)
+            except DECODE_ERRORS:
+                if is_last and index == len(lines) - 1:
+                    logging.warning(f"Ignoring truncated journal line in {path}")
+                    return
+                raise
+
+    def _replay(self) -> Iterator[Dict[str, Any]]:
+        segments = self._segments()
+        for index, segment in enumerate(segments):
+            yield from self._read_segment(segment, index == len(segments) - 1)
+
+    def last_checkpoint(self) -> Dict[str, Any]:
+        """
+        读取最近的检查点, 只需扫描最新的分段
+        """
+        with self._lock:
+            for segment in reversed(self._segments()):
+                checkpoint = None
+                for entry in self._read_segment(segment, True):
+                    if _CHECKPOINT_KEY in entry:
+                        checkpoint = entry[_CHECKPOINT_KEY]
+                if checkpoint is not None:
+                    return checkpoint
+
+        if self.legacy_checkpoint and self.legacy_checkpoint.exists():
+            with self.legacy_checkpoint.open("r") as f:
+                return json.load(f)
+
+        return dict(EMPTY_CHECKPOINT)
+
+    def _load(self) -> Tuple[Dict[str, Dict[str, Any]], Optional[Dict[str, Any]]]:
+        data = {}
+        if self.output_file.exists():
+            data = load_file(self.output_file)
+
+        checkpoint = None
+        for entry in self._replay():
+            if _CHECKPOINT_KEY in entry:
+                checkpoint = entry[_CHECKPOINT_KEY]
+            else:
+                data[entry[_WORD_KEY]] = entry[_DATA_KEY]
+        return data, checkpoint
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        读取最终 JSON 并重放日志, 得到完整数据
+        """
+        with self._lock:
+            return self._load()[0]
+
+    @property
+    def _index_path(self) -> Path:
+        return self.journal_dir / _INDEX_NAME
+
+    def _output_stamp(self) -> Optional[List[int]]:
+        try:
+            stat = self.output_file.stat()
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _read_index(self) -> Optional[Set[str]]:
+        """
+        读取单词索引, 索引不存在或与最终 JSON 不一致时返回 None
+        """
+        try:
+            with self._index_path.open("rb") as f:
+                header = f.readline()
+                if loads(header).get(_OUTPUT_KEY) != self._output_stamp():
+                    return None
+                lines = f.readlines()
+        except (OSError, AttributeError, *DECODE_ERRORS):
+            return None
+
+        keys = set()
+        for index, line in enumerate(lines):
+            try:
+                keys.add(loads(line))
+            except DECODE_ERRORS:
+                # 追加时被截断的最后一行
+                if index != len(lines) - 1:
+                    return None
+        return keys
+
+    def _write_index(self, keys: Iterable[str]) -> None:
+        with atomic_open(self._index_path, "wb", fsync=self.fsync) as f:
+            f.write(dumps({_OUTPUT_KEY: self._output_stamp()}) + b"\n")
+            for key in keys:
+                f.write(dumps(key) + b"\n")
+
+    def _append_index(self, results: Dict[str, Any]) -> None:
+        if not results:
+            return
+        if self._keys is not None:
+            self._keys.update(results)
+        # 索引还不存在时不追加, 第一次查询时会完整重建
+        if self._index_path.exists():
+            with self._index_path.open("ab") as f:
+                f.write(b"".join(dumps(word) + b"\n" for word in results))
+
+    def _key_set(self) -> Set[str]:
+        if self._keys is None:
+            keys = self._read_index()
+            if keys is None:
+                keys = set(self._load()[0])
+                self._write_index(keys)
+            self._keys = keys
+        return self._keys
+
+    def keys(self) -> List[str]:
+        """
+        已有数据中的单词, 从单词索引读取
+        """
+        with self._lock:
+            return list(self._key_set())
+
+    def contains(self, word: str) -> bool:
+        with self._lock:
+            return word in self._key_set()
+
+    def exists(self) -> bool:
+        return self.output_file.exists() or bool(self._segments())
+
+    def needs_compaction(self) -> bool:
+        return len(self._segments()) >= self.compact_every
+
+    def compact(self) -> int:
+        """
+        将日志合并进最终 JSON, 并以最近的检查点开启新的分段, 返回记录数
+        """
+        with self._lock:
+            segments = self._segments()
+            if not segments:
+                return len(self._key_set())
+
+            data, checkpoint = self._load()
+
+            self._close_segment()
+            if checkpoint is None:
+                checkpoint = self.last_checkpoint()
+
+            with atomic_open(self.output_file, "wb", fsync=self.fsync) as f:
+                f.write(dumps(data))
+            self._write_index(data)
+            if self._keys is not None:
+                self._keys = set(data)
+
+            # 先写入新分段的检查点, 再删除旧分段
+            self._handle = self._next_segment_path().open("ab")
+            self._segment_lines = 0
+            self._write_lines([dumps({_CHECKPOINT_KEY: checkpoint}) + b"\n"])
+            for segment in segments:
+                segment.unlink()
+
+            return len(data)
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_segment()
@@ -0,0 +1,70 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+ENGLISH_FIELDS = ("uk", "us")
+
+# 英语各字段的来源优先级: Merriam-Webster 使用自己的注音体系, 只作为美音的补充
+ENGLISH_FIELD_PRIORITY = {
+    "uk": ["cambridge"],
+    "us": ["cambridge", "merriam_webster"],
+}
+
+
+def _is_filled(value: Any) -> bool:
+    return bool(value.strip()) if isinstance(value, str) else bool(value)
+
+
+def merge_records(
+    word: str,
+    records: Mapping[str, Optional[Dict[str, Any]]],
+    fields: Iterable[str],
+    priority: Optional[Mapping[str, List[str]]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    按字段合并多个来源的记录
+
+    每个字段取优先级列表中第一个非空的值, 未在 priority 中列出的字段按 records 的顺序查找;
+    sources 记录每个字段的取值来源. 所有来源都没有结果时返回 None
+    """
+    available = {source: record for source, record in records.items() if record}
+    if not available:
+        return None
+
+    merged: Dict[str, Any] = {"word": word}
+    sources: Dict[str, str] = {}
+    for field in fields:
+        order = list((priority or {}).get(field, []))
+        order += [source for source in available if source not in order]
+
+        merged[field] = ""
+        for source in order:
+            value = (available.get(source) or {}).get(field)
+            if _is_filled(value):
+                merged[field] = value
+                sources[field] = source
+                break
+
+    merged["sources"] = sources
+    return merged
+
+
+def merge_datasets(
+    datasets: Mapping[str, Dict[str, Dict[str, Any]]],
+    fields: Iterable[str],
+    priority: Optional[Mapping[str, List[str]]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    合并多个来源的完整数据集
+    """
+    fields = list(fields)
+    words = dict.fromkeys(word for data in datasets.values() for word in data)
+    merged = {}
+    for word in words:
+        record = merge_records(
+            word,
+            {source: data.get(word) for source, data in datasets.items()},
+            fields,
+            priority,
+        )
+        if record is not None:
+            merged[word] = record
+    return merged
@@ -0,0 +1,264 @@
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from aiohttp import web
+
+from .atomic import atomic_write_json
+
+# 直方图的桶上界 (秒), 与 Prometheus 客户端的默认值相近
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Histogram:
+    """
+    固定桶的直方图, 分位数按桶内线性插值估算
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                if index == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip([*map(str, self.buckets), "+Inf"], self.counts)),
+        }
+
+
+class CrawlMetrics:
+    """
+    爬取过程的指标
+
+    按主机记录请求延迟直方图、状态码和重试次数, 另有解析和落盘耗时、计数器以及
+    在快照时读取的队列深度. 落盘在后台线程中执行, 所有更新都加锁
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.started = time.time()
+        self.requests: Dict[str, Histogram] = defaultdict(self._histogram)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.retries: Counter = Counter()
+        self.stages: Dict[str, Histogram] = defaultdict(self._histogram)
+        self.counters: Counter = Counter()
+        self.gauges: Dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self) -> Histogram:
+        return Histogram(self.buckets)
+
+    def observe_request(self, host: str, status: Optional[int], seconds: float) -> None:
+        """
+        记录一次请求, status 为 None 表示网络错误或超时
+        """
+        with self._lock:
+            self.requests[host].observe(seconds)
+            self.statuses[host]["error" if status is None else str(status)] += 1
+
+    def record_retry(self, host: str) -> None:
+        with self._lock:
+            self.retries[host] += 1
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """
+        记录 parse/persist 等阶段的耗时
+        """
+        with self._lock:
+            self.stages[stage].observe(seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def set_gauge(self, name: str, read: Callable[[], float]) -> None:
+        """
+        注册一个在快照时读取的量 (如队列深度)
+        """
+        self.gauges[name] = read
+
+    def remove_gauge(self, name: str) -> None:
+        self.gauges.pop(name, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "uptime": time.time() - self.started,
+                "hosts": {
+                    host: {
+                        "latency": histogram.snapshot(),
+                        "statuses": dict(self.statuses[host]),
+                        "retries": self.retries[host],
+                    }
+                    for host, histogram in self.requests.items()
+                },
+                "stages": {
+                    stage: histogram.snapshot()
+                    for stage, histogram in self.stages.items()
+                },
+                "counters": dict(self.counters),
+                "gauges": {name: read() for name, read in self.gauges.items()},
+            }
+
+    def prometheus(self, prefix: str = "scraper") -> str:
+        """
+        Prometheus 文本格式
+        """
+        lines: List[str] = []
+
+        def histogram_lines(name: str, labels: str, histogram: Histogram) -> None:
+            cumulative = 0
+            for bound, count in zip([*self.buckets, "+Inf"], histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels}le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels.rstrip(',')}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels.rstrip(',')}}} {histogram.count}")
+
+        with self._lock:
+            name = f"{prefix}_request_duration_seconds"
+            lines.append(f"# TYPE {name} histogram")
+            for host, histogram in self.requests.items():
+                histogram_lines(name, f'host="{host}",', histogram)
+
+            name = f"{prefix}_responses_total"
+            lines.append(f"# TYPE {name} counter")
+            for host, statuses in self.statuses.items():
+                for status, count in statuses.items():
+                    lines.append(f'{name}{{host="{host}",status="{status}"}} {count}')
+
+            name = f"{prefix}_retries_total"
+            lines.append(f"# TYPE {name} counter")
+            for host, count in self.retries.items():
+                lines.append(f'{name}{{host="{host}"}} {count}')
+
+            name = f"{prefix}_stage_duration_seconds"
+            lines.append(f"# TYPE {name} histogram")
+            for stage, histogram in self.stages.items():
+                histogram_lines(name, f'stage="{stage}",', histogram)
+
+            for counter, count in self.counters.items():
+                lines.append(f"# TYPE {prefix}_{counter}_total counter")
+                lines.append(f"{prefix}_{counter}_total {count}")
+
+            for gauge, read in self.gauges.items():
+                lines.append(f"# TYPE {prefix}_{gauge} gauge")
+                lines.append(f"{prefix}_{gauge} {read()}")
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsReporter:
+    """
+    定期把指标快照写入 JSON 文件, 可选开启 HTTP 端点
+    (/metrics 为 Prometheus 文本, /stats 为 JSON 快照)
+    """
+
+    def __init__(
+        self,
+        metrics: CrawlMetrics,
+        snapshot_file: Optional[Path] = None,
+        interval: float = 30.0,
+        port: Optional[int] = None,
+        host: str = "127.0.0.1",
+        extra: Optional[Callable[[], Dict[str, Any]]] = None,
+    ):
+        self.metrics = metrics
+        self.snapshot_file = Path(snapshot_file) if snapshot_file else None
+        self.interval = interval
+        self.port = port
+        self.host = host
+        self.extra = extra
+        self._task: Optional[asyncio.Task] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot = self.metrics.snapshot()
+        if self.extra is not None:
+            snapshot.update(self.extra())
+        return snapshot
+
+    def write_snapshot(self) -> None:
+        if self.snapshot_file is not None:
+            atomic_write_json(self.snapshot_file, self.snapshot(), indent=2)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.write_snapshot)
+            except OSError as e:
+                logging.error(f"Error writing metrics snapshot: {str(e)}")
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            text=self.metrics.prometheus(), content_type="text/plain", charset="utf-8"
+        )
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.snapshot())
+
+    async def start(self) -> None:
+        if self.snapshot_file is not None:
+            self._task = asyncio.create_task(self._run())
+        if self.port is not None:
+            app = web.Application()
+            app.router.add_get("/metrics", self._handle_metrics)
+            app.router.add_get("/stats", self._handle_stats)
+            self._runner = web.AppRunner(app)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self) -> None:
+        """
+        停止定期写入和 HTTP 端点, 并写出最后一次快照
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        await asyncio.to_thread(self.write_snapshot)
+
+    async def __aenter__(self) -> "MetricsReporter":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Any, Dict, List, Mapping, Optional
+
+import aiohttp
+
+from .base_scraper import BasePronunciationScraper
+from .merge import merge_records
+
+
+class MultiSourceScraper(BasePronunciationScraper):
+    """
+    多来源抓取
+
+    每个单词同时请求所有来源, 按字段优先级合并后写入一条记录, 总耗时取决于最慢的来源
+    而不是各来源之和. 各来源保留自己的并发和解析配置, 共用这里的连接池和指标 (各来源
+    的主机、重试和解析统计出现在同一份快照中); 这里配置了限流器或缓存时也一并共用
+    """
+
+    def __init__(
+        self,
+        name: str,
+        scrapers: List[BasePronunciationScraper],
+        field_priority: Optional[Mapping[str, List[str]]] = None,
+        concurrent_limit: int = 5,
+        **kwargs,
+    ):
+        # 字段要在打开存储之前确定, SQLite 存储按字段建列
+        self.fields = tuple(
+            dict.fromkeys(field for scraper in scrapers for field in scraper.fields)
+        )
+        super().__init__(name, concurrent_limit, **kwargs)
+        self.scrapers = scrapers
+        self.field_priority = field_priority or {}
+
+        for scraper in scrapers:
+            scraper.sessions = self.sessions
+            scraper.metrics = self.metrics
+            if self.rate_limiter is not None:
+                scraper.rate_limiter = self.rate_limiter
+            if self.cache is not None:
+                scraper.cache = self.cache
+
+    async def get_pronunciation(
+        self, session: aiohttp.ClientSession, word: str
+    ) -> Optional[Dict[str, Any]]:
+        results = await asyncio.gather(
+            *[scraper.get_pronunciation(session, word) for scraper in self.scrapers],
+            return_exceptions=True,
+        )
+        records = {
+            scraper.name: None if isinstance(result, BaseException) else result
+            for scraper, result in zip(self.scrapers, results)
+        }
+        return merge_records(word, records, self.fields, self.field_priority)
+
+    def find_missing_words(self, data: Dict[str, Dict[str, Any]]) -> List[str]:
+        return [word for word, details in data.items() if self.is_empty_data(details)]
+
+    def is_empty_data(self, details: Dict[str, Any]) -> bool:
+        """检查数据是否为空"""
+        return any(not details.get(field, "").strip() for field in self.fields)
+
+    def close(self) -> None:
+        for scraper in self.scrapers:
+            scraper.close()
+        super().close()
@@ -0,0 +1,234 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+# 表示对方在限流或过载的状态码
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def parse_retry_after(
+    value: Optional[str], now: Optional[float] = None
+) -> Optional[float]:
+    """
+    解析 Retry-After 头, 支持秒数和 HTTP 日期, 返回需要等待的秒数
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+def backoff_delay(
+    attempt: int, base: float, maximum: float = 60.0, jitter: float = 0.5
+) -> float:
+    """
+    指数退避加随机抖动
+    """
+    delay = min(maximum, base * (2**attempt))
+    return delay * (1 - jitter + random.random() * jitter)
+
+
+class TokenBucket:
+    """
+    令牌桶, 限制每秒发起的请求数
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> float:
+        """
+        尝试取一个令牌, 成功返回 0, 否则返回需要等待的秒数
+        """
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        while (wait := self.try_acquire()) > 0:
+            await asyncio.sleep(wait)
+
+
+class HostState:
+    """
+    单个主机的限流状态
+    """
+
+    def __init__(self, limiter: "AdaptiveRateLimiter"):
+        self.bucket = TokenBucket(limiter.rate, limiter.burst, limiter.clock)
+        self.concurrency = float(limiter.initial_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.latency: Optional[float] = None
+        self.last_decrease = float("-inf")
+        self.waiters: List[asyncio.Future] = []
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self.concurrency))
+
+
+class AdaptiveRateLimiter:
+    """
+    按主机的自适应限流器
+
+    每个主机一个令牌桶限制请求速率, 并发窗口按 AIMD 调整:
+    响应正常且延迟低于目标时加性增加, 遇到 429/503 或延迟过高时乘性减少,
+    Retry-After 会暂停该主机的新请求
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: Optional[float] = None,
+        initial_concurrency: int = 5,
+        min_concurrency: int = 1,
+        max_concurrency: int = 50,
+        min_rate: float = 0.2,
+        max_rate: Optional[float] = None,
+        target_latency: float = 2.0,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_rate = min_rate
+        self.max_rate = max_rate or rate * 4
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease = decrease
+        self.clock = clock
+        self.hosts: Dict[str, HostState] = {}
+
+    def host(self, host: str) -> HostState:
+        if host not in self.hosts:
+            self.hosts[host] = HostState(self)
+        return self.hosts[host]
+
+    def _wake(self, state: HostState) -> None:
+        """
+        有空闲名额时唤醒等待者
+        """
+        while state.waiters and state.in_flight < state.limit:
+            waiter = state.waiters.pop(0)
+            if not waiter.done():
+                state.in_flight += 1
+                waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, host: str) -> AsyncIterator[None]:
+        """
+        占用主机的一个并发名额, 并等待暂停结束和令牌
+        """
+        state = self.host(host)
+        if state.in_flight < state.limit and not state.waiters:
+            state.in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            state.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    state.in_flight -= 1
+                    self._wake(state)
+                raise
+
+        try:
+            while (pause := state.paused_until - self.clock()) > 0:
+                await asyncio.sleep(pause)
+            await state.bucket.acquire()
+            yield
+        finally:
+            state.in_flight -= 1
+            self._wake(state)
+
+    def _decrease(self, state: HostState, throttled: bool) -> None:
+        # 同一轮拥塞只减少一次, 避免并发请求同时返回 429 时窗口塌缩到底
+        now = self.clock()
+        if now - state.last_decrease < (state.latency or 1.0):
+            return
+        state.last_decrease = now
+
+        state.concurrency = max(
+            self.min_concurrency, state.concurrency * self.decrease
+        )
+        if throttled:
+            state.bucket.rate = max(self.min_rate, state.bucket.rate * self.decrease)
+
+    def record(
+        self,
+        host: str,
+        status: Optional[int],
+        latency: float,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """
+        记录一次响应, 调整该主机的并发窗口和速率
+        """
+        state = self.host(host)
+        state.latency = (
+            latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+        )
+
+        if retry_after:
+            state.paused_until = max(state.paused_until, self.clock() + retry_after)
+
+        if status in THROTTLE_STATUSES:
+            self._decrease(state, throttled=True)
+        elif status is None or status >= 500 or latency > self.target_latency:
+            self._decrease(state, throttled=False)
+        elif status < 400:
+            state.concurrency = min(
+                self.max_concurrency,
+                state.concurrency + self.increase / state.concurrency,
+            )
+            state.bucket.rate = min(
+                self.max_rate, state.bucket.rate + self.increase / state.bucket.rate
+            )
+
+        self._wake(state)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        当前各主机的窗口、速率和延迟
+        """
+        return {
+            host: {
+                "concurrency": state.concurrency,
+                "rate": state.bucket.rate,
+                "in_flight": state.in_flight,
+                "latency": state.latency or 0.0,
+            }
+            for host, state in self.hosts.items()
+        }
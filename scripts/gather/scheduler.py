@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+
+class SlidingWindowScheduler:
+    """
+    滑动窗口调度器
+
+    固定数量的 worker 持续从输入中取任务, 一个慢任务只占用一个名额;
+    任务完成顺序不定, 低水位 (最后一个之前全部完成的任务) 按输入顺序推进, 用作检查点
+    """
+
+    def __init__(
+        self,
+        worker: Callable[[Any], Awaitable[Any]],
+        concurrency: int,
+        on_result: Optional[Callable[[Any, Any], Awaitable[None]]] = None,
+        on_checkpoint: Optional[Callable[[Any], Awaitable[None]]] = None,
+        checkpoint_every: int = 1,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.worker = worker
+        self.concurrency = concurrency
+        self.on_result = on_result
+        self.on_checkpoint = on_checkpoint
+        self.checkpoint_every = checkpoint_every
+
+        # 运行状态
+        self.low_water: Any = None
+        self.completed = 0
+        self.in_flight = 0
+        self.queue: Optional[asyncio.Queue] = None
+        self._finished: Dict[int, Any] = {}
+        self._next_seq = 0
+        self._since_checkpoint = 0
+
+    @property
+    def backlog(self) -> int:
+        """
+        已完成但等待低水位推进的任务数
+        """
+        return len(self._finished)
+
+    async def _advance(self, seq: int, item: Any) -> None:
+        """
+        记录完成的任务, 并按顺序推进低水位
+        """
+        self._finished[seq] = item
+        while self._next_seq in self._finished:
+            self.low_water = self._finished.pop(self._next_seq)
+            self._next_seq += 1
+            self._since_checkpoint += 1
+
+        if self.on_checkpoint and self._since_checkpoint >= self.checkpoint_every:
+            self._since_checkpoint = 0
+            await self.on_checkpoint(self.low_water)
+
+    async def _consume(self) -> None:
+        while (job := await self.queue.get()) is not None:
+            seq, item = job
+            self.in_flight += 1
+            try:
+                result = await self.worker(item)
+            except Exception as e:
+                logging.error(f"Error processing {item}: {str(e)}")
+                result = None
+            finally:
+                self.in_flight -= 1
+
+            self.completed += 1
+            if self.on_result:
+                await self.on_result(item, result)
+            await self._advance(seq, item)
+
+    async def _produce(self, items: Iterable[Any]) -> None:
+        for seq, item in enumerate(items):
+            await self.queue.put((seq, item))
+        for _ in range(self.concurrency):
+            await self.queue.put(None)
+
+    async def run(self, items: Iterable[Any]) -> int:
+        """
+        处理全部任务, 返回完成数量
+        """
+        self.queue = asyncio.Queue(maxsize=self.concurrency)
+        tasks = [asyncio.create_task(self._produce(items))] + [
+            asyncio.create_task(self._consume()) for _ in range(self.concurrency)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        if self.on_checkpoint and self._since_checkpoint:
+            self._since_checkpoint = 0
+            await self.on_checkpoint(self.low_water)
+
+        return self.completed
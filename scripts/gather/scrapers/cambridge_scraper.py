@@ -1,56 +1,49 @@
-import logging
-import asyncio
-from bs4 import BeautifulSoup
+from functools import partial
 from typing import Dict, Any, List, Optional
 from ..base_scraper import BasePronunciationScraper
+from ..extractors import Step, select_text
+
+CAMBRIDGE_QUERIES = {
+    accent: (Step("span", f"{accent} dpron-i"), Step("span", "ipa"))
+    for accent in ("uk", "us")
+}
+
+
+def parse_cambridge_page(html: str, backend: Optional[str] = None) -> Dict[str, str]:
+    """
+    提取英式和美式音标
+    """
+    texts = select_text(html, CAMBRIDGE_QUERIES, backend)
+    return {accent: texts[accent] or "" for accent in CAMBRIDGE_QUERIES}
 
 
 class CambridgeScraper(BasePronunciationScraper):
-    def __init__(self, concurrent_limit: int = 5):
-        super().__init__("cambridge", concurrent_limit)
-        self.base_url = (
-            "https://dictionary.cambridge.org/dictionary/english-chinese-simplified/"
+    fields = ("uk", "us")
+
+    def __init__(self, concurrent_limit: int = 5, **kwargs):
+        super().__init__("cambridge", concurrent_limit, **kwargs)
+        self.base_url = self.endpoint(
+            "base",
+            "https://dictionary.cambridge.org/dictionary/english-chinese-simplified/",
         )
 
     async def get_pronunciation(self, session, word: str) -> Optional[Dict[str, Any]]:
         url = f"{self.base_url}{word}"
 
         async with self.semaphore:
-            for attempt in range(self.retry_attempts):
-                try:
-                    async with session.get(
-                        url, headers=self.headers, timeout=self.timeout
-                    ) as response:
-                        if response.status != 200:
-                            continue
-
-                        html = await response.text()
-                        soup = BeautifulSoup(html, "html.parser")
-
-                        uk_pron = soup.find("span", class_="uk dpron-i")
-                        us_pron = soup.find("span", class_="us dpron-i")
-
-                        return {
-                            "word": word,
-                            "uk": (
-                                uk_pron.find("span", class_="ipa").text
-                                if uk_pron
-                                else ""
-                            ),
-                            "us": (
-                                us_pron.find("span", class_="ipa").text
-                                if us_pron
-                                else ""
-                            ),
-                        }
-
-                except Exception as e:
-                    if attempt == self.retry_attempts - 1:
-                        logging.error(f"Error processing {word}: {str(e)}")
-                    await asyncio.sleep(self.retry_delay)
+            html = await self.fetch_html(session, url)
+        if html is None:
+            return None
 
+        # 解析不占用网络并发名额
+        prons = await self.parse(
+            partial(parse_cambridge_page, backend=self.parser_backend), html
+        )
+        if prons is None:
             return None
 
+        return {"word": word, **prons}
+
     def find_missing_words(self, data: Dict[str, Dict[str, Any]]) -> List[str]:
         return [
             word
@@ -1,86 +1,72 @@
 # 日语发音爬虫示例
-import logging
-import asyncio
-from bs4 import BeautifulSoup
+from functools import partial
 from typing import Dict, Any, List, Optional
 from ..base_scraper import BasePronunciationScraper
+from ..extractors import Step, select_text
+from .wiktionary import WIKTIONARY_API_URL, WIKTIONARY_URL, WiktionaryIPAResolver
+
+JISHO_QUERIES = {"kana": (Step("span", "furigana"),)}
+
+
+def parse_jisho_page(html: str, backend: Optional[str] = None) -> Optional[str]:
+    """
+    提取假名读音
+    """
+    kana = select_text(html, JISHO_QUERIES, backend)["kana"]
+    if kana is None:
+        return None
+
+    return kana.strip()
 
 
 class JishoScraper(BasePronunciationScraper):
-    def __init__(self, concurrent_limit: int = 5):
-        super().__init__("jisho", concurrent_limit)
-        self.base_url = "https://jisho.org/word/"
-        self.wiktionary_url = "https://en.wiktionary.org/wiki/"
+    fields = ("kana", "ipa", "romaji")
+
+    def __init__(
+        self,
+        concurrent_limit: int = 5,
+        wiktionary_limit: int = 5,
+        wiktionary_batch_size: int = 1,
+        **kwargs,
+    ):
+        super().__init__("jisho", concurrent_limit, **kwargs)
+        self.base_url = self.endpoint("base", "https://jisho.org/word/")
+        self.wiktionary_url = self.endpoint("wiktionary", WIKTIONARY_URL)
+
+        # Wiktionary 查询阶段, 同一读音只查询一次
+        self.wiktionary = WiktionaryIPAResolver(
+            self,
+            "Japanese",
+            concurrent_limit=wiktionary_limit,
+            batch_size=wiktionary_batch_size,
+            page_url=self.wiktionary_url,
+            api_url=self.endpoint("wiktionary_api", WIKTIONARY_API_URL),
+        )
 
     async def get_pronunciation(self, session, word: str) -> Optional[Dict[str, Any]]:
         url = f"{self.base_url}{word}"
 
         async with self.semaphore:
-            for attempt in range(self.retry_attempts):
-                try:
-                    # 首先从Jisho获取假名
-                    async with session.get(
-                        url, headers=self.headers, timeout=self.timeout
-                    ) as response:
-                        if response.status != 200:
-                            continue
-
-                        html = await response.text()
-                        soup = BeautifulSoup(html, "html.parser")
-
-                        # 获取假名读音
-                        kana = soup.find("span", class_="furigana")
-                        if not kana:
-                            return None
-
-                        kana_text = kana.text.strip()
-
-                        # 从Wiktionary获取IPA
-                        ipa = await self._get_ipa_from_wiktionary(session, kana_text)
-
-                        return {
-                            "word": word,
-                            "kana": kana_text,
-                            "ipa": ipa or "",
-                            "romaji": self._to_romaji(kana_text),
-                        }
-
-                except Exception as e:
-                    if attempt == self.retry_attempts - 1:
-                        logging.error(f"Error processing {word}: {str(e)}")
-                    await asyncio.sleep(self.retry_delay)
-
+            # 首先从Jisho获取假名
+            html = await self.fetch_html(session, url)
+        if html is None:
             return None
 
-    async def _get_ipa_from_wiktionary(self, session, kana: str) -> Optional[str]:
-        """从Wiktionary获取IPA发音"""
-        url = f"{self.wiktionary_url}{kana}#Japanese"
-
-        try:
-            async with session.get(
-                url, headers=self.headers, timeout=self.timeout
-            ) as response:
-                if response.status != 200:
-                    return None
-
-                html = await response.text()
-                soup = BeautifulSoup(html, "html.parser")
-
-                # 查找日语发音部分
-                jp_section = soup.find("span", {"id": "Japanese"})
-                if not jp_section:
-                    return None
-
-                # 获取IPA
-                ipa_span = jp_section.find_next("span", class_="IPA")
-                if ipa_span:
-                    return ipa_span.text.strip()
-
-        except Exception as e:
-            logging.error(f"Error getting IPA for {kana}: {str(e)}")
+        kana_text = await self.parse(
+            partial(parse_jisho_page, backend=self.parser_backend), html
+        )
+        if not kana_text:
             return None
 
-        return None
+        # 从Wiktionary获取IPA, 使用独立的并发预算, 不占用Jisho的名额
+        ipa = await self.wiktionary.resolve(session, kana_text)
+
+        return {
+            "word": word,
+            "kana": kana_text,
+            "ipa": ipa or "",
+            "romaji": self._to_romaji(kana_text),
+        }
 
     def _to_romaji(self, kana: str) -> str:
         """将假名转换为罗马字"""
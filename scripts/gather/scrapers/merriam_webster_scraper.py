@@ -1,50 +1,51 @@
-import logging
-import asyncio
-from bs4 import BeautifulSoup
+from functools import partial
 from typing import Dict, Any, List, Optional
 from ..base_scraper import BasePronunciationScraper
+from ..extractors import Step, select_text
 
+MERRIAM_WEBSTER_QUERIES = {
+    "us": (Step("div", "prons-entries-list"), Step("span", "pr")),
+}
 
-class MerriamWebsterScraper(BasePronunciationScraper):
-    def __init__(self, concurrent_limit: int = 5):
-        super().__init__("merriam_webster", concurrent_limit)
-        self.base_url = "https://www.merriam-webster.com/dictionary/"
-
-    async def get_pronunciation(self, session, word: str) -> Optional[Dict[str, Any]]:
-        url = f"{self.base_url}{word}"
 
-        async with self.semaphore:
-            for attempt in range(self.retry_attempts):
-                try:
-                    async with session.get(
-                        url, headers=self.headers, timeout=self.timeout
-                    ) as response:
-                        if response.status != 200:
-                            continue
+def parse_merriam_webster_page(
+    html: str, backend: Optional[str] = None
+) -> Optional[str]:
+    """
+    提取美式音标
+    """
+    ipa = select_text(html, MERRIAM_WEBSTER_QUERIES, backend)["us"]
+    if ipa is None:
+        return None
 
-                        html = await response.text()
-                        soup = BeautifulSoup(html, "html.parser")
+    return ipa.strip().replace("\\", "").replace("/", "")
 
-                        pron_div = soup.find("div", class_="prons-entries-list")
-                        if not pron_div:
-                            return None
 
-                        ipa_element = pron_div.find("span", class_="pr")
-                        if not ipa_element:
-                            return None
+class MerriamWebsterScraper(BasePronunciationScraper):
+    fields = ("us",)
 
-                        ipa = ipa_element.text.strip()
-                        ipa = ipa.replace("\\", "").replace("/", "")
+    def __init__(self, concurrent_limit: int = 5, **kwargs):
+        super().__init__("merriam_webster", concurrent_limit, **kwargs)
+        self.base_url = self.endpoint(
+            "base", "https://www.merriam-webster.com/dictionary/"
+        )
 
-                        return {"word": word, "us": ipa}
+    async def get_pronunciation(self, session, word: str) -> Optional[Dict[str, Any]]:
+        url = f"{self.base_url}{word}"
 
-                except Exception as e:
-                    if attempt == self.retry_attempts - 1:
-                        logging.error(f"Error processing {word}: {str(e)}")
-                    await asyncio.sleep(self.retry_delay)
+        async with self.semaphore:
+            html = await self.fetch_html(session, url)
+        if html is None:
+            return None
 
+        ipa = await self.parse(
+            partial(parse_merriam_webster_page, backend=self.parser_backend), html
+        )
+        if ipa is None:
             return None
 
+        return {"word": word, "us": ipa}
+
     def find_missing_words(self, data: Dict[str, Dict[str, Any]]) -> List[str]:
         return [word for word, details in data.items() if not details.get("us")]
 
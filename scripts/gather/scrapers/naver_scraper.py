@@ -1,79 +1,74 @@
 # 韩语发音爬虫示例
-class NaverScraper(BasePronunciationScraper):
-    def __init__(self, concurrent_limit: int = 5):
-        super().__init__("naver", concurrent_limit)
-        self.base_url = "https://dict.naver.com/search.dict?dicQuery="
-        self.wiktionary_url = "https://en.wiktionary.org/wiki/"
+from functools import partial
+from typing import Dict, Any, List, Optional
+from ..base_scraper import BasePronunciationScraper
+from ..extractors import Step, select_text
+from .wiktionary import WIKTIONARY_API_URL, WIKTIONARY_URL, WiktionaryIPAResolver
 
-    async def get_pronunciation(self, session, word: str) -> Optional[Dict[str, Any]]:
-        url = f"{self.base_url}{word}"
+NAVER_QUERIES = {"hangul": (Step("span", "pronunciation"),)}
 
-        async with self.semaphore:
-            for attempt in range(self.retry_attempts):
-                try:
-                    # 从Naver获取韩语读音
-                    async with session.get(
-                        url, headers=self.headers, timeout=self.timeout
-                    ) as response:
-                        if response.status != 200:
-                            continue
-
-                        html = await response.text()
-                        soup = BeautifulSoup(html, "html.parser")
-
-                        # 获取韩语读音
-                        hangul = soup.find("span", class_="pronunciation")
-                        if not hangul:
-                            return None
-
-                        hangul_text = hangul.text.strip()
-
-                        # 从Wiktionary获取IPA
-                        ipa = await self._get_ipa_from_wiktionary(session, hangul_text)
-
-                        return {
-                            "word": word,
-                            "hangul": hangul_text,
-                            "ipa": ipa or "",
-                            "romanized": self._to_romanized(hangul_text),
-                        }
-
-                except Exception as e:
-                    if attempt == self.retry_attempts - 1:
-                        logging.error(f"Error processing {word}: {str(e)}")
-                    await asyncio.sleep(self.retry_delay)
 
-            return None
+def parse_naver_page(html: str, backend: Optional[str] = None) -> Optional[str]:
+    """
+    提取韩语读音
+    """
+    hangul = select_text(html, NAVER_QUERIES, backend)["hangul"]
+    if hangul is None:
+        return None
 
-    async def _get_ipa_from_wiktionary(self, session, hangul: str) -> Optional[str]:
-        """从Wiktionary获取IPA发音"""
-        url = f"{self.wiktionary_url}{hangul}#Korean"
+    return hangul.strip()
 
-        try:
-            async with session.get(
-                url, headers=self.headers, timeout=self.timeout
-            ) as response:
-                if response.status != 200:
-                    return None
 
-                html = await response.text()
-                soup = BeautifulSoup(html, "html.parser")
+class NaverScraper(BasePronunciationScraper):
+    fields = ("hangul", "ipa", "romanized")
+
+    def __init__(
+        self,
+        concurrent_limit: int = 5,
+        wiktionary_limit: int = 5,
+        wiktionary_batch_size: int = 1,
+        **kwargs,
+    ):
+        super().__init__("naver", concurrent_limit, **kwargs)
+        self.base_url = self.endpoint(
+            "base", "https://dict.naver.com/search.dict?dicQuery="
+        )
+        self.wiktionary_url = self.endpoint("wiktionary", WIKTIONARY_URL)
+
+        # Wiktionary 查询阶段, 同一读音只查询一次
+        self.wiktionary = WiktionaryIPAResolver(
+            self,
+            "Korean",
+            concurrent_limit=wiktionary_limit,
+            batch_size=wiktionary_batch_size,
+            page_url=self.wiktionary_url,
+            api_url=self.endpoint("wiktionary_api", WIKTIONARY_API_URL),
+        )
 
-                # 查找韩语发音部分
-                kr_section = soup.find("span", {"id": "Korean"})
-                if not kr_section:
-                    return None
+    async def get_pronunciation(self, session, word: str) -> Optional[Dict[str, Any]]:
+        url = f"{self.base_url}{word}"
 
-                # 获取IPA
-                ipa_span = kr_section.find_next("span", class_="IPA")
-                if ipa_span:
-                    return ipa_span.text.strip()
+        async with self.semaphore:
+            # 从Naver获取韩语读音
+            html = await self.fetch_html(session, url)
+        if html is None:
+            return None
 
-        except Exception as e:
-            logging.error(f"Error getting IPA for {hangul}: {str(e)}")
+        hangul_text = await self.parse(
+            partial(parse_naver_page, backend=self.parser_backend), html
+        )
+        if not hangul_text:
             return None
 
-        return None
+        # 从Wiktionary获取IPA, 使用独立的并发预算, 不占用Naver的名额
+        ipa = await self.wiktionary.resolve(session, hangul_text)
+
+        return {
+            "word": word,
+            "hangul": hangul_text,
+            "ipa": ipa or "",
+            "romanized": self._to_romanized(hangul_text),
+        }
 
     def _to_romanized(self, hangul: str) -> str:
         """将韩文转换为罗马字"""
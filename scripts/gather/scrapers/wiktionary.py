@@ -0,0 +1,251 @@
+import asyncio
+import json
+import logging
+import re
+from functools import partial
+from typing import Dict, List, Optional, TYPE_CHECKING
+from urllib.parse import urlencode
+
+from ..extractors import Step, select_text
+
+if TYPE_CHECKING:
+    from ..base_scraper import BasePronunciationScraper
+
+WIKTIONARY_URL = "https://en.wiktionary.org/wiki/"
+WIKTIONARY_API_URL = "https://en.wiktionary.org/w/api.php"
+
+# MediaWiki API 对匿名请求每次最多 50 个标题
+MAX_API_TITLES = 50
+
+# 语言段落名称对应的 IPA 模板语言代码
+SECTION_LANGS = {"Japanese": "ja", "Korean": "ko"}
+
+# 确认页面不存在的状态码, 其余失败 (5xx、网络错误、重试用尽) 视为临时失败
+NOT_FOUND_STATUSES = (404, 410)
+
+_HEADING = re.compile(r"^==\s*([^=].*?)\s*==\s*$", re.MULTILINE)
+
+
+def parse_wiktionary_ipa(
+    html: str, section: str, backend: Optional[str] = None
+) -> Optional[str]:
+    """
+    从Wiktionary页面中提取指定语言段落后的第一个IPA
+    """
+    query = (Step("span", id=section), Step("span", "IPA", axis="following"))
+    ipa = select_text(html, {"ipa": query}, backend)["ipa"]
+    if ipa is None:
+        return None
+
+    return ipa.strip()
+
+
+def wikitext_section(wikitext: str, section: str) -> Optional[str]:
+    """
+    wikitext 中指定语言段落的内容, 没有该段落时返回 None
+    """
+    headings = list(_HEADING.finditer(wikitext))
+    for index, heading in enumerate(headings):
+        if heading.group(1) == section:
+            end = headings[index + 1].start() if index + 1 < len(headings) else None
+            return wikitext[heading.end() : end]
+
+    return None
+
+
+def parse_wikitext_ipa(wikitext: str, section: str) -> Optional[str]:
+    """
+    从 wikitext 的语言段落中提取显式的 {{IPA|lang|...}} 模板
+
+    ja-pron/ko-IPA 等模板的 IPA 由服务端生成, wikitext 中没有, 此时返回 None
+    """
+    body = wikitext_section(wikitext, section)
+    if body is None:
+        return None
+
+    lang = re.escape(SECTION_LANGS.get(section, ""))
+    match = re.search(r"\{\{IPA\|(?:lang=)?" + lang + r"\|([^|}]+)", body)
+    return match.group(1).strip() if match else None
+
+
+class WiktionaryIPAResolver:
+    """
+    Wiktionary IPA 查询阶段
+
+    与假名/韩文读音的抓取分开: 使用独立的并发预算, 同一读音只查询一次 (确认的结果
+    和不存在的页面会缓存, 临时失败不缓存; 并发的相同查询共享一个请求).
+
+    batch_size > 1 时短时间内的读音合并为一次 MediaWiki API 多标题查询, 没有对应
+    语言段落的标题直接确认无 IPA, 段落中没有显式 {{IPA}} 模板的标题再回退到页面
+    解析. 日语/韩语词条的 IPA 几乎都由 ja-pron/ko-IPA 在服务端生成, 批量查询通常
+    只能省下不存在的页面, 因此默认关闭
+    """
+
+    def __init__(
+        self,
+        scraper: "BasePronunciationScraper",
+        section: str,
+        concurrent_limit: int = 5,
+        batch_size: int = 1,
+        batch_delay: float = 0.05,
+        page_url: str = WIKTIONARY_URL,
+        api_url: str = WIKTIONARY_API_URL,
+    ):
+        self.scraper = scraper
+        self.section = section
+        self.semaphore = asyncio.Semaphore(concurrent_limit)
+        self.batch_size = min(batch_size, MAX_API_TITLES)
+        self.batch_delay = batch_delay
+        self.page_url = page_url
+        self.api_url = api_url
+
+        self.results: Dict[str, Optional[str]] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._queue: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def resolve(self, session, title: str) -> Optional[str]:
+        """
+        查询读音对应的 IPA
+        """
+        if title in self.results:
+            return self.results[title]
+        if title in self._pending:
+            return await asyncio.shield(self._pending[title])
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[title] = future
+        if self.batch_size > 1:
+            self._enqueue(session, title)
+        else:
+            self._spawn(self._resolve_page(session, title))
+        return await asyncio.shield(future)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _enqueue(self, session, title: str) -> None:
+        self._queue.append(title)
+        if len(self._queue) >= self.batch_size:
+            self._flush(session)
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.batch_delay, self._flush, session
+            )
+
+    def _flush(self, session) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        titles, self._queue = self._queue, []
+        if titles:
+            self._spawn(self._resolve_batch(session, titles))
+
+    def _finish(self, title: str, ipa: Optional[str], confirmed: bool = True) -> None:
+        """
+        返回结果给等待中的查询; 只有确认的结果才缓存, 临时失败时之后可以重新查询
+        """
+        if confirmed:
+            self.results[title] = ipa
+        future = self._pending.pop(title, None)
+        if future is not None and not future.done():
+            future.set_result(ipa)
+
+    async def _resolve_page(self, session, title: str) -> None:
+        """
+        请求单个页面并解析其中的 IPA
+        """
+        ipa, confirmed = None, False
+        try:
+            async with self.semaphore:
+                status, html = await self.scraper.fetch_page(
+                    session, f"{self.page_url}{title}#{self.section}", retry_attempts=1
+                )
+            confirmed = html is not None or status in NOT_FOUND_STATUSES
+            if html is not None:
+                ipa = await self.scraper.parse(
+                    partial(
+                        parse_wiktionary_ipa,
+                        section=self.section,
+                        backend=self.scraper.parser_backend,
+                    ),
+                    html,
+                )
+        except Exception as e:
+            logging.error(f"Error getting IPA for {title}: {str(e)}")
+        finally:
+            self._finish(title, ipa, confirmed)
+
+    async def _query_api(self, session, titles: List[str]) -> Dict[str, Optional[str]]:
+        """
+        一次查询多个标题的 wikitext, 返回 标题 -> wikitext (页面不存在时为 None)
+        """
+        query = urlencode(
+            {
+                "action": "query",
+                "format": "json",
+                "formatversion": "2",
+                "prop": "revisions",
+                "rvprop": "content",
+                "rvslots": "main",
+                "redirects": "1",
+                "titles": "|".join(titles),
+            }
+        )
+        async with self.semaphore:
+            text = await self.scraper.fetch_html(session, f"{self.api_url}?{query}")
+        if text is None:
+            return {}
+
+        data = json.loads(text).get("query", {})
+
+        # API 会规范化标题并跟随重定向, 需要映射回原始标题
+        aliases = {title: title for title in titles}
+        for mapping in data.get("normalized", []) + data.get("redirects", []):
+            for title, current in list(aliases.items()):
+                if current == mapping["from"]:
+                    aliases[title] = mapping["to"]
+
+        pages = {}
+        for page in data.get("pages", []):
+            revisions = page.get("revisions") or [{}]
+            content = revisions[0].get("slots", {}).get("main", {}).get("content")
+            pages[page["title"]] = None if page.get("missing") else content
+
+        return {
+            title: pages[alias] for title, alias in aliases.items() if alias in pages
+        }
+
+    async def _resolve_batch(self, session, titles: List[str]) -> None:
+        try:
+            pages = await self._query_api(session, titles)
+        except Exception as e:
+            logging.error(f"Error querying Wiktionary API: {str(e)}")
+            pages = {}
+
+        fallback = []
+        for title in titles:
+            if title in pages and pages[title] is None:
+                # 页面不存在, 无需再请求
+                self._finish(title, None)
+                continue
+
+            if title in pages and wikitext_section(pages[title], self.section) is None:
+                # 没有对应语言的段落, 页面中也不会有该语言的 IPA
+                self._finish(title, None)
+                continue
+
+            ipa = None
+            if title in pages:
+                ipa = parse_wikitext_ipa(pages[title], self.section)
+            if ipa:
+                self._finish(title, ipa)
+            else:
+                fallback.append(title)
+
+        await asyncio.gather(
+            *[self._resolve_page(session, title) for title in fallback]
+        )
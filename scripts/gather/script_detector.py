@@ -0,0 +1,129 @@
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+LANGUAGES = ("english", "chinese", "japanese", "korean")
+
+# 字符类别: L 拉丁字母, J 单词内连接符, H 汉字, K 假名, G 谚文, 其余为 O
+SCRIPT_RANGES = [
+    (0x0027, 0x0027, "J"),  # '
+    (0x002D, 0x002D, "J"),  # -
+    (0x0041, 0x005A, "L"),
+    (0x0061, 0x007A, "L"),
+    (0x00C0, 0x00D6, "L"),
+    (0x00D8, 0x00F6, "L"),
+    (0x00F8, 0x024F, "L"),
+    (0x1100, 0x11FF, "G"),  # 谚文字母
+    (0x2019, 0x2019, "J"),  # ’
+    (0x3040, 0x309F, "K"),  # 平假名
+    (0x30A0, 0x30FF, "K"),  # 片假名
+    (0x3130, 0x318F, "G"),  # 谚文兼容字母
+    (0x31F0, 0x31FF, "K"),  # 片假名音标扩展
+    (0x3400, 0x4DBF, "H"),  # 扩展 A
+    (0x4E00, 0x9FFF, "H"),
+    (0xAC00, 0xD7A3, "G"),  # 谚文音节
+    (0xF900, 0xFAFF, "H"),  # 兼容汉字
+    (0xFF66, 0xFF9F, "K"),  # 半角片假名
+    (0x20000, 0x2A6DF, "H"),  # 扩展 B
+    (0x2A700, 0x2EBEF, "H"),  # 扩展 C-F
+    (0x30000, 0x3134F, "H"),  # 扩展 G
+]
+
+
+def _build_table() -> str:
+    """
+    预先计算覆盖全部码位的类别表, str.translate 按码位查表一次完成分类
+    """
+    table = bytearray(b"O" * 0x110000)
+    for start, end, script in SCRIPT_RANGES:
+        table[start : end + 1] = script.encode("ascii") * (end - start + 1)
+    return table.decode("latin-1")
+
+
+_TABLE = _build_table()
+
+# 在类别串上切分语言片段: 含假名的汉字/假名串视为日语, 连接符只在字母之间有效
+_RUNS = re.compile(
+    r"(?P<english>L+(?:JL+)*)"
+    r"|(?P<korean>G+)"
+    r"|(?P<japanese>[HK]*K[HK]*)"
+    r"|(?P<chinese>H+)"
+)
+
+
+def classify(text: str) -> str:
+    """
+    返回与 text 等长的类别串
+    """
+    return text.translate(_TABLE)
+
+
+def split_runs(text: str) -> List[Tuple[str, str]]:
+    """
+    将文本切分为 (片段, 语言) 列表, 空白、数字和标点作为分隔符被丢弃
+    """
+    return [
+        (text[match.start() : match.end()], match.lastgroup)
+        for match in _RUNS.finditer(classify(text))
+    ]
+
+
+def detect_language(text: str) -> str:
+    """
+    检测文本的语言, 所有片段属于同一语言时返回该语言, 否则返回 unknown
+    """
+    languages = {lang for _, lang in split_runs(text)}
+    if len(languages) == 1:
+        return languages.pop()
+    return "unknown"
+
+
+def group_by_language(texts: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    将多段文本按语言分组, 混合文字的文本拆分后分别归入各自的语言, 保持首次出现的顺序
+    """
+    groups: Dict[str, Dict[str, None]] = {}
+    for text in texts:
+        for segment, lang in split_runs(text):
+            groups.setdefault(lang, {})[segment] = None
+    return {lang: list(segments) for lang, segments in groups.items()}
+
+
+def _synthetic_words(count: int) -> List[str]:
+    samples = ["pronunciation", "don't", "今日", "きょう", "今日は", "안녕하세요", "中国人"]
+    rng = random.Random(0)
+    return [rng.choice(samples) for _ in range(count)]
+
+
+def benchmark(words: List[str], repeat: int = 3) -> float:
+    """
+    返回 split_runs 的吞吐量 (词/秒), 取多次运行中最快的一次
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for word in words:
+            split_runs(word)
+        best = min(best, time.perf_counter() - start)
+    return len(words) / best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Script/language detector")
+    parser.add_argument("text", nargs="*", help="Text to classify")
+    parser.add_argument("--bench", action="store_true", help="Run the benchmark")
+    parser.add_argument("--words", type=int, default=1_000_000)
+    parser.add_argument("--file", help="Word list to benchmark (one per line)")
+    args = parser.parse_args()
+
+    if args.bench:
+        if args.file:
+            words = Path(args.file).read_text(encoding="utf-8").splitlines()
+        else:
+            words = _synthetic_words(args.words)
+        print(f"{len(words)} words: {benchmark(words):,.0f} words/s")
+    for text in args.text:
+        print(text, split_runs(text))
@@ -0,0 +1,332 @@
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Hashable, List, Optional
+
+from aiohttp import web
+
+from .codec import load_file
+from .ingest import normalize_word
+from .shards import MANIFEST_NAME, ShardedDataset
+
+# 查询语言 -> (发布数据中的语言, 英语记录中的字段)
+LANGUAGES = {
+    "en-uk": ("english", "uk"),
+    "en-us": ("english", "us"),
+    "ja": ("japanese", None),
+    "ko": ("korean", None),
+    "cn": ("chinese", None),
+}
+
+# 单次请求最多的查询数
+MAX_BATCH = 1000
+
+# 超过该长度 (字符) 的查询不缓存, 避免长文本占满缓存的内存
+MAX_CACHED_QUERY = 256
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    有容量上限的 LRU 缓存, 记录命中和未命中次数
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def _load_pinyin_annotator(dictionary: Path):
+    """
+    加载 .github/scripts/fetcher 下的拼音标注器
+    """
+    root = Path(__file__).resolve().parents[2]
+    fetcher_dir = root / ".github" / "scripts" / "fetcher"
+    if str(fetcher_dir) not in sys.path:
+        sys.path.insert(0, str(fetcher_dir))
+    from cn_annotator import PinyinAnnotator
+
+    return PinyinAnnotator.load(dictionary)
+
+
+class PronunciationIndex:
+    """
+    常驻内存的发音索引
+
+    启动时加载发布目录中的各语言数据 (完整 JSON, 否则按分片按需加载), 中文用拼音
+    标注器对文本分词标注. 查询结果缓存在 LRU 中
+    """
+
+    def __init__(
+        self,
+        release_dir: Path,
+        cn_dictionary: Optional[Path] = None,
+        cache_size: int = 100_000,
+    ):
+        self.release_dir = Path(release_dir)
+        self.datasets: Dict[str, Any] = {}
+        for lang in ("english", "japanese", "korean"):
+            dataset = self._load_dataset(lang)
+            if dataset is not None:
+                self.datasets[lang] = dataset
+
+        if cn_dictionary and Path(cn_dictionary).exists():
+            self.datasets["chinese"] = _load_pinyin_annotator(Path(cn_dictionary))
+
+        self.cache = LRUCache(cache_size)
+
+    def _load_dataset(self, lang: str) -> Optional[Any]:
+        full_file = self.release_dir / f"{lang}_pronunciations.json"
+        if full_file.exists():
+            return load_file(full_file)
+        if (self.release_dir / lang / MANIFEST_NAME).exists():
+            return ShardedDataset(self.release_dir / lang)
+        return None
+
+    def languages(self) -> List[str]:
+        return [
+            code for code, (lang, _) in LANGUAGES.items() if lang in self.datasets
+        ]
+
+    def check_language(self, code: str) -> None:
+        if not isinstance(code, str) or code not in LANGUAGES:
+            raise ValueError(f"Unknown language: {code}")
+        if LANGUAGES[code][0] not in self.datasets:
+            raise ValueError(f"Language not loaded: {code}")
+
+    @staticmethod
+    def _keys(code: str, query: str) -> List[str]:
+        """
+        查询依次尝试的数据键
+        """
+        if LANGUAGES[code][0] == "english":
+            # 键保留原来的大小写, 找不到时再按小写查询 ("Hello" -> "hello")
+            word = normalize_word(query)
+            return [word, word.lower()]
+        return [query.strip()]
+
+    def _resolve(self, code: str, query: str) -> Any:
+        lang, field = LANGUAGES[code]
+        dataset = self.datasets[lang]
+        if lang == "chinese":
+            return [list(segment) for segment in dataset.annotate(query)]
+
+        for key in self._keys(code, query):
+            record = dataset.get(key)
+            if record:
+                return record.get(field) if field else record
+        return None
+
+    def lookup(self, code: str, query: str) -> Any:
+        """
+        查询单个单词 (中文为一段文本), 未找到时返回 None
+        """
+        self.check_language(code)
+        if len(query) > MAX_CACHED_QUERY:
+            return self._resolve(code, query)
+
+        key = (code, query)
+        value = self.cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._resolve(code, query)
+            self.cache.put(key, value)
+        return value
+
+    def lookup_batch(self, code: str, queries: List[str]) -> Dict[str, Any]:
+        self.check_language(code)
+        return {query: self.lookup(code, query) for query in queries}
+
+    def unloaded_shards(self, code: str, queries: List[str]) -> List[int]:
+        """
+        查询需要、但尚未加载的分片编号 (完整数据集和已缓存的查询不需要)
+        """
+        self.check_language(code)
+        dataset = self.datasets[LANGUAGES[code][0]]
+        if not isinstance(dataset, ShardedDataset):
+            return []
+        return dataset.unloaded(
+            key
+            for query in queries
+            if (code, query) not in self.cache
+            for key in self._keys(code, query)
+        )
+
+    def load_shards(self, code: str, shards: List[int]) -> None:
+        dataset = self.datasets[LANGUAGES[code][0]]
+        for index in shards:
+            dataset.shard(index)
+
+
+class LatencyTracker:
+    """
+    记录最近若干次请求的耗时 (毫秒)
+    """
+
+    def __init__(self, window: int = 10_000):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.requests = 0
+
+    def record(self, elapsed_ms: float) -> None:
+        self.samples.append(elapsed_ms)
+        self.requests += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": max(self.samples, default=0.0),
+        }
+
+
+@web.middleware
+async def latency_middleware(request: web.Request, handler) -> web.StreamResponse:
+    """
+    每个请求的耗时写入 X-Response-Time-Ms 响应头并计入统计
+    """
+    start = time.perf_counter()
+    try:
+        response = await handler(request)
+    except web.HTTPException as e:
+        response = e
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    response.headers["X-Response-Time-Ms"] = f"{elapsed_ms:.3f}"
+    request.app["latency"].record(elapsed_ms)
+    if isinstance(response, web.HTTPException):
+        raise response
+    return response
+
+
+async def handle_lookup(request: web.Request) -> web.Response:
+    """
+    POST /lookup {"lang": "en-us", "queries": ["hello", ...]}
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        body = None
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text="Request body must be a JSON object")
+
+    code = body.get("lang")
+    queries = body.get("queries")
+    if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+        raise web.HTTPBadRequest(text="queries must be a list of strings")
+    if len(queries) > MAX_BATCH:
+        raise web.HTTPRequestEntityTooLarge(
+            max_size=MAX_BATCH, actual_size=len(queries)
+        )
+
+    index: PronunciationIndex = request.app["index"]
+    start = time.perf_counter()
+    try:
+        shards = index.unloaded_shards(code, queries)
+        if shards:
+            # 读取和解析分片较慢, 放到线程中, 不阻塞其他请求
+            await asyncio.to_thread(index.load_shards, code, shards)
+        results = index.lookup_batch(code, queries)
+    except ValueError as e:
+        raise web.HTTPBadRequest(text=str(e))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return web.json_response(
+        {"lang": code, "results": results, "lookup_ms": round(elapsed_ms, 3)}
+    )
+
+
+async def handle_stats(request: web.Request) -> web.Response:
+    index: PronunciationIndex = request.app["index"]
+    return web.json_response(
+        {
+            "languages": index.languages(),
+            "cache": index.cache.stats(),
+            "latency": request.app["latency"].stats(),
+        }
+    )
+
+
+async def handle_health(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok"})
+
+
+def create_app(index: PronunciationIndex) -> web.Application:
+    app = web.Application(middlewares=[latency_middleware])
+    app["index"] = index
+    app["latency"] = LatencyTracker()
+    app.router.add_post("/lookup", handle_lookup)
+    app.router.add_get("/stats", handle_stats)
+    app.router.add_get("/health", handle_health)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local pronunciation lookup service")
+    parser.add_argument("--release-dir", default="release")
+    parser.add_argument(
+        "--cn-dictionary",
+        default="extension/data/cn/data.json",
+        help="Pinyin trie from cn.py (JSON or .bin)",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--cache-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+    index = PronunciationIndex(
+        Path(args.release_dir), Path(args.cn_dictionary), args.cache_size
+    )
+    logging.info(
+        f"Loaded {', '.join(index.languages()) or 'no languages'} "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    web.run_app(create_app(index), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
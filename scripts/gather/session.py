@@ -0,0 +1,90 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import aiohttp
+from aiohttp import ClientTimeout
+
+
+class SessionManager:
+    """
+    共享的 aiohttp 会话和连接池
+
+    连接保持 keep-alive 并按主机限制连接数, DNS 结果会被缓存, 响应压缩由 aiohttp
+    自动协商 (Accept-Encoding) 和解压. 以 `async with` 使用时会话在整个运行期间保持打开,
+    多个爬虫和多轮抓取复用同一批 TLS 连接; 否则最后一个使用者退出时关闭会话
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        ttl_dns_cache: int = 300,
+        keepalive_timeout: float = 30,
+        timeout: Optional[ClientTimeout] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout or ClientTimeout(total=30, connect=10, sock_read=10)
+        self.headers = headers
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._persistent = False
+        self._users = 0
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.ttl_dns_cache,
+            keepalive_timeout=self.keepalive_timeout,
+            enable_cleanup_closed=True,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers=self.headers,
+            auto_decompress=True,
+        )
+
+    async def get(self) -> aiohttp.ClientSession:
+        """
+        返回当前事件循环上的共享会话, 需要时创建
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = self._create_session()
+            self._loop = loop
+        return self._session
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """
+        借用共享会话
+        """
+        self._users += 1
+        try:
+            yield await self.get()
+        finally:
+            self._users -= 1
+            if not self._persistent and not self._users:
+                await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self) -> "SessionManager":
+        self._persistent = True
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._persistent = False
+        if not self._users:
+            await self.close()
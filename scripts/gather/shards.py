@@ -0,0 +1,138 @@
+import hashlib
+import math
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from .atomic import atomic_write
+from .codec import dump_file, dumps, load_file
+
+MANIFEST_NAME = "manifest.json"
+SHARD_FORMAT = 1
+
+# FNV-1a 32 位哈希, 浏览器端几行代码即可实现相同的分片定位
+FNV_OFFSET = 0x811C9DC5
+FNV_PRIME = 0x01000193
+
+
+def fnv1a_32(text: str) -> int:
+    """
+    对 UTF-8 编码的字符串计算 FNV-1a 32 位哈希
+    """
+    value = FNV_OFFSET
+    for byte in text.encode("utf-8"):
+        value = ((value ^ byte) * FNV_PRIME) & 0xFFFFFFFF
+    return value
+
+
+def shard_index(word: str, shard_count: int) -> int:
+    """
+    单词所在的分片编号
+    """
+    return fnv1a_32(word) % shard_count
+
+
+def shard_name(index: int, sha256: str) -> str:
+    """
+    分片文件名带内容哈希, 内容变化的分片换用新文件, 不会覆盖旧清单引用的文件
+    """
+    return f"shard-{index:04d}-{sha256[:12]}.json"
+
+
+def split_shards(
+    data: Mapping[str, Any], shard_size: int = 2000
+) -> List[Dict[str, Any]]:
+    """
+    按单词哈希把数据划分为约 shard_size 条一片的分片, 分片内按单词排序
+    """
+    shard_count = max(1, math.ceil(len(data) / shard_size))
+    shards: List[Dict[str, Any]] = [{} for _ in range(shard_count)]
+    for word in sorted(data):
+        shards[shard_index(word, shard_count)][word] = data[word]
+    return shards
+
+
+def write_shards(
+    data: Mapping[str, Any], output_dir: Path, shard_size: int = 2000
+) -> Dict[str, Any]:
+    """
+    将数据写为分片文件和清单, 返回清单内容
+
+    清单记录分片数量、哈希算法以及每个分片的文件名、条目数和 sha256,
+    使用方对单词计算哈希后只需加载对应的分片.
+
+    分片按内容命名, 新分片写在旧分片旁边, 最后替换清单: 读到旧清单的使用方在清单
+    替换前总能读到与之一致的分片; 旧分片在清单替换后删除, 此后仍持有旧清单的使用方
+    会找不到文件, 需要重新读取清单
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    shards = split_shards(data, shard_size)
+    entries = []
+    for index, shard in enumerate(shards):
+        raw = dumps(shard)
+        sha256 = hashlib.sha256(raw).hexdigest()
+        path = output_dir / shard_name(index, sha256)
+        # 内容相同的分片已经存在时无需重写
+        if not path.exists():
+            atomic_write(path, raw)
+        entries.append(
+            {
+                "file": path.name,
+                "entries": len(shard),
+                "bytes": len(raw),
+                "sha256": sha256,
+            }
+        )
+
+    manifest = {
+        "format": SHARD_FORMAT,
+        "hash": "fnv1a32",
+        "shard_count": len(shards),
+        "entries": len(data),
+        "shards": entries,
+    }
+    # 清单在所有分片之后写入, 旧清单引用的分片等清单替换后再删除
+    dump_file(output_dir / MANIFEST_NAME, manifest, pretty=True)
+    current = {entry["file"] for entry in entries}
+    for stale in output_dir.glob("shard-*.json"):
+        if stale.name not in current:
+            stale.unlink()
+    return manifest
+
+
+class ShardedDataset:
+    """
+    按需加载分片的只读数据集, 已加载的分片会被缓存
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.manifest = load_file(self.directory / MANIFEST_NAME)
+        if self.manifest.get("format") != SHARD_FORMAT:
+            raise ValueError(f"Unsupported shard format in {self.directory}")
+        self._loaded: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return self.manifest["entries"]
+
+    def shard(self, index: int) -> Dict[str, Any]:
+        if index not in self._loaded:
+            file_name = self.manifest["shards"][index]["file"]
+            self._loaded[index] = load_file(self.directory / file_name)
+        return self._loaded[index]
+
+    def get(self, word: str) -> Optional[Any]:
+        index = shard_index(word, self.manifest["shard_count"])
+        return self.shard(index).get(word)
+
+    def unloaded(self, words: Iterable[str]) -> List[int]:
+        """
+        这些单词所在、尚未加载的分片编号
+        """
+        count = self.manifest["shard_count"]
+        needed = {shard_index(word, count) for word in words}
+        return sorted(needed - self._loaded.keys())
+
+    @property
+    def loaded_shards(self) -> List[int]:
+        return sorted(self._loaded)
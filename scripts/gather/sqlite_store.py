@@ -0,0 +1,251 @@
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .atomic import atomic_open
+from .codec import dumps, load_file, loads
+from .journal import EMPTY_CHECKPOINT
+
+_IDENTIFIER = re.compile(r"[^0-9A-Za-z_]")
+
+
+def _identifier(name: str) -> str:
+    """
+    表名/列名只保留字母、数字和下划线
+    """
+    return _IDENTIFIER.sub("_", name)
+
+
+class SQLiteStore:
+    """
+    SQLite 结果存储, 可替代 ResultJournal
+
+    每个来源一张表, 每个发音字段一列 (NULL 表示没有该字段), 其余字段以 JSON 存在
+    extra 列. 每个字段都有 "为空" 的部分索引, 缺失查询不需要扫描全部记录; WAL 模式下
+    导出和更新工具可以在爬虫写入时并发读取. 导出的 JSON 与原来的输出格式一致
+    """
+
+    def __init__(
+        self,
+        db_file: Path,
+        source: str,
+        fields: Sequence[str],
+        output_file: Optional[Path] = None,
+        legacy_checkpoint: Optional[Path] = None,
+        busy_timeout: float = 30.0,
+    ):
+        self.db_file = Path(db_file)
+        self.source = source
+        self.fields = list(fields)
+        self.output_file = Path(output_file) if output_file else None
+        self.legacy_checkpoint = legacy_checkpoint
+        self.table = f"records_{_identifier(source)}"
+
+        self._lock = threading.RLock()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            self.db_file, timeout=busy_timeout, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+        # 首次打开时导入已有的 JSON 输出
+        if self.output_file and self.output_file.exists() and not len(self):
+            self.import_json(self.output_file)
+
+    def _create_schema(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(word TEXT PRIMARY KEY, extra TEXT)"
+            )
+            columns = {
+                row[1] for row in self._conn.execute(f"PRAGMA table_info({self.table})")
+            }
+            for field in self.fields:
+                column = _identifier(field)
+                if column not in columns:
+                    self._conn.execute(
+                        f"ALTER TABLE {self.table} ADD COLUMN {column} TEXT"
+                    )
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {self.table}_missing_{column} "
+                    f"ON {self.table}(word) WHERE {self._empty(field)}"
+                )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints "
+                "(source TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+
+    @staticmethod
+    def _empty(field: str) -> str:
+        return f"coalesce(trim({_identifier(field)}), '') = ''"
+
+    def _row(self, word: str, record: Dict[str, Any]) -> List[Any]:
+        extra = {
+            key: value
+            for key, value in record.items()
+            if key != "word" and key not in self.fields
+        }
+        return [word, dumps(extra).decode("utf-8") if extra else None] + [
+            record.get(field) for field in self.fields
+        ]
+
+    def _record(self, row: Sequence[Any]) -> Dict[str, Any]:
+        record: Dict[str, Any] = {"word": row[0]}
+        for field, value in zip(self.fields, row[2:]):
+            if value is not None:
+                record[field] = value
+        if row[1]:
+            record.update(loads(row[1]))
+        return record
+
+    def append(
+        self, results: Dict[str, Dict[str, Any]], checkpoint: Optional[Dict] = None
+    ) -> None:
+        """
+        写入 (覆盖) 一批结果, 检查点在同一个事务中保存
+        """
+        columns = ["word", "extra"] + [_identifier(field) for field in self.fields]
+        placeholders = ", ".join("?" for _ in columns)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} ({', '.join(columns)}) "
+                f"VALUES ({placeholders})",
+                [self._row(word, record) for word, record in results.items()],
+            )
+            if checkpoint is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints (source, data) VALUES (?, ?)",
+                    (self.source, dumps(checkpoint).decode("utf-8")),
+                )
+
+    def checkpoint(self, last_word: str, count: int) -> None:
+        self.append({}, {"last_word": last_word, "processed_count": count})
+
+    def last_checkpoint(self) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM checkpoints WHERE source = ?", (self.source,)
+            ).fetchone()
+        if row:
+            return loads(row[0])
+
+        if self.legacy_checkpoint and self.legacy_checkpoint.exists():
+            return load_file(self.legacy_checkpoint)
+
+        return dict(EMPTY_CHECKPOINT)
+
+    def __len__(self) -> int:
+        with self._lock:
+            query = f"SELECT count(*) FROM {self.table}"
+            return self._conn.execute(query).fetchone()[0]
+
+    def exists(self) -> bool:
+        return len(self) > 0
+
+    def get(self, word: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT * FROM {self.table} WHERE word = ?", (word,)
+            ).fetchone()
+        return self._record(row) if row else None
+
+    def contains(self, word: str) -> bool:
+        """
+        单词是否已有记录, 走主键索引
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT 1 FROM {self.table} WHERE word = ?", (word,)
+            ).fetchone()
+        return row is not None
+
+    def _select(
+        self, query: str, params: Iterable[Any] = (), batch_size: int = 1000
+    ) -> Iterator[Sequence]:
+        """
+        按 word 分页读取查询结果 (首列须为 word), 内存占用与数据量无关
+
+        只在读取每一页时持有锁, 导出大量数据时后台写入线程仍能在页与页之间写入
+        """
+        params = tuple(params)
+        after = None
+        while True:
+            with self._lock:
+                if after is None:
+                    rows = self._conn.execute(
+                        f"SELECT * FROM ({query}) ORDER BY word LIMIT ?",
+                        params + (batch_size,),
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        f"SELECT * FROM ({query}) WHERE word > ? ORDER BY word LIMIT ?",
+                        params + (after, batch_size),
+                    ).fetchall()
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            after = rows[-1][0]
+
+    def keys(self) -> List[str]:
+        return [row[0] for row in self._select(f"SELECT word FROM {self.table}")]
+
+    def items(self) -> Iterator[tuple]:
+        for row in self._select(f"SELECT * FROM {self.table}"):
+            yield row[0], self._record(row)
+
+    def missing(self, fields: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        任一字段为空的单词, 使用各字段的部分索引
+        """
+        queries = [
+            f"SELECT word FROM {self.table} WHERE {self._empty(field)}"
+            for field in fields or self.fields
+        ]
+        return [row[0] for row in self._select(" UNION ".join(queries))]
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        return dict(self.items())
+
+    def import_json(self, path: Path) -> int:
+        data = load_file(path)
+        self.append(data)
+        logging.info(f"Imported {len(data)} records from {path} into {self.db_file}")
+        return len(data)
+
+    def export_json(self, path: Path) -> int:
+        """
+        逐条写出与原输出相同格式的 JSON, 返回记录数
+        """
+        count = 0
+        with atomic_open(path, "wb") as f:
+            f.write(b"{")
+            for word, record in self.items():
+                if count:
+                    f.write(b",")
+                f.write(dumps(word) + b":" + dumps(record))
+                count += 1
+            f.write(b"}")
+        return count
+
+    def needs_compaction(self) -> bool:
+        return False
+
+    def compact(self) -> int:
+        """
+        与 ResultJournal 接口一致: 导出 JSON 输出文件, 返回记录数
+
+        不返回数据本身, 需要记录的调用方用 items() 逐条读取
+        """
+        if self.output_file is not None:
+            return self.export_json(self.output_file)
+        return len(self)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
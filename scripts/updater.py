@@ -1,92 +1,116 @@
-import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
-import re
-from gather import gather_pronunciation
+from typing import Callable, Dict, List, Optional, Tuple
 
-# Language detection patterns
-LANGUAGE_PATTERNS = {
-    "english": re.compile(r"^[a-zA-Z\s.,!?\'\"()-]+$"),
-    "chinese": re.compile(r"[\u4e00-\u9fff]"),
-    "hangul": re.compile(r"[\uAC00-\uD7A3]"),
-    "japanese": re.compile(r"[\u3040-\u30FF]"),
-}
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from scripts.gather.codec import dump_file, load_file  # noqa: E402
+from scripts.gather.script_detector import (  # noqa: E402,F401
+    detect_language,
+    group_by_language,
+)
 
-def detect_language(text: str) -> str:
-    """Detect the language of input text"""
-    for lang, pattern in LANGUAGE_PATTERNS.items():
-        if pattern.search(text):
-            return lang
-    return "unknown"
 
+def _load_json(path: Path) -> Dict:
+    return load_file(path)
 
-def update_pronunciation_data(inputs: List[str]) -> None:
-    """Main entry point for the pronunciation data updater"""
+
+def plan_updates(inputs: List[str]) -> Dict[str, List[str]]:
+    """Detect the language of every input and group the unique words by language
+
+    Mixed-script inputs are split into one word per script run.
+    """
+    planned = group_by_language(inputs)
+    if "english" in planned:
+        planned["english"] = list(dict.fromkeys(w.lower() for w in planned["english"]))
+    return planned
+
+
+def update_pronunciation_data(
+    inputs: List[str],
+    data_dir: Optional[Path] = None,
+    gather: Optional[Callable[[str, str], Optional[Dict]]] = None,
+    max_workers: int = 8,
+) -> int:
+    """Main entry point for the pronunciation data updater
+
+    Every dataset is loaded once, missing words are gathered concurrently and
+    each changed file is written once at the end. Returns the number of words
+    added or updated.
+    """
+    if gather is None:
+        from gather import gather_pronunciation as gather
 
     # Get extension data directory path
-    extension_dir = Path(__file__).parent.parent / "extension"
-    data_dir = extension_dir / "data"
-
-    # Process each input string
-    for text in inputs:
-        # Detect language
-        lang = detect_language(text)
-        if lang == "unknown":
+    if data_dir is None:
+        extension_dir = Path(__file__).parent.parent / "extension"
+        data_dir = extension_dir / "data"
+
+    uk_data_path = data_dir / "en" / "uk.json"
+    us_data_path = data_dir / "en" / "us.json"
+    lang_map = {"japanese": "ja", "chinese": "zh", "korean": "ko"}
+
+    datasets: Dict[Path, Dict] = {}
+
+    def dataset(path: Path) -> Dict:
+        if path not in datasets:
+            datasets[path] = _load_json(path)
+        return datasets[path]
+
+    # Collect the words missing from their datasets
+    jobs: List[Tuple[str, str]] = []
+    for lang, words in plan_updates(inputs).items():
+        for word in words:
+            if lang == "english":
+                uk_data, us_data = dataset(uk_data_path), dataset(us_data_path)
+                missing = word not in uk_data or word not in us_data
+            else:
+                data_path = data_dir / lang_map[lang] / "pronunciations.json"
+                missing = word not in dataset(data_path)
+            if missing:
+                jobs.append((lang, word))
+
+    def fetch(job: Tuple[str, str]) -> Optional[Dict]:
+        lang, word = job
+        try:
+            return gather(word, lang)
+        except Exception as e:
+            logging.error(f"Error gathering {lang} pronunciation for {word}: {e}")
+            return None
+
+    # Gather new pronunciation data concurrently
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        results = list(pool.map(fetch, jobs))
+
+    changed = set()
+    updated = 0
+    for (lang, word), pron_data in zip(jobs, results):
+        if not pron_data:
             continue
+        updated += 1
 
-        # Handle different languages
         if lang == "english":
-            # Load existing pronunciation data
-            uk_data_path = data_dir / "en" / "uk.json"
-            us_data_path = data_dir / "en" / "us.json"
-
-            with open(uk_data_path, "r", encoding="utf-8") as f:
-                uk_data = json.load(f)
-            with open(us_data_path, "r", encoding="utf-8") as f:
-                us_data = json.load(f)
-
-            # Check if word exists
-            word = text.lower().strip()
-            if word not in uk_data or word not in us_data:
-                # Gather new pronunciation data
-                pron_data = gather_pronunciation(word, "english")
-                if pron_data:
-                    # Update UK data
-                    uk_data[word] = {
-                        "ipa": pron_data.get("uk_ipa", ""),
-                        "audio": pron_data.get("uk_audio", ""),
-                    }
-                    # Update US data
-                    us_data[word] = {
-                        "ipa": pron_data.get("us_ipa", ""),
-                        "audio": pron_data.get("us_audio", ""),
-                    }
-
-                    # Save updated data
-                    with open(uk_data_path, "w", encoding="utf-8") as f:
-                        json.dump(uk_data, f, ensure_ascii=False, indent=2)
-                    with open(us_data_path, "w", encoding="utf-8") as f:
-                        json.dump(us_data, f, ensure_ascii=False, indent=2)
-
+            datasets[uk_data_path][word] = {
+                "ipa": pron_data.get("uk_ipa", ""),
+                "audio": pron_data.get("uk_audio", ""),
+            }
+            datasets[us_data_path][word] = {
+                "ipa": pron_data.get("us_ipa", ""),
+                "audio": pron_data.get("us_audio", ""),
+            }
+            changed.update([uk_data_path, us_data_path])
         else:
-            # Handle other languages (Japanese, Korean, Chinese)
-            lang_map = {"japanese": "ja", "mandarin": "zh", "hangul": "ko"}
-
             data_path = data_dir / lang_map[lang] / "pronunciations.json"
+            datasets[data_path][word] = {
+                "ipa": pron_data.get("ipa", ""),
+                "audio": pron_data.get("audio", ""),
+            }
+            changed.add(data_path)
+
+    # Save each updated file once
+    for path in changed:
+        dump_file(path, datasets[path])
 
-            with open(data_path, "r", encoding="utf-8") as f:
-                lang_data = json.load(f)
-
-            if text not in lang_data:
-                # Gather new pronunciation data
-                pron_data = gather_pronunciation(text, lang)
-                if pron_data:
-                    lang_data[text] = {
-                        "ipa": pron_data.get("ipa", ""),
-                        "audio": pron_data.get("audio", ""),
-                    }
-
-                    # Save updated data
-                    with open(data_path, "w", encoding="utf-8") as f:
-                        json.dump(lang_data, f, ensure_ascii=False, indent=2)
+    return updated
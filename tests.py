@@ -1,4 +1,13 @@
-from scripts.gather.base_scraper import make_chunks
+import asyncio
+import json
+from pathlib import Path
+
+import aiohttp
+import pytest
+
+from scripts.gather.base_scraper import BasePronunciationScraper, make_chunks
+
+PAGES_DIR = Path(__file__).parent / "scripts" / "gather" / "fixtures" / "pages"
 
 
 def test_make_chunks_basic():
@@ -34,3 +43,1423 @@ def test_make_chunks_string_input():
     data = iter(["a", "b", "c", "d"])
     chunks = list(make_chunks(data, chunk_size=3))
     assert chunks == [["a", "b", "c"], ["d"]]
+
+
+def test_result_journal_append_and_compact(tmp_path):
+    # Appended results and checkpoints survive a reload and a compaction
+    from scripts.gather.journal import ResultJournal
+
+    output = tmp_path / "demo_pronunciation_data.json"
+    journal = ResultJournal(output, segment_size=2, compact_every=3)
+    journal.append({"a": {"us": "1"}}, {"last_word": "a", "processed_count": 1})
+    journal.append({"b": {"us": "2"}, "c": {"us": "3"}})
+    journal.checkpoint("c", 3)
+
+    assert journal.load() == {"a": {"us": "1"}, "b": {"us": "2"}, "c": {"us": "3"}}
+    assert journal.last_checkpoint() == {"last_word": "c", "processed_count": 3}
+    assert journal.needs_compaction()
+
+    assert journal.compact() == 3
+    journal.close()
+    assert json.loads(output.read_text()) == journal.load()
+    assert len(list(journal.journal_dir.glob("segment-*.jsonl"))) == 1
+    assert ResultJournal(output).last_checkpoint()["last_word"] == "c"
+
+    # The key index follows appends and is rebuilt if the output changes outside
+    journal = ResultJournal(output)
+    assert journal.contains("b") and not journal.contains("d")
+    journal.append({"d": {"us": "4"}})
+    assert journal.contains("d") and ResultJournal(output).contains("d")
+    journal.close()
+    output.write_text(json.dumps({"e": {"us": "5"}}))
+    assert sorted(ResultJournal(output).keys()) == ["d", "e"]
+
+
+def test_result_journal_ignores_truncated_tail(tmp_path):
+    # A torn final line left by a crash is skipped on replay
+    from scripts.gather.journal import ResultJournal
+
+    output = tmp_path / "demo_pronunciation_data.json"
+    journal = ResultJournal(output)
+    journal.append({"a": {"us": "1"}})
+    journal.close()
+    segment = next(journal.journal_dir.iterdir())
+    with segment.open("a") as f:
+        f.write('{"w": "b", "d": {"us"')
+
+    assert ResultJournal(output).load() == {"a": {"us": "1"}}
+
+
+class _FakeScraper(BasePronunciationScraper):
+    fields = ("us",)
+
+    def __init__(self, data_dir, **kwargs):
+        super().__init__("fake", data_dir=str(data_dir), **kwargs)
+
+    async def get_pronunciation(self, session, word):
+        return {"word": word, "us": word.upper()}
+
+    def find_missing_words(self, data):
+        return [word for word, details in data.items() if not details.get("us")]
+
+    def is_empty_data(self, details):
+        return not details.get("us", "").strip()
+
+
+def test_process_specific_words_writes_through_journal(tmp_path):
+    # Batches are appended to the journal and compacted into the output file
+    scraper = _FakeScraper(tmp_path, chunk_size=2)
+    scraper.output_file.write_text(json.dumps({"alpha": {"word": "alpha", "us": ""}}))
+
+    words = ["alpha", "beta", "gamma"]
+    asyncio.run(scraper.process_specific_words(words, scraper.output_file))
+
+    expected = {w: {"word": w, "us": w.upper()} for w in ["alpha", "beta", "gamma"]}
+    assert json.loads(scraper.output_file.read_text()) == expected
+
+
+CAMBRIDGE_PAGE = """
+<html><body>
+<span class="uk dpron-i"><span class="region">uk</span>
+<span class="pron dpron">/<span class="ipa dipa">həˈləʊ</span>/</span></span>
+<span class="us dpron-i"><span class="pron dpron">/<span class="ipa dipa">heˈloʊ</span>/</span></span>
+</body></html>
+"""
+
+
+def test_scraper_extractors_are_pure_functions():
+    # Extractors turn raw HTML into the fields each scraper stores
+    from scripts.gather.scrapers.cambridge_scraper import parse_cambridge_page
+    from scripts.gather.scrapers.merriam_webster_scraper import (
+        parse_merriam_webster_page,
+    )
+
+    assert parse_cambridge_page(CAMBRIDGE_PAGE) == {"uk": "həˈləʊ", "us": "heˈloʊ"}
+    assert parse_cambridge_page("<html></html>") == {"uk": "", "us": ""}
+    mw_page = (
+        '<div class="prons-entries-list"><span class="pr"> \\\\hə-ˈlō\\\\ </span></div>'
+    )
+    assert parse_merriam_webster_page(mw_page) == "hə-ˈlō"
+
+
+def test_parse_runs_in_process_pool(tmp_path):
+    # Pages shipped to the process pool parse to the same result as inline
+    from scripts.gather.scrapers.cambridge_scraper import parse_cambridge_page
+
+    scraper = _FakeScraper(tmp_path, parse_executor="process", parse_workers=1)
+    try:
+        result = asyncio.run(scraper.parse(parse_cambridge_page, CAMBRIDGE_PAGE))
+    finally:
+        scraper.close()
+    assert result == parse_cambridge_page(CAMBRIDGE_PAGE)
+
+
+def _page_extractors():
+    from functools import partial
+
+    from scripts.gather.scrapers.cambridge_scraper import parse_cambridge_page
+    from scripts.gather.scrapers.jisho_scraper import parse_jisho_page
+    from scripts.gather.scrapers.merriam_webster_scraper import (
+        parse_merriam_webster_page,
+    )
+    from scripts.gather.scrapers.naver_scraper import parse_naver_page
+    from scripts.gather.scrapers.wiktionary import parse_wiktionary_ipa
+
+    return {
+        "cambridge": parse_cambridge_page,
+        "merriam_webster": parse_merriam_webster_page,
+        "jisho": parse_jisho_page,
+        "naver": parse_naver_page,
+        "wiktionary_japanese": partial(parse_wiktionary_ipa, section="Japanese"),
+        "wiktionary_korean": partial(parse_wiktionary_ipa, section="Korean"),
+    }
+
+
+@pytest.mark.parametrize("backend", ["bs4", "stream", "lxml", "selectolax"])
+def test_extractor_backends_match_saved_pages(backend):
+    # Every backend reproduces the recorded output for the saved page corpus
+    from scripts.gather.extractors import available_backends
+
+    if backend not in available_backends():
+        pytest.skip(f"{backend} is not installed")
+
+    extractors = _page_extractors()
+    expected = json.loads((PAGES_DIR / "expected.json").read_text(encoding="utf-8"))
+    for page, outputs in expected.items():
+        html = (PAGES_DIR / page).read_text(encoding="utf-8")
+        for name, output in outputs.items():
+            assert extractors[name](html, backend=backend) == output, (page, name)
+
+
+def test_streaming_extractor_stops_at_first_match():
+    # The streaming parser stops feeding once every query is answered
+    from scripts.gather.extractors import Step, StreamingExtractor
+
+    extractor = StreamingExtractor({"kana": (Step("span", "furigana"),)})
+    html = '<span class="furigana">きょう</span>' + "<div>" * 1000
+    assert extractor.extract(html) == {"kana": "きょう"}
+    assert len(extractor.stack) < 10
+
+
+def test_sliding_window_keeps_slots_busy():
+    # A slow item occupies one slot while the others keep draining the input
+    from scripts.gather.scheduler import SlidingWindowScheduler
+
+    finished, checkpoints = [], []
+
+    async def worker(item):
+        await asyncio.sleep(0.05 if item == 0 else 0)
+        return item
+
+    async def on_result(item, result):
+        finished.append(result)
+
+    async def on_checkpoint(item):
+        checkpoints.append(item)
+
+    scheduler = SlidingWindowScheduler(
+        worker, 3, on_result=on_result, on_checkpoint=on_checkpoint
+    )
+    assert asyncio.run(scheduler.run(range(20))) == 20
+    assert finished[-1] == 0
+    assert sorted(finished) == list(range(20))
+    # The low-water mark only moves once the slow first item is done
+    assert checkpoints == [19]
+
+
+def test_process_word_list_resumes_after_low_water_mark(tmp_path):
+    # Resume starts right after the checkpointed line instead of the top
+    words = tmp_path / "words.txt"
+    words.write_text("alpha\n\nbeta\ngamma\ndelta\n")
+
+    scraper = _FakeScraper(tmp_path, chunk_size=2)
+    scraper.save_checkpoint("alpha", 1)
+    scraper.journal.append({}, {"last_word": "beta", "processed_count": 2, "line": 3})
+    assert asyncio.run(scraper.process_word_list(str(words))) == 2
+
+    assert sorted(json.loads(scraper.output_file.read_text())) == ["delta", "gamma"]
+    checkpoint = scraper.load_checkpoint()
+    assert checkpoint["last_word"] == "delta"
+    assert (checkpoint["processed_count"], checkpoint["line"]) == (4, 5)
+
+    # A fresh run without a checkpoint processes every non-blank line
+    fresh = _FakeScraper(tmp_path / "fresh")
+    assert asyncio.run(fresh.process_word_list(str(words))) == 4
+    assert sorted(json.loads(fresh.output_file.read_text())) == sorted(
+        ["alpha", "beta", "gamma", "delta"]
+    )
+
+
+def test_process_word_list_seeks_to_checkpoint_offset(tmp_path):
+    # Resume seeks to the byte offset and checks the line hash before trusting it
+    words = tmp_path / "words.txt"
+    words.write_bytes("alpha\nbéta\n\ngamma\ndelta\n".encode("utf-8"))
+
+    scraper = _FakeScraper(tmp_path, chunk_size=1, window_size=1)
+    with words.open("rb") as f:
+        entries = list(scraper.iter_word_list(f, {}))
+    assert [(e.line, e.word, e.offset) for e in entries] == [
+        (0, "alpha", 0),
+        (1, "béta", 6),
+        (3, "gamma", 13),
+        (4, "delta", 19),
+    ]
+
+    beta = entries[1]
+    checkpoint = {"line": 2, "offset": beta.offset, "hash": beta.digest}
+    with words.open("rb") as f:
+        resumed = [e.word for e in scraper.iter_word_list(f, checkpoint)]
+    assert resumed == ["gamma", "delta"]
+
+    # A line inserted before the checkpoint invalidates the offset
+    words.write_bytes("new\nalpha\nbéta\n\ngamma\ndelta\n".encode("utf-8"))
+    with words.open("rb") as f:
+        resumed = [e.word for e in scraper.iter_word_list(f, checkpoint)]
+    assert resumed == ["béta", "gamma", "delta"]
+
+    asyncio.run(scraper.process_word_list(str(words)))
+    checkpoint = scraper.load_checkpoint()
+    assert checkpoint["line"] == 6
+    assert checkpoint["offset"] == len("new\nalpha\nbéta\n\ngamma\n".encode("utf-8"))
+
+
+def test_process_word_list_skips_duplicates_and_existing(tmp_path):
+    # Words are normalized (case kept), deduplicated and filtered against the
+    # output through the journal's key index, without loading the records
+    words = tmp_path / "words.txt"
+    words.write_text("Alpha\n  \nbeta\nALPHA\n gamma  \nbeta\nUS\nus\nAlpha\n")
+
+    requested = []
+    scraper = _FakeScraper(tmp_path, chunk_size=2)
+    scraper.output_file.write_text(json.dumps({"gamma": {"word": "gamma", "us": "G"}}))
+    get_pronunciation = scraper.get_pronunciation
+
+    async def record(session, word):
+        requested.append(word)
+        return await get_pronunciation(session, word)
+
+    scraper.get_pronunciation = record
+    assert asyncio.run(scraper.process_word_list(str(words))) == 6
+
+    assert requested == ["Alpha", "beta", "ALPHA", "US", "us"]
+    output = json.loads(scraper.output_file.read_text())
+    assert sorted(output) == ["ALPHA", "Alpha", "US", "beta", "gamma", "us"]
+
+    # A rerun answers membership from the key index; records are only read by the
+    # final compaction, after scraping
+    scraper = _FakeScraper(tmp_path, chunk_size=2)
+    load = scraper.journal._load
+    loads_before_scraping = []
+
+    def tracked_load():
+        loads_before_scraping.append(not requested)
+        return load()
+
+    scraper.journal._load = tracked_load
+    scraper.journal.last_checkpoint = lambda: {"last_word": "", "processed_count": 0}
+    scraper.get_pronunciation = record
+    words.write_text("beta\ndelta\n")
+    requested.clear()
+    asyncio.run(scraper.process_word_list(str(words)))
+    assert requested == ["delta"]
+    assert not any(loads_before_scraping)
+
+
+def test_bloom_seen_filter_has_no_false_negatives(tmp_path):
+    # The Bloom filter never forgets a word and rarely flags new ones
+    from scripts.gather.base_scraper import count_lines
+    from scripts.gather.ingest import BloomFilter, WordIngestor
+
+    (tmp_path / "a.txt").write_bytes(b"one\ntwo\nthree")
+    (tmp_path / "b.txt").write_bytes(b"one\ntwo\n")
+    assert count_lines(tmp_path / "a.txt") == 3 and count_lines(tmp_path / "b.txt") == 2
+
+    bloom = BloomFilter(1000, error_rate=0.01)
+    assert not any(bloom.add(f"word{i}") for i in range(100))
+    assert all(f"word{i}" in bloom for i in range(100))
+    assert sum(f"other{i}" in bloom for i in range(1000)) < 20
+
+    ingestor = WordIngestor(["Known"], seen_filter="bloom", expected_words=100)
+    entries = [(0, "Known"), (1, "New"), (2, " New "), (3, ""), (4, "new")]
+    assert [entry[:2] for entry in ingestor.filter(entries)] == [(1, "New"), (4, "new")]
+    assert ingestor.stats == {
+        "read": 5,
+        "blank": 1,
+        "duplicate": 1,
+        "existing": 1,
+        "new": 2,
+    }
+    assert "bloom filter dropped 1 words" in ingestor.summary()
+
+    # Past its capacity the filter grows instead of letting false positives climb
+    ingestor = WordIngestor(seen_filter="bloom", expected_words=500, error_rate=0.01)
+    accepted = sum(ingestor.accept(f"word{i}") is not None for i in range(20000))
+    assert len(ingestor.seen.filters) > 1
+    assert accepted > 20000 * 0.98
+
+
+def test_adaptive_rate_limiter_aimd():
+    # Successes grow the window additively, throttling halves it once per round
+    from scripts.gather.ratelimit import AdaptiveRateLimiter
+
+    now = [0.0]
+    limiter = AdaptiveRateLimiter(rate=4, initial_concurrency=4, clock=lambda: now[0])
+    for _ in range(4):
+        limiter.record("example.org", 200, 0.1)
+    assert 4.9 < limiter.host("example.org").concurrency < 5
+
+    limiter.record("example.org", 429, 0.1, retry_after=3)
+    limiter.record("example.org", 429, 0.1)
+    state = limiter.host("example.org")
+    assert 2.4 < state.concurrency < 2.5
+    assert state.bucket.rate < 4
+    assert state.paused_until == 3
+
+    now[0] = 5.0
+    limiter.record("example.org", 503, 0.1)
+    assert state.limit == 1
+
+
+def test_parse_retry_after():
+    from scripts.gather.ratelimit import parse_retry_after
+
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480) == 10
+    assert parse_retry_after("soon") is None
+
+
+def test_fetch_html_backs_off_on_throttling(tmp_path):
+    # 429 responses are retried after Retry-After, 404 is not retried at all
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    from scripts.gather.ratelimit import AdaptiveRateLimiter
+
+    calls = {"busy": 0, "missing": 0}
+
+    async def busy(request):
+        calls["busy"] += 1
+        if calls["busy"] < 3:
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        return web.Response(text="ok")
+
+    async def missing(request):
+        calls["missing"] += 1
+        return web.Response(status=404)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/busy", busy)
+        app.router.add_get("/missing", missing)
+        scraper = _FakeScraper(
+            tmp_path, retry_delay=0, rate_limiter=AdaptiveRateLimiter(rate=100)
+        )
+        async with TestServer(app) as server, aiohttp.ClientSession() as session:
+            busy_html = await scraper.fetch_html(session, str(server.make_url("/busy")))
+            missing_html = await scraper.fetch_html(
+                session, str(server.make_url("/missing"))
+            )
+        return scraper, busy_html, missing_html
+
+    scraper, busy_html, missing_html = asyncio.run(run())
+    assert busy_html == "ok" and calls["busy"] == 3
+    assert missing_html is None and calls["missing"] == 1
+    assert len(scraper.rate_limiter.hosts) == 1
+
+
+def test_session_manager_shares_one_session():
+    # Borrowers share one session while the manager is held open for the run
+    from scripts.gather.session import SessionManager
+
+    async def run():
+        manager = SessionManager(limit_per_host=4)
+        async with manager:
+            async with manager.session() as first:
+                pass
+            async with manager.session() as second:
+                assert second is first and not first.closed
+                assert first.connector.limit_per_host == 4
+        assert first.closed
+
+        # Without the outer context the last borrower closes the session
+        async with manager.session() as third:
+            assert third is not first
+        assert third.closed
+
+    asyncio.run(run())
+
+
+def test_response_cache_revalidates_and_replays(tmp_path):
+    # Stale entries send conditional GETs; replay mode never touches the network
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    seen = []
+
+    async def page(request):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text="<p>page</p>", headers={"ETag": '"v1"'})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/page", page)
+        scraper = _FakeScraper(tmp_path, cache="normal", cache_ttl=0)
+        async with TestServer(app) as server, aiohttp.ClientSession() as session:
+            url = str(server.make_url("/page"))
+            first = await scraper.fetch_html(session, url)
+            second = await scraper.fetch_html(session, url)
+
+            scraper.cache.mode = "replay"
+            replayed = await scraper.fetch_html(session, url)
+            missing = await scraper.fetch_html(session, url + "?other")
+        return first, second, replayed, missing
+
+    first, second, replayed, missing = asyncio.run(run())
+    assert first == second == replayed == "<p>page</p>"
+    assert missing is None
+    assert seen == [None, '"v1"']
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path):
+    from scripts.gather.cache import ResponseCache
+
+    cache = ResponseCache(tmp_path, max_bytes=1)
+    cache.store("https://example.org/a", "a" * 100, {})
+    cache.store("https://example.org/b", "b" * 100, {})
+    assert cache.lookup("https://example.org/a") is None
+    assert cache.lookup("https://example.org/b") is None
+
+    cache = ResponseCache(tmp_path / "big", max_bytes=10**6)
+    cache.store("https://example.org/a", "a" * 100, {"ETag": "x"})
+    entry = cache.lookup("https://example.org/a")
+    assert entry.body == "a" * 100 and entry.etag == "x" and entry.fresh
+
+
+def test_response_cache_concurrent_stores_of_one_url(tmp_path):
+    # Each store writes its own temp file, so readers only see complete bodies
+    from concurrent.futures import ThreadPoolExecutor
+
+    from scripts.gather.cache import ResponseCache
+
+    cache = ResponseCache(tmp_path)
+    url = "https://example.org/a"
+    bodies = [str(index) * 50_000 for index in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda body: cache.store(url, body, {}), bodies * 4))
+        lookups = list(executor.map(lambda _: cache.lookup(url), range(16)))
+
+    assert all(entry.body in bodies for entry in lookups)
+    assert sorted(path.suffix for path in tmp_path.glob("*/*")) == [".gz", ".json"]
+
+
+def test_cache_write_failures_keep_the_response(tmp_path, monkeypatch):
+    # A failing cache write is logged; the page is returned without a retry
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    from scripts.gather.cache import ResponseCache
+
+    calls = []
+
+    async def page(request):
+        calls.append(request.path)
+        return web.Response(text="<p>page</p>")
+
+    def full_disk(self, url, body, headers):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(ResponseCache, "store", full_disk)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/page", page)
+        scraper = _FakeScraper(tmp_path, cache="normal", retry_delay=0)
+        async with TestServer(app) as server, aiohttp.ClientSession() as session:
+            html = await scraper.fetch_html(session, str(server.make_url("/page")))
+        return scraper, html
+
+    scraper, html = asyncio.run(run())
+    assert html == "<p>page</p>" and calls == ["/page"]
+    (host,) = scraper.metrics.snapshot()["hosts"].values()
+    assert host["statuses"] == {"200": 1} and host["retries"] == 0
+
+    # Entries removed between listing and stat are skipped by size scans and eviction
+    monkeypatch.undo()
+    cache = ResponseCache(tmp_path / "cache")
+    cache.store("https://example.org/a", "a" * 100, {})
+    cache.max_bytes = 1
+    vanished = next((tmp_path / "cache").glob("*/*.gz"))
+    stat = type(vanished).stat
+
+    def racing_stat(path, *args, **kwargs):
+        if path == vanished:
+            raise FileNotFoundError(path)
+        return stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(type(vanished), "stat", racing_stat)
+    assert cache._scan_size() == 0
+    cache._evict()
+
+
+class _SlowSource(_FakeScraper):
+    def __init__(self, data_dir, name, fields, values, delay):
+        super().__init__(data_dir / name)
+        self.name, self.fields, self.values, self.delay = name, fields, values, delay
+
+    async def get_pronunciation(self, session, word):
+        await asyncio.sleep(self.delay)
+        if word not in self.values:
+            return None
+        return {"word": word, **self.values[word]}
+
+
+def test_multi_source_scraper_fans_out_and_merges(tmp_path):
+    # Sources are queried concurrently and merged field by field by priority
+    import time
+
+    from scripts.gather.orchestrator import MultiSourceScraper
+
+    cambridge = _SlowSource(
+        tmp_path, "cambridge", ("uk", "us"), {"hi": {"uk": "haɪ", "us": ""}}, 0.1
+    )
+    webster_values = {"hi": {"us": "ˈhī"}, "yo": {"us": "ˈyō"}}
+    webster = _SlowSource(tmp_path, "merriam_webster", ("us",), webster_values, 0.1)
+    scraper = MultiSourceScraper(
+        "english",
+        [cambridge, webster],
+        field_priority={"us": ["cambridge", "merriam_webster"]},
+        data_dir=str(tmp_path),
+    )
+
+    start = time.monotonic()
+    asyncio.run(scraper.process_specific_words(["hi", "yo"], scraper.output_file))
+    assert time.monotonic() - start < 0.3
+
+    data = json.loads(scraper.output_file.read_text())
+    assert data["hi"] == {
+        "word": "hi",
+        "uk": "haɪ",
+        "us": "ˈhī",
+        "sources": {"uk": "cambridge", "us": "merriam_webster"},
+    }
+    assert data["yo"]["uk"] == "" and scraper.find_missing_words(data) == ["yo"]
+
+
+def test_multi_source_scraper_with_sqlite_storage(tmp_path):
+    # The merged fields get their own columns, so only incomplete words are missing
+    from scripts.gather.orchestrator import MultiSourceScraper
+
+    def sources():
+        cambridge_values = {w: {"uk": w, "us": w} for w in ("hi", "yo")}
+        return [
+            _SlowSource(tmp_path, "cambridge", ("uk", "us"), cambridge_values, 0),
+            _SlowSource(tmp_path, "merriam_webster", ("us",), {}, 0),
+        ]
+
+    scraper = MultiSourceScraper(
+        "english", sources(), data_dir=str(tmp_path), storage="sqlite"
+    )
+    assert scraper.journal.fields == ["uk", "us"]
+    asyncio.run(scraper.process_specific_words(["hi", "yo", "ok"], scraper.output_file))
+    scraper.close()
+
+    reopened = MultiSourceScraper(
+        "english", sources(), data_dir=str(tmp_path), storage="sqlite"
+    )
+    store = reopened.open_journal(reopened.output_file)
+    assert sorted(store.keys()) == ["hi", "yo"]
+    assert store.missing() == []
+    assert store.get("hi")["uk"] == "hi"
+    with store._lock:
+        columns = store._conn.execute(f"SELECT uk, us FROM {store.table}").fetchall()
+    assert None not in {value for row in columns for value in row}
+    store.close()
+    reopened.close()
+
+
+def test_multi_source_scraper_shares_metrics_with_sources(tmp_path):
+    # Host and parse metrics from every source land in the combined snapshot
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    from scripts.gather.cache import ResponseCache
+    from scripts.gather.orchestrator import MultiSourceScraper
+    from scripts.gather.ratelimit import AdaptiveRateLimiter
+
+    class FetchingSource(_FakeScraper):
+        async def get_pronunciation(self, session, word):
+            html = await self.fetch_html(session, self.endpoint("base", "") + word)
+            return {"word": word, "us": await self.parse(str.upper, html)}
+
+    async def page(request):
+        return web.Response(text=request.match_info["word"])
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/{word}", page)
+        async with TestServer(app) as server:
+            endpoints = {"base": str(server.make_url("/"))}
+            source = FetchingSource(tmp_path / "source", endpoints=endpoints)
+            limiter = AdaptiveRateLimiter(rate=100)
+            cache = ResponseCache(tmp_path / "http_cache")
+            scraper = MultiSourceScraper(
+                "english",
+                [source],
+                data_dir=str(tmp_path),
+                rate_limiter=limiter,
+                cache=cache,
+            )
+            assert source.metrics is scraper.metrics
+            assert source.sessions is scraper.sessions
+            assert (source.rate_limiter, source.cache) == (limiter, cache)
+            await scraper.process_specific_words(["a", "b"], scraper.output_file)
+            scraper.close()
+            return scraper.metrics.snapshot()
+
+    snapshot = asyncio.run(run())
+    (host,) = snapshot["hosts"].values()
+    assert host["statuses"] == {"200": 2}
+    assert snapshot["stages"]["parse"]["count"] == 2
+    assert snapshot["counters"]["words_scraped"] == 2
+
+
+def test_wiktionary_resolver_batches_and_deduplicates(tmp_path):
+    # Readings are batched into one API query, shared, cached and only fall back
+    # to page fetches when the wikitext has no explicit IPA
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    from scripts.gather.scrapers.wiktionary import WiktionaryIPAResolver
+
+    requests = []
+    wikitext = {
+        "あい": "==Chinese==\n{{IPA|zh|/ai/}}\n==Japanese==\n{{IPA|ja|[a.i]}}\n",
+        "いま": "==Japanese==\n{{ja-pron|いま}}\n",
+    }
+
+    async def api(request):
+        titles = request.query["titles"].split("|")
+        requests.append(("api", sorted(titles)))
+        pages = [
+            {"title": t, "revisions": [{"slots": {"main": {"content": wikitext[t]}}}]}
+            if t in wikitext
+            else {"title": t, "missing": True}
+            for t in titles
+        ]
+        return web.json_response({"query": {"pages": pages}})
+
+    async def page(request):
+        requests.append(("page", request.match_info["title"]))
+        return web.Response(
+            text='<span id="Japanese">Japanese</span><span class="IPA">[i.ma]</span>'
+        )
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/w/api.php", api)
+        app.router.add_get("/wiki/{title}", page)
+        async with TestServer(app) as server, aiohttp.ClientSession() as session:
+            resolver = WiktionaryIPAResolver(
+                _FakeScraper(tmp_path, parser_backend="stream"),
+                "Japanese",
+                batch_size=20,
+                page_url=str(server.make_url("/wiki/")),
+                api_url=str(server.make_url("/w/api.php")),
+            )
+            titles = ["あい", "いま", "うそ", "あい"]
+            lookups = [resolver.resolve(session, title) for title in titles]
+            first = await asyncio.gather(*lookups)
+            again = await resolver.resolve(session, "いま")
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert first == ["[a.i]", "[i.ma]", None, "[a.i]"]
+    assert again == "[i.ma]"
+    assert requests == [("api", ["あい", "いま", "うそ"]), ("page", "いま")]
+
+
+def test_wiktionary_resolver_request_counts_and_transient_failures(tmp_path):
+    # ja-pron entries need the rendered page, so the default makes one request per
+    # reading and no API calls; batching only skips pages without the section.
+    # Transient failures are retried on the next lookup, 404s are cached
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    from scripts.gather.scrapers.wiktionary import WiktionaryIPAResolver
+
+    wikitext = {
+        "はな": (
+            "==Japanese==\n{{ja-kanjitab|はな}}\n===Pronunciation===\n"
+            "{{ja-pron|はな|acc=2|acc_ref=DJR}}\n===Noun===\n{{ja-noun|はな}}\n"
+        ),
+        "やま": "==Japanese==\n===Pronunciation===\n{{ja-pron|やま|acc=2}}\n",
+        "ねこ": "==Korean==\n{{ko-IPA}}\n",
+    }
+    rendered = '<span id="Japanese">Japanese</span><span class="IPA">[{}]</span>'
+    requests = []
+    failures = {"やま": 1}
+
+    async def api(request):
+        titles = request.query["titles"].split("|")
+        requests.append("api")
+        pages = [
+            {"title": t, "revisions": [{"slots": {"main": {"content": wikitext[t]}}}]}
+            for t in titles
+        ]
+        return web.json_response({"query": {"pages": pages}})
+
+    async def page(request):
+        title = request.match_info["title"]
+        requests.append(title)
+        if failures.get(title):
+            failures[title] -= 1
+            return web.Response(status=503)
+        if title == "なし":
+            return web.Response(status=404)
+        return web.Response(text=rendered.format(title))
+
+    async def run(batch_size, titles):
+        app = web.Application()
+        app.router.add_get("/w/api.php", api)
+        app.router.add_get("/wiki/{title}", page)
+        async with TestServer(app) as server, aiohttp.ClientSession() as session:
+            resolver = WiktionaryIPAResolver(
+                _FakeScraper(tmp_path, parser_backend="stream", retry_delay=0),
+                "Japanese",
+                batch_size=batch_size,
+                page_url=str(server.make_url("/wiki/")),
+                api_url=str(server.make_url("/w/api.php")),
+            )
+            first = await asyncio.gather(
+                *[resolver.resolve(session, title) for title in titles]
+            )
+            again = [await resolver.resolve(session, title) for title in titles]
+        return first, again
+
+    first, again = asyncio.run(run(1, ["はな", "やま", "なし"]))
+    assert first == ["[はな]", None, None]
+    assert again == ["[はな]", "[やま]", None]
+    assert sorted(requests) == ["なし", "はな", "やま", "やま"]
+
+    requests.clear()
+    first, again = asyncio.run(run(20, ["はな", "やま", "ねこ"]))
+    assert first == again == ["[はな]", "[やま]", None]
+    assert sorted(requests) == ["api", "はな", "やま"]
+
+
+def _load_cn_fetcher():
+    import importlib.util
+
+    path = Path(__file__).parent / ".github" / "scripts" / "fetcher" / "cn.py"
+    spec = importlib.util.spec_from_file_location("cn_fetcher", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_cn_pinyin_trie_streaming_build(tmp_path, monkeypatch, capsys):
+    # Phrases and characters are inserted into one trie, first entry wins
+    import sys
+
+    cn = _load_cn_fetcher()
+    # The peak RSS report is skipped where the resource module does not exist
+    monkeypatch.setitem(sys.modules, "resource", None)
+    assert cn.peak_rss_mb() is None
+
+    phrases = tmp_path / "phrases.txt"
+    phrases.write_text(
+        "# header\n# header\n中国: zhōng guó\n中文: zhōng  wén \n"
+        "\n中国: zhòng guó\n中: zhōng\n",
+        encoding="utf-8",
+    )
+    chars = tmp_path / "chars.txt"
+    chars.write_text(
+        "# comment\nU+4E2D: zhōng,zhòng  # 中\nU+6587: wén  # 文\nbad line\n",
+        encoding="utf-8",
+    )
+    output = tmp_path / "extension" / "data.json"
+    binary = tmp_path / "processed" / "cn_pinyin.bin"
+
+    tree = cn.fetch_pinyin_data(str(phrases), str(chars), output, binary)
+    assert "peak RSS" not in capsys.readouterr().out
+
+    assert tree == {
+        "中": {"国": {"_": "zhōng guó"}, "文": {"_": "zhōng wén"}, "_": "zhōng"},
+        "文": {"_": ["wén"]},
+    }
+    assert json.loads(output.read_text(encoding="utf-8")) == tree
+
+    # The binary artifact is written outside the extension tree and decodes back
+    # to the same trie
+    from cn_binary import PinyinDictionary
+
+    assert [path.name for path in output.parent.iterdir()] == ["data.json"]
+    dictionary = PinyinDictionary.load(binary)
+    assert dictionary.to_tree() == tree
+    assert dictionary.get("中国") == "zhōng guó"
+    assert dictionary.get("文") == ["wén"]
+    assert dictionary.get("国") is None
+
+
+def test_cn_binary_blocks_and_validation():
+    # Lookups cross block boundaries and corrupted data fails validation
+    _load_cn_fetcher()
+    from cn_binary import PinyinDictionary, encode, unflatten, validate
+
+    entries = [(chr(0x4E00 + i) * (1 + i % 3), f"p{i % 7} q{i}") for i in range(100)]
+    entries.append(("一二", ["yī", "èr"]))
+    tree = unflatten(entries)
+
+    data = encode(tree, block_size=4)
+    validate(tree, data)
+    dictionary = PinyinDictionary(data)
+    assert len(dictionary) == len(entries)
+    for phrase, value in entries:
+        assert dictionary.get(phrase) == value
+    assert dictionary.get("二") is None
+
+    tree["一"]["_"] = "changed"
+    with pytest.raises(ValueError):
+        validate(tree, data)
+
+    # Irregular whitespace between syllables does not produce empty tokens
+    tree = unflatten([("中国", " zhōng  guó"), ("中", ["zhōng"])])
+    data = encode(tree)
+    validate(tree, data)
+    assert PinyinDictionary(data).get("中国") == "zhōng guó"
+    assert "" not in PinyinDictionary(data).syllables
+
+
+def test_sharded_release_loads_only_needed_shards(tmp_path, monkeypatch):
+    # Words are hashed into shards that can be loaded one at a time
+    from scripts.gather.shards import ShardedDataset, fnv1a_32, write_shards
+
+    assert fnv1a_32("") == 0x811C9DC5
+    assert fnv1a_32("a") == 0xE40C292C
+
+    data = {f"word{i}": {"word": f"word{i}", "us": f"/w{i}/"} for i in range(50)}
+    manifest = write_shards(data, tmp_path / "english", shard_size=10)
+    assert manifest["shard_count"] == 5
+    assert sum(shard["entries"] for shard in manifest["shards"]) == 50
+
+    dataset = ShardedDataset(tmp_path / "english")
+    assert dataset.get("word7") == data["word7"]
+    assert dataset.get("missing") is None
+    assert len(dataset.loaded_shards) <= 2
+
+    # Rewriting with another shard count leaves the old manifest's shards intact
+    # until the new manifest is in place, then removes them
+    import hashlib
+
+    from scripts.gather import shards
+
+    old_files = {entry["file"]: entry["sha256"] for entry in manifest["shards"]}
+    dump_file = shards.dump_file
+
+    def check_then_dump(path, *args, **kwargs):
+        for name, sha256 in old_files.items():
+            raw = (tmp_path / "english" / name).read_bytes()
+            assert hashlib.sha256(raw).hexdigest() == sha256
+        return dump_file(path, *args, **kwargs)
+
+    monkeypatch.setattr(shards, "dump_file", check_then_dump)
+    data["word7"] = {"word": "word7", "us": "/new/"}
+    manifest = write_shards(data, tmp_path / "english", shard_size=20)
+    files = sorted(path.name for path in (tmp_path / "english").glob("shard-*"))
+    assert files == sorted(entry["file"] for entry in manifest["shards"])
+    assert not set(files) & set(old_files)
+    assert ShardedDataset(tmp_path / "english").get("word7")["us"] == "/new/"
+
+
+def test_incremental_release_writes_deltas(tmp_path, monkeypatch):
+    # Only languages whose sources changed are rebuilt, with a word-level delta
+    import importlib.util
+
+    path = Path(__file__).parent / ".github" / "scripts" / "generate_release.py"
+    spec = importlib.util.spec_from_file_location("generate_release", path)
+    release = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(release)
+
+    monkeypatch.chdir(tmp_path)
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    jisho = data_dir / "jisho_pronunciation_data.json"
+    naver = data_dir / "naver_pronunciation_data.json"
+    jisho.write_text(json.dumps({"今日": {"ipa": "a"}, "犬": {"ipa": "b"}}))
+    naver.write_text(json.dumps({"안녕": {"ipa": "c"}}))
+
+    release.generate_release_files()
+    # The first delta is the whole dataset, written compactly through the codec
+    delta_text = Path("release/japanese_delta.json").read_text(encoding="utf-8")
+    assert json.loads(delta_text)["added"] and "\n" not in delta_text
+
+    jisho.write_text(json.dumps({"今日": {"ipa": "x"}, "猫": {"ipa": "d"}}))
+    korean_file = Path("release/korean_pronunciations.json")
+    korean_mtime = korean_file.stat().st_mtime_ns
+    release.generate_release_files()
+
+    delta = json.loads(Path("release/japanese_delta.json").read_text())
+    assert delta["added"] == {"猫": {"ipa": "d"}}
+    assert delta["changed"] == {"今日": {"ipa": "x"}}
+    assert delta["removed"] == ["犬"]
+    assert korean_file.stat().st_mtime_ns == korean_mtime
+    assert not Path("release/korean_delta.json").exists()
+
+    changelog = Path("release/CHANGELOG.md").read_text(encoding="utf-8")
+    assert "- Japanese: 1 added, 1 changed, 1 removed" in changelog
+    assert "- Korean: no changes" in changelog
+
+
+def test_release_mode_switch_removes_other_outputs(tmp_path, monkeypatch):
+    # Switching between full and sharded releases does not ship stale files
+    import importlib.util
+
+    path = Path(__file__).parent / ".github" / "scripts" / "generate_release.py"
+    spec = importlib.util.spec_from_file_location("generate_release", path)
+    release = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(release)
+
+    monkeypatch.chdir(tmp_path)
+    Path("data").mkdir()
+    words = {f"word{i}": {"ipa": str(i)} for i in range(10)}
+    Path("data/jisho_pronunciation_data.json").write_text(json.dumps(words))
+    full_file = Path("release/japanese_pronunciations.json")
+    shard_dir = Path("release/japanese")
+
+    release.generate_release_files("both", shard_size=3)
+    assert full_file.exists() and (shard_dir / "manifest.json").exists()
+
+    release.generate_release_files("sharded", shard_size=3)
+    assert not full_file.exists()
+    assert len(list(shard_dir.glob("shard-*.json"))) > 1
+
+    release.generate_release_files("full")
+    assert json.loads(full_file.read_text()) == words
+    assert not shard_dir.exists()
+    assert json.loads(Path("release/japanese_delta.json").read_text())["added"] == {}
+
+
+def test_updater_batches_loads_and_writes(tmp_path, monkeypatch):
+    # Each dataset is read and written once for the whole batch of inputs
+    import scripts.updater as updater
+
+    for name in ["en/uk.json", "en/us.json", "ja/pronunciations.json"]:
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text(json.dumps({"known": {"ipa": "k"}}))
+
+    loads = []
+    load_json = updater._load_json
+    monkeypatch.setattr(
+        updater, "_load_json", lambda path: loads.append(path) or load_json(path)
+    )
+
+    def gather(word, lang):
+        if word == "broken":
+            raise RuntimeError("boom")
+        return {"uk_ipa": f"uk-{word}", "us_ipa": f"us-{word}", "ipa": f"ja-{word}"}
+
+    inputs = ["Hello", "hello ", "known", "world", "broken", "きょう", "123"]
+    updated = updater.update_pronunciation_data(inputs, tmp_path, gather)
+
+    assert updated == 3
+    assert sorted(path.name for path in loads) == [
+        "pronunciations.json",
+        "uk.json",
+        "us.json",
+    ]
+    uk = json.loads((tmp_path / "en" / "uk.json").read_text())
+    assert uk["hello"] == {"ipa": "uk-hello", "audio": ""}
+    assert set(uk) == {"known", "hello", "world"}
+    ja = json.loads((tmp_path / "ja" / "pronunciations.json").read_text())
+    assert ja["きょう"]["ipa"] == "ja-きょう"
+    assert not list(tmp_path.glob("*/.*"))
+
+
+def test_script_detector_splits_mixed_runs():
+    # One pass over code points assigns languages and splits mixed-script text
+    from scripts.gather.script_detector import (
+        detect_language,
+        group_by_language,
+        split_runs,
+    )
+
+    assert detect_language("don't") == "english"
+    assert detect_language("今日は") == "japanese"
+    assert detect_language("中国") == "chinese"
+    assert detect_language("안녕하세요") == "korean"
+    assert detect_language("123 !?") == "unknown"
+    assert detect_language("hello世界") == "unknown"
+    assert split_runs("hello世界, カタカナ-'") == [
+        ("hello", "english"),
+        ("世界", "chinese"),
+        ("カタカナ", "japanese"),
+    ]
+    assert split_runs("𠀀字") == [("𠀀字", "chinese")]
+    assert group_by_language(["cat 猫", "cat", "고양이"]) == {
+        "english": ["cat"],
+        "chinese": ["猫"],
+        "korean": ["고양이"],
+    }
+
+
+def test_atomic_write_keeps_original_on_failure(tmp_path):
+    # A failed write leaves the old file intact; backups rotate on success
+    from scripts.gather.atomic import atomic_open, atomic_write_json
+
+    target = tmp_path / "data.json"
+    for version in range(3):
+        atomic_write_json(target, {"version": version}, backups=2)
+
+    with pytest.raises(RuntimeError):
+        with atomic_open(target) as f:
+            f.write('{"version": ')
+            raise RuntimeError("killed mid-dump")
+
+    assert json.loads(target.read_text()) == {"version": 2}
+    assert json.loads((tmp_path / "data.json.bak.1").read_text()) == {"version": 1}
+    assert json.loads((tmp_path / "data.json.bak.2").read_text()) == {"version": 0}
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "data.json",
+        "data.json.bak.1",
+        "data.json.bak.2",
+    ]
+
+
+def test_background_writer_runs_writes_in_order(tmp_path):
+    # Writes run off the event loop in submission order and drain() waits for them
+    from scripts.gather.atomic import BackgroundWriter
+    from scripts.gather.codec import dump_file
+
+    order = []
+
+    async def run():
+        writer = BackgroundWriter(max_pending=2)
+        for index in range(5):
+            await writer.submit(order.append, index)
+        await writer.submit(dump_file, tmp_path / "out.json", {"done": True})
+        await writer.drain()
+        writer.close()
+
+    asyncio.run(run())
+    assert order == [0, 1, 2, 3, 4]
+    assert json.loads((tmp_path / "out.json").read_text()) == {"done": True}
+
+
+@pytest.mark.parametrize("backend", ["orjson", "msgspec", "json"])
+def test_json_codec_backends_round_trip(backend, tmp_path):
+    # Every installed backend writes compact UTF-8 and reads it back unchanged
+    from scripts.gather.codec import JSONCodec, available_backends
+
+    if backend not in available_backends():
+        pytest.skip(f"{backend} is not installed")
+
+    codec = JSONCodec(backend)
+    data = {"hello": {"word": "hello", "uk": "həˈləʊ", "us": "həˈloʊ"}}
+    encoded = codec.dumps(data)
+    assert b" " not in encoded and "həˈləʊ".encode("utf-8") in encoded
+    assert codec.loads(encoded) == data
+    assert codec.loads(codec.dumps(data, pretty=True)) == data
+
+    codec.dump_file(tmp_path / "data.json", data)
+    assert codec.load_file(tmp_path / "data.json") == data
+
+
+def test_validate_records_against_schema():
+    # Schema fields must be strings; strict mode also flags unknown fields
+    from scripts.gather.codec import RECORD_SCHEMAS, validate_records
+
+    data = {
+        "今日": {"word": "今日", "kana": "きょう", "ipa": None, "romaji": "kyō"},
+        "犬": {"word": "犬", "kana": "いぬ", "extra": 1},
+        "bad": [],
+    }
+    schema = RECORD_SCHEMAS["jisho"]
+    assert validate_records(data, schema) == [
+        "今日: field ipa is not a string",
+        "bad: record is list, not an object",
+    ]
+    assert "犬: unexpected field extra" in validate_records(data, schema, strict=True)
+
+
+def test_sqlite_store_queries_missing_fields_and_exports_json(tmp_path):
+    # The SQLite store imports existing JSON, indexes blank fields and exports JSON
+    from scripts.gather.sqlite_store import SQLiteStore
+
+    output = tmp_path / "fake_pronunciation_data.json"
+    output.write_text(json.dumps({"alpha": {"word": "alpha", "us": " "}}))
+    scraper = _FakeScraper(tmp_path, storage="sqlite", chunk_size=2)
+    store = scraper.journal
+    assert isinstance(store, SQLiteStore)
+    assert store.db_file == output.with_suffix(".sqlite3")
+
+    store.append(
+        {"beta": {"word": "beta", "us": "B", "sources": {"us": "x"}}, "gamma": {}},
+        {"last_word": "gamma", "processed_count": 3},
+    )
+    assert sorted(store.missing()) == ["alpha", "gamma"]
+    assert store.get("beta") == {"word": "beta", "us": "B", "sources": {"us": "x"}}
+    assert store.last_checkpoint()["processed_count"] == 3
+
+    # A second connection reads while the first is still open (WAL mode)
+    reader = SQLiteStore(store.db_file, "fake", ("us",))
+    assert len(reader) == 3
+    reader.close()
+
+    asyncio.run(scraper.complete_missing_data())
+    scraper.close()
+    assert json.loads(output.read_text()) == {
+        "alpha": {"word": "alpha", "us": "ALPHA"},
+        "beta": {"word": "beta", "us": "B", "sources": {"us": "x"}},
+        "gamma": {"word": "gamma", "us": "GAMMA"},
+    }
+
+
+def test_sqlite_store_pages_reads_without_holding_the_lock(tmp_path):
+    # Reads page through the table by word and let writers in between pages
+    import threading
+
+    from scripts.gather.sqlite_store import SQLiteStore
+
+    store = SQLiteStore(tmp_path / "store.sqlite3", "fake", ("us",))
+    store.append({f"w{i:03d}": {"us": "" if i % 3 else "x"} for i in range(25)})
+
+    pages = store._select(f"SELECT * FROM {store.table}", batch_size=10)
+    assert next(pages)[0] == "w000"
+    writer = threading.Thread(target=store.append, args=({"w999": {"us": ""}},))
+    writer.start()
+    writer.join(timeout=5)
+    assert not writer.is_alive()
+
+    assert len([row[0] for row in pages]) == 25
+    assert store.missing() == [f"w{i:03d}" for i in range(25) if i % 3] + ["w999"]
+    assert store.compact() == 26
+    store.close()
+
+
+def test_pinyin_annotator_maximum_matching(tmp_path):
+    # Forward matching takes the longest phrase; bidirectional prefers fewer singles
+    _load_cn_fetcher()
+    from cn_annotator import PinyinAnnotator, Segment, render
+    from cn_binary import unflatten, write_binary
+
+    tree = unflatten(
+        [
+            ("研究", "yán jiū"),
+            ("研究生", "yán jiū shēng"),
+            ("生命", "shēng mìng"),
+            ("命", ["mìng"]),
+            ("人", ["rén", "ren"]),
+        ]
+    )
+    annotator = PinyinAnnotator(tree)
+    assert annotator.forward("研究生命") == [
+        Segment("研究生", "yán jiū shēng"),
+        Segment("命", "mìng"),
+    ]
+    assert annotator.backward("研究生命") == annotator.bidirectional("研究生命")
+    assert render(annotator.annotate("研究生命, 人")) == (
+        "研究(yán jiū)生命(shēng mìng), 人(rén)"
+    )
+
+    binary = tmp_path / "data.bin"
+    write_binary(tree, binary)
+    loaded = PinyinAnnotator.load(binary)
+    assert list(loaded.annotate_lines(["x研究\n"], "forward")) == [
+        [Segment("x", None), Segment("研究", "yán jiū")]
+    ]
+
+
+def test_lookup_service_batches_and_caches(tmp_path):
+    # Batched lookups hit the in-memory index once, then the LRU cache
+    from aiohttp.test_utils import TestClient, TestServer
+
+    from scripts.gather.service import LRUCache, PronunciationIndex, create_app
+    from scripts.gather.shards import write_shards
+
+    english = {"hello": {"word": "hello", "uk": "həˈləʊ", "us": "heˈloʊ"}}
+    (tmp_path / "english_pronunciations.json").write_text(json.dumps(english))
+    write_shards({"犬": {"word": "犬", "kana": "いぬ"}}, tmp_path / "japanese", 1)
+    dictionary = tmp_path / "cn.json"
+    dictionary.write_text(json.dumps({"人": {"_": ["rén"]}}), encoding="utf-8")
+
+    index = PronunciationIndex(tmp_path, dictionary, cache_size=2)
+    assert index.languages() == ["en-uk", "en-us", "ja", "cn"]
+
+    async def run():
+        async with TestClient(TestServer(create_app(index))) as client:
+            response = await client.post(
+                "/lookup", json={"lang": "en-us", "queries": ["Hello", "nope"]}
+            )
+            assert float(response.headers["X-Response-Time-Ms"]) >= 0
+            assert (await response.json())["results"] == {
+                "Hello": "heˈloʊ",
+                "nope": None,
+            }
+            response = await client.post(
+                "/lookup", json={"lang": "cn", "queries": ["人a"]}
+            )
+            results = (await response.json())["results"]
+            assert results == {"人a": [["人", "rén"], ["a", None]]}
+            response = await client.post("/lookup", json={"lang": "ko", "queries": []})
+            assert response.status == 400
+            assert "X-Response-Time-Ms" in response.headers
+            for lang in (["en-us"], {"a": 1}, 1, None):
+                response = await client.post(
+                    "/lookup", json={"lang": lang, "queries": ["hello"]}
+                )
+                assert response.status == 400
+            return await (await client.get("/stats")).json()
+
+    stats = asyncio.run(run())
+    assert stats["latency"]["requests"] == 7
+    assert index.lookup("ja", "犬") == {"word": "犬", "kana": "いぬ"}
+    assert index.lookup("ja", "犬") is index.lookup("ja", "犬")
+    assert index.cache.hits == 2 and len(index.cache) == 2
+
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert "b" not in cache and "a" in cache
+
+
+def test_lookup_service_loads_shards_in_a_thread(tmp_path, monkeypatch):
+    # Shards are read off the event loop; long queries bypass the cache
+    import threading
+
+    from aiohttp.test_utils import TestClient, TestServer
+
+    from scripts.gather import service
+    from scripts.gather.shards import ShardedDataset, write_shards
+
+    words = {f"w{i}": {"word": f"w{i}", "kana": str(i)} for i in range(20)}
+    write_shards(words, tmp_path / "japanese", shard_size=5)
+    index = service.PronunciationIndex(tmp_path, cache_size=100)
+    dataset = index.datasets["japanese"]
+    assert isinstance(dataset, ShardedDataset) and dataset.loaded_shards == []
+
+    threads = set()
+    shard = ShardedDataset.shard
+
+    def record_thread(self, number):
+        threads.add(threading.current_thread() is threading.main_thread())
+        return shard(self, number)
+
+    monkeypatch.setattr(ShardedDataset, "shard", record_thread)
+
+    async def run():
+        async with TestClient(TestServer(service.create_app(index))) as client:
+            response = await client.post(
+                "/lookup", json={"lang": "ja", "queries": ["w1", "w7"]}
+            )
+            return (await response.json())["results"]
+
+    results = asyncio.run(run())
+    assert results == {"w1": words["w1"], "w7": words["w7"]}
+    # Loaded in a worker thread; the lookups afterwards run on the loop
+    assert threads == {False, True}
+    assert index.unloaded_shards("ja", ["w1", "w7"]) == []
+
+    long_query = "w" * (service.MAX_CACHED_QUERY + 1)
+    assert index.lookup("ja", long_query) is None
+    assert ("ja", long_query) not in index.cache
+
+
+def test_benchmark_suite_runs_and_compares(tmp_path, monkeypatch):
+    # Benchmarks report throughput/latency/memory and flag throughput regressions
+    import importlib.util
+
+    path = Path(__file__).parent / "benchmarks" / "run.py"
+    spec = importlib.util.spec_from_file_location("benchmarks_run", path)
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+
+    result = bench.run_case("script_detect", 100)
+    assert result["units"] == 100 and result["peak_mb"] > 0
+    assert result["p99_ms"] >= result["p50_ms"] > 0
+
+    slower = dict(result, throughput=result["throughput"] / 2)
+    assert bench.compare([slower], [result], threshold=0.1)
+    assert not bench.compare([result], [slower], threshold=0.1)
+
+    monkeypatch.setenv("TQDM_DISABLE", "1")
+    output = tmp_path / "results.json"
+    argv = ["--only", "ingest_filter", "--sizes", "200", "--output", str(output)]
+    assert bench.main(argv) == 0
+    assert json.loads(output.read_text())["results"][0]["name"] == "ingest_filter"
+
+
+def test_fake_server_load_test_with_endpoint_overrides(monkeypatch):
+    # Scrapers pointed at the fake server retry 5xx errors until every word succeeds
+    import time
+
+    from scripts.gather.base_scraper import parse_endpoints
+    from scripts.gather.fake_server import (
+        FakeDictionaryServer,
+        FakeServerConfig,
+        load_test,
+    )
+
+    assert parse_endpoints(["base=http://x/a=b"]) == {"base": "http://x/a=b"}
+    with pytest.raises(ValueError):
+        parse_endpoints(["http://x/"])
+
+    monkeypatch.setenv("TQDM_DISABLE", "1")
+    # Bursts start one period after startup, not at t=0
+    server = FakeDictionaryServer(FakeServerConfig(burst_every=10, burst_length=1))
+    phases = {}
+    for elapsed in (0, 0.5, 9.9, 10.5, 11.5, 20.2):
+        server._started = time.monotonic() - elapsed
+        phases[elapsed] = server._in_burst()
+    assert [elapsed for elapsed, burst in phases.items() if burst] == [10.5, 20.2]
+
+    # Failures are counted per URL instead of drawn at random, and bursts are off,
+    # so the number of 503s and retries is the same on every run
+    config = FakeServerConfig(
+        latency_ms=1,
+        fail_first=2,
+        slow_body_rate=0.1,
+        slow_body_seconds=0.01,
+        page_kb=1,
+        seed=3,
+    )
+    result = asyncio.run(
+        load_test("jisho", 40, config, retry_attempts=3, retry_delay=0.001)
+    )
+    assert result["succeeded"] == 40
+    assert result["latency"]["requests"] == 40
+    assert result["server"]["routes"]["jisho"] == 3 * 40
+    # IPA lookups are not retried, so each one stops at its first 503
+    routes = result["server"]["routes"]
+    assert routes["wiktionary"] > 0
+    assert result["server"]["statuses"][503] == 2 * 40 + routes["wiktionary"]
+
+
+def test_crawl_metrics_snapshots_and_prometheus(tmp_path):
+    # Requests, retries, parse/persist times and queue gauges reach the snapshot
+    import socket
+    from collections import Counter
+
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    from scripts.gather.metrics import Histogram, MetricsReporter
+
+    calls = Counter()
+
+    async def page(request):
+        word = request.match_info["word"]
+        calls[word] += 1
+        if word == "a" and calls[word] == 1:
+            return web.Response(status=503)
+        return web.Response(text=word)
+
+    class FetchingScraper(_FakeScraper):
+        async def get_pronunciation(self, session, word):
+            html = await self.fetch_html(session, self.endpoint("base", "") + word)
+            if html is None:
+                return None
+            return {"word": word, "us": await self.parse(str.upper, html)}
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/{word}", page)
+        async with TestServer(app) as server:
+            scraper = FetchingScraper(
+                tmp_path,
+                retry_delay=0,
+                endpoints={"base": str(server.make_url("/"))},
+                metrics_file="metrics.json",
+            )
+            await scraper.process_specific_words(["a", "b"], scraper.output_file)
+            scraper.close()
+
+        reporter = MetricsReporter(scraper.metrics, port=port)
+        async with reporter, aiohttp.ClientSession() as session:
+            url = f"http://127.0.0.1:{port}/metrics"
+            async with session.get(url) as response:
+                return scraper, await response.text()
+
+    scraper, text = asyncio.run(run())
+    snapshot = json.loads((tmp_path / "metrics.json").read_text())
+    (host,) = snapshot["hosts"].values()
+    assert host["statuses"] == {"503": 1, "200": 2} and host["retries"] == 1
+    assert snapshot["stages"]["parse"]["count"] == 2
+    assert snapshot["stages"]["persist"]["count"] >= 1
+    assert snapshot["counters"]["words_scraped"] == 2
+    assert set(snapshot["gauges"]) >= {"in_flight", "pending_writes"}
+    assert snapshot["source"] == "fake"
+    assert 'scraper_responses_total{host="' in text
+    assert 'scraper_stage_duration_seconds_bucket{stage="parse",le="+Inf"} 2' in text
+
+    histogram = Histogram(buckets=(1, 2))
+    for value in (0.5, 1.5, 1.5, 3):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1] and histogram.quantile(0.5) == 1.5